@@ -0,0 +1,58 @@
+"""
+Vercel Python Serverless Function exposing scraper metrics
+Serves the metrics store written by scraper runs (backend/scripts/metrics.py)
+in the Prometheus text exposition format
+"""
+import os
+import sys
+import json
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler
+
+def find_scripts_dir():
+    """backend/scripts next to this file, or in Vercel's /var/task layout"""
+    current_dir = Path(__file__).parent
+    candidates = [
+        current_dir.parent / "backend" / "scripts",
+        current_dir / "backend" / "scripts",
+        Path("/var/task/backend/scripts"),
+        Path(os.getcwd()) / "backend" / "scripts",
+    ]
+    for candidate in candidates:
+        if (candidate / "metrics.py").exists():
+            return candidate
+    return None
+
+class handler(BaseHTTPRequestHandler):
+    """
+    GET /api/metrics returns text/plain Prometheus metrics: run and per-source
+    duration histograms, download wait, records written, failures by exception
+    class and cache hits
+    """
+
+    def do_GET(self):
+        try:
+            scripts_dir = find_scripts_dir()
+            if scripts_dir is None:
+                self.send_error_json(500, 'Metrics module not found', f'Searched from {Path(__file__).parent}')
+                return
+            if str(scripts_dir) not in sys.path:
+                sys.path.insert(0, str(scripts_dir))
+            import metrics
+
+            body = metrics.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-type', metrics.CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            self.wfile.write(body)
+        except Exception as e:
+            self.send_error_json(500, 'Failed to read metrics', str(e))
+
+    def send_error_json(self, status, error, message):
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(json.dumps({'success': False, 'error': error, 'message': message}).encode('utf-8'))
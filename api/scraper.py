@@ -5,15 +5,27 @@ This function wraps the scraper.py script to run on Vercel's Python runtime
 import os
 import sys
 import json
+import threading
 import subprocess
+from collections import deque
 from pathlib import Path
+from urllib.parse import urlparse, parse_qs
 from http.server import BaseHTTPRequestHandler
 
+SCRAPER_TIMEOUT = 50  # Seconds (Vercel Pro limit is 60)
+
 class handler(BaseHTTPRequestHandler):
     """
     Vercel Python serverless function handler
     Note: Vercel functions have timeout limits (10s free, 60s pro)
     Web scraping may exceed these limits
+
+    ?stream=1 returns the scraper's progress events as chunked NDJSON while it runs,
+    ending with a {"event": "response", ...} line that carries the usual response body
+
+    Background jobs: ?action=submit&mode=... returns 202 with a job id at once,
+    ?job=<id> returns the job's status and ?job=<id>&result=1 its result
+    (501 on Vercel, where no instance can see another's jobs)
     """
     
     def do_GET(self):
@@ -57,17 +69,92 @@ class handler(BaseHTTPRequestHandler):
                 self.wfile.write(json.dumps(response).encode('utf-8'))
                 return
             
+            # Scrape tasks run concurrently by default so the run fits in the timeout
+            query = parse_qs(urlparse(self.path).query)
+            mode = query.get('mode', ['concurrent'])[0]
+
+            # Dispatch to the resident scraper worker when one is running (no interpreter
+            # start or imports per request); fall back to a subprocess otherwise
+            scripts_dir = str(scraper_script.parent)
+            if scripts_dir not in sys.path:
+                sys.path.insert(0, scripts_dir)
+            import scraper_worker
+            import scraper_jobs
+            if (query.get('action', [''])[0] == 'submit' or 'job' in query) and not scraper_jobs.SUPPORTED:
+                self.send_json(501, {
+                    'success': False,
+                    'error': 'Background jobs not supported',
+                    'message': 'Background jobs need a persistent host; this deployment runs scrapes in the request. '
+                               'Call /api/scraper without action=submit (or with stream=1).',
+                })
+                return
+            if query.get('action', [''])[0] == 'submit':
+                job = scraper_jobs.submit(mode)
+                self.send_json(202, {
+                    'success': True,
+                    'message': 'Scraper job submitted',
+                    'job': scraper_jobs.job_status(job),
+                    'status_url': f"/api/scraper?job={job['id']}",
+                    'result_url': f"/api/scraper?job={job['id']}&result=1",
+                })
+                return
+            if 'job' in query:
+                self.send_job(scraper_jobs, query['job'][0], query.get('result', ['0'])[0].lower() in ('1', 'true'))
+                return
+
+            # A scrape that succeeded within SCRAPER_RESULT_TTL is returned without starting anything
+            import singleflight
+            cached = singleflight.cached_result(singleflight.state_dir(), mode)
+            if cached is not None:
+                self.record_cache_hit()
+                self.send_json(200, {
+                    'success': True,
+                    'message': 'Scraper executed successfully',
+                    'result': cached,
+                    'cached': True,
+                })
+                return
+
+            if query.get('stream', ['0'])[0].lower() in ('1', 'true'):
+                self.stream_scraper(scraper_worker, mode, scraper_script, backend_dir)
+                return
+
+            worker_response = scraper_worker.run_job(mode)
+            if worker_response is not None:
+                if worker_response.get('ok'):
+                    self.send_response(200)
+                    response = {
+                        'success': True,
+                        'message': 'Scraper executed successfully',
+                        'result': worker_response['result'],
+                        'worker': True,
+                        'duration': worker_response['seconds'],
+                    }
+                else:
+                    self.send_response(500)
+                    response = {
+                        'success': False,
+                        'error': 'Scraper execution failed',
+                        'message': worker_response.get('error', 'Unknown error'),
+                        'worker': True,
+                    }
+                self.send_header('Content-type', 'application/json')
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.end_headers()
+                self.wfile.write(json.dumps(response, default=str).encode('utf-8'))
+                return
+
             # Run the Python scraper script
             # Note: This may timeout on Vercel free tier (10s limit)
             process = subprocess.Popen(
-                [sys.executable, str(scraper_script)],
+                [sys.executable, str(scraper_script), mode],
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 text=True,
                 cwd=str(backend_dir)
             )
             
-            stdout, stderr = process.communicate(timeout=50)  # 50 second timeout for Pro tier
+            stdout, stderr = process.communicate(timeout=SCRAPER_TIMEOUT)  # 50 second timeout for Pro tier
             
             if process.returncode == 0:
                 # Try to parse JSON result from stdout
@@ -111,7 +198,7 @@ class handler(BaseHTTPRequestHandler):
                 }
                 self.wfile.write(json.dumps(response).encode('utf-8'))
                 
-        except subprocess.TimeoutExpired:
+        except (subprocess.TimeoutExpired, TimeoutError):
             self.send_response(408)
             self.send_header('Content-type', 'application/json')
             self.send_header('Access-Control-Allow-Origin', '*')
@@ -136,3 +223,138 @@ class handler(BaseHTTPRequestHandler):
             }
             self.wfile.write(json.dumps(response).encode('utf-8'))
 
+    def stream_scraper(self, scraper_worker, mode, scraper_script, backend_dir):
+        """Run the scraper and relay its progress events as a chunked NDJSON response"""
+        # Chunked transfer encoding needs an HTTP/1.1 status line
+        self.protocol_version = 'HTTP/1.1'
+        self.send_response(200)
+        self.send_header('Content-type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+
+        # The status is already sent, so failures are reported in the final "response" line
+        try:
+            worker_response = scraper_worker.run_job(mode, on_event=self.write_event)
+            if worker_response is None:
+                response = self.stream_subprocess(mode, scraper_script, backend_dir)
+            elif worker_response.get('ok'):
+                response = {
+                    'success': True,
+                    'message': 'Scraper executed successfully',
+                    'result': worker_response['result'],
+                    'worker': True,
+                    'duration': worker_response['seconds'],
+                }
+            else:
+                response = {
+                    'success': False,
+                    'error': 'Scraper execution failed',
+                    'message': worker_response.get('error', 'Unknown error'),
+                    'worker': True,
+                }
+        except (subprocess.TimeoutExpired, TimeoutError):
+            response = {
+                'success': False,
+                'error': 'Scraper timeout',
+                'message': 'Scraper execution exceeded timeout limit. This may be due to Vercel function timeout limits (10s free, 60s pro).',
+            }
+        except Exception as e:
+            import traceback
+            response = {
+                'success': False,
+                'error': 'Scraper execution failed',
+                'message': str(e),
+                'traceback': traceback.format_exc()[:500],
+            }
+        self.write_event({'event': 'response', **response})
+        self.wfile.write(b'0\r\n\r\n')
+        self.wfile.flush()
+
+    def stream_subprocess(self, mode, scraper_script, backend_dir):
+        """Run scraper.py with SCRAPER_PROGRESS=1, relaying its event lines; returns the response body"""
+        env = dict(os.environ, SCRAPER_PROGRESS='1', PYTHONUNBUFFERED='1')
+        process = subprocess.Popen(
+            [sys.executable, str(scraper_script), mode],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            cwd=str(backend_dir),
+            env=env,
+        )
+        timer = threading.Timer(SCRAPER_TIMEOUT, process.kill)
+        timer.start()
+        result = None
+        output_tail = deque(maxlen=20)
+        try:
+            for line in process.stdout:
+                if line.startswith('{"event"'):
+                    event = json.loads(line)
+                    if event['event'] == 'run_end':
+                        result = event.get('result')
+                    self.write_event(event)
+                else:
+                    output_tail.append(line)
+            process.wait()
+        finally:
+            timed_out = timer.finished.is_set() and process.returncode != 0
+            timer.cancel()
+            if process.poll() is None:
+                process.kill()
+        if timed_out:
+            raise subprocess.TimeoutExpired(process.args, SCRAPER_TIMEOUT)
+
+        output = ''.join(output_tail)
+        if process.returncode == 0:
+            return {
+                'success': True,
+                'message': 'Scraper executed successfully',
+                'result': result or {'message': 'Scraper completed', 'output': output[-500:]},
+            }
+        return {
+            'success': False,
+            'error': 'Scraper execution failed',
+            'message': output[-500:] or 'Unknown error',
+        }
+
+    def write_event(self, event):
+        """Write one NDJSON line as an HTTP chunk"""
+        data = (json.dumps(event, default=str) + '\n').encode('utf-8')
+        self.wfile.write(f'{len(data):X}\r\n'.encode('ascii') + data + b'\r\n')
+        self.wfile.flush()
+
+    def send_job(self, scraper_jobs, job_id, with_result):
+        """Status of a background job, or its result once finished (202 while it is still running)"""
+        job = scraper_jobs.get_job(job_id)
+        if job is None:
+            self.send_json(404, {'success': False, 'error': 'Job not found', 'message': f'Unknown job id: {job_id}'})
+        elif not with_result:
+            self.send_json(200, {'success': True, 'job': scraper_jobs.job_status(job)})
+        elif job['status'] not in scraper_jobs.FINISHED:
+            self.send_json(202, {'success': True, 'message': f"Job is {job['status']}", 'job': scraper_jobs.job_status(job)})
+        else:
+            self.send_json(200, {
+                'success': job['status'] == 'succeeded',
+                'message': 'Scraper executed successfully' if job['status'] == 'succeeded' else 'Scraper execution failed',
+                'result': job['result'],
+                'error': job['error'],
+                'job': scraper_jobs.job_status(job),
+            })
+
+    def record_cache_hit(self):
+        """Count a result served from the singleflight cache in the metrics store"""
+        try:
+            import metrics
+            if metrics.ENABLED:
+                metrics.increment('scraper_cache_hits_total', cache='result')
+        except Exception:
+            pass
+
+    def send_json(self, status, response):
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(json.dumps(response, default=str).encode('utf-8'))
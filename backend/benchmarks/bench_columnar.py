@@ -0,0 +1,73 @@
+# Benchmark: columnar dataset copies (Arrow IPC / Parquet) vs the JSON files
+# For each dataset in backend/data, optionally scaled up by repeating its
+# records, compares file size and the time to get one column: json.load of the
+# whole file vs a memory-mapped Arrow read vs a Parquet column read.
+#
+# Usage: python backend/benchmarks/bench_columnar.py [scale ...]   (default: 1 100)
+import os
+import sys
+import json
+import time
+import tempfile
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import columnar_export
+import json_writer
+from scraper import DATA_DIR
+
+DATASETS = {"Security.json": "Security Name", "ipo-main.json": "Listing_at", "ipo-sme.json": "Lead_Manager"}
+REPEATS = 5
+
+def best_of(fn):
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 5)
+
+def json_column(path, column):
+    with open(path, "r", encoding="utf-8") as f:
+        return [record.get(column) for record in json.load(f)["data"]]
+
+def bench_dataset(name, column, scale, out_dir):
+    with open(os.path.join(DATA_DIR, name), "r", encoding="utf-8") as f:
+        source = json.load(f)
+    records = source["data"] * scale
+    metadata = dict(source["metadata"], total_records=len(records))
+
+    json_path = os.path.join(out_dir, name)
+    json_writer.write_json_dataset(json_path, metadata, records)
+    paths = columnar_export.write_columnar(json_path, metadata, records, columnar_export.FORMATS)
+
+    expected = json_column(json_path, column)
+    for path in paths.values():
+        if columnar_export.read_columns(path, [column]).column(0).to_pylist() != expected:
+            raise SystemExit(f"Column mismatch for {name} in {path}")
+
+    return {
+        "dataset": name,
+        "scale": scale,
+        "records": len(records),
+        "column": column,
+        "bytes": {"json": os.path.getsize(json_path), **{fmt: os.path.getsize(p) for fmt, p in paths.items()}},
+        "load_column_seconds": {
+            "json": best_of(lambda: json_column(json_path, column)),
+            **{fmt: best_of(lambda p=p: columnar_export.read_columns(p, [column]).column(0)) for fmt, p in paths.items()},
+        },
+    }
+
+def main():
+    scales = [int(arg) for arg in sys.argv[1:]] or [1, 100]
+    report = []
+    with tempfile.TemporaryDirectory() as out_dir:
+        for scale in scales:
+            for name, column in DATASETS.items():
+                report.append(bench_dataset(name, column, scale, out_dir))
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
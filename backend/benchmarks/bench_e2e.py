@@ -0,0 +1,99 @@
+# Benchmark: end-to-end scrapes against the offline replay server
+# Starts backend/scripts/replay_server.py on a free port with the chosen injected
+# latency and failure rate, points BSE_BASE_URL and CHITTORGARH_BASE_URL at it and
+# runs whole scraper modes in a scratch directory (data, single-flight state and
+# downloads all under a temp dir; result reuse, processing cache and metrics off):
+#   concurrent / full   the direct HTTP fetch path
+#   browser             full with SCRAPER_HTTP_FETCH=0, i.e. the Selenium flow
+#                       (reported as skipped when no Chrome binary is installed)
+# Per mode: wall time (best of --repeat), success, errors, per-span seconds from
+# the result's timings and the requests the server answered or failed.
+#
+# Usage: python backend/benchmarks/bench_e2e.py [--modes concurrent full browser]
+#            [--latency S] [--jitter S] [--failure-rate P] [--failure-status N] [--repeat N]
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.join(os.path.dirname(BENCHMARKS_DIR), "scripts")
+SCRAPER = os.path.join(SCRIPTS_DIR, "scraper.py")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import replay_server
+from run_benchmarks import git_commit, parse_result, run_child
+
+# mode -> (scraper.py argument, extra environment)
+CASES = {
+    "concurrent": ("concurrent", {}),
+    "full": ("full", {}),
+    "browser": ("full", {"SCRAPER_HTTP_FETCH": "0"}),
+}
+CHROME_BINARIES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+
+def chrome_available():
+    return any(shutil.which(name) for name in CHROME_BINARIES)
+
+def bench_mode(name, server, repeat, work_dir):
+    argument, extra_env = CASES[name]
+    best = None
+    hits_before, failures_before = len(server.hits), len(server.failures)
+    for attempt in range(repeat):
+        run_dir = os.path.join(work_dir, name)
+        shutil.rmtree(run_dir, ignore_errors=True)
+        os.makedirs(os.path.join(run_dir, "data"))
+        env = dict(os.environ, BSE_BASE_URL=server.base_url, CHITTORGARH_BASE_URL=server.base_url,
+                   SCRAPER_DATA_DIR=os.path.join(run_dir, "data"), SCRAPER_SINGLEFLIGHT_DIR=os.path.join(run_dir, "singleflight"),
+                   SCRAPER_RESULT_TTL="0", SCRAPER_PROCESS_CACHE="0", SCRAPER_METRICS="0",
+                   SCRAPER_PROGRESS="0", SCRAPER_TRACE_FILE="", **extra_env)
+        log_path = os.path.join(work_dir, f"{name}.log")
+
+        code, seconds, _ = run_child([sys.executable, SCRAPER, argument], run_dir, env, log_path)
+        result = parse_result(log_path) or {}
+        print(f"INFO: {name} run {attempt + 1}/{repeat}: {seconds:.2f}s, success={result.get('success')}", file=sys.stderr)
+        if best is None or (result.get("success"), -seconds) > (best["success"], -best["wall_seconds"]):
+            by_span = (result.get("timings") or {}).get("by_span", {})
+            best = {
+                "mode": name,
+                "success": bool(result.get("success")),
+                "exit_code": code,
+                "wall_seconds": round(seconds, 3),
+                "errors": result.get("errors", []),
+                "spans": {span: totals["seconds"] for span, totals in sorted(by_span.items())},
+            }
+    best["requests"] = len(server.hits) - hits_before
+    best["injected_failures"] = len(server.failures) - failures_before
+    return best
+
+def run(modes, repeat, injection, seed):
+    server = replay_server.start_in_background(seed=seed, **injection)
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            for name in modes:
+                if name == "browser" and not chrome_available():
+                    results.append({"mode": name, "skipped": "no Chrome binary found"})
+                    continue
+                results.append(bench_mode(name, server, repeat, work_dir))
+    finally:
+        server.shutdown()
+        server.server_close()
+    return {"commit": git_commit(), "injection": dict(server.injection, seed=seed), "repeat": repeat, "results": results}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end scraper runs against the replay server")
+    parser.add_argument("--modes", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many extra seconds, uniformly random")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Probability that a request fails")
+    parser.add_argument("--failure-status", type=int, default=503, help="Status of failed requests, 0 drops the connection")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    injection = {"latency": args.latency, "jitter": args.jitter,
+                 "failure_rate": args.failure_rate, "failure_status": args.failure_status}
+    print(json.dumps(run(args.modes, max(1, args.repeat), injection, args.seed), indent=2))
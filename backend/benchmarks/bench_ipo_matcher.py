@@ -0,0 +1,102 @@
+# Benchmark: IPO -> security linking (ipo_matcher) vs naive all-pairs scoring
+# Builds synthetic security masters and IPO lists from the real Security.json
+# names (IPO-style suffixes, status codes, typos and unlisted companies), then
+# times the hash join + blocked fuzzy matcher and reports its accuracy. The
+# naive O(n*m) pass is timed on a sample of IPOs and extrapolated.
+#
+# Usage: python backend/benchmarks/bench_ipo_matcher.py [size ...]   (default: 10000 30000)
+import os
+import sys
+import json
+import time
+import random
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import ipo_matcher
+from scraper import DATA_DIR
+from synthetic import NAME_PARTS
+
+NAIVE_SAMPLE = 50
+
+def security_master(size, rng):
+    with open(os.path.join(DATA_DIR, "Security.json"), "r", encoding="utf-8") as f:
+        base = [record["Security Name"] for record in json.load(f)["data"] if record["Security Name"].endswith(" Ltd")]
+    names = list(dict.fromkeys(base))
+    while len(names) < size:
+        stem = rng.choice(base)[:-4]
+        names.append(f"{stem} {rng.choice(NAME_PARTS)} {rng.choice(NAME_PARTS)} Ltd")
+    return list(dict.fromkeys(names))[:size]
+
+def typo(word, rng):
+    if len(word) < 6:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+def ipo_list(securities, size, rng):
+    """(company, expected security or None) pairs"""
+    ipos = []
+    for _ in range(size):
+        roll = rng.random()
+        security = rng.choice(securities)
+        stem = security[:-4]
+        if roll < 0.15:
+            ipos.append((f"{rng.choice(NAME_PARTS)}{rng.randrange(10**6)} Newco Ltd. IPO", None))
+        elif roll < 0.25:
+            words = stem.split()
+            longest = max(range(len(words)), key=lambda i: len(words[i]))
+            words[longest] = typo(words[longest], rng)
+            ipos.append((" ".join(words) + " Limited IPO", security))
+        else:
+            ipos.append((f"{stem} Ltd. IPO{rng.choice(['', '', ' O', ' C', ' CT'])}", security))
+    return ipos
+
+def naive_best(name, security_keys, security_grams):
+    grams = ipo_matcher.trigrams(ipo_matcher.normalize_name(name))
+    best = 0.0
+    for other in security_grams:
+        common = len(grams & other)
+        best = max(best, common / (len(grams) + len(other) - common))
+    return best
+
+def bench(size, rng):
+    securities = security_master(size, rng)
+    ipos = ipo_list(securities, size, rng)
+
+    start = time.perf_counter()
+    links = ipo_matcher.link_records([("bench", {"Company": company}) for company, _ in ipos], securities)
+    seconds = time.perf_counter() - start
+
+    # Securities that normalize to the same key (case or "Co"/"Company" variants) are interchangeable
+    expected = [ipo_matcher.normalize_name(security) if security else None for _, security in ipos]
+    linked = [ipo_matcher.normalize_name(link["Security Name"]) if link["Security Name"] else None for link in links]
+    correct = sum(1 for got, want in zip(linked, expected) if got == want and want)
+    wrong = sum(1 for got, want in zip(linked, expected) if got and got != want)
+    linkable = sum(1 for want in expected if want)
+
+    keys = [ipo_matcher.normalize_name(name) for name in securities]
+    grams = [ipo_matcher.trigrams(key) for key in keys]
+    start = time.perf_counter()
+    for company, _ in ipos[:NAIVE_SAMPLE]:
+        naive_best(company, keys, grams)
+    naive_seconds = (time.perf_counter() - start) / NAIVE_SAMPLE * len(ipos)
+
+    return {
+        "securities": len(securities),
+        "ipos": len(ipos),
+        "matcher_seconds": round(seconds, 3),
+        "naive_seconds_estimated": round(naive_seconds, 1),
+        "recall": round(correct / linkable, 4),
+        "wrong_links": wrong,
+        "methods": {method: sum(1 for link in links if link["match"] == method) for method in ("exact", "fuzzy", None)},
+    }
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 30000]
+    rng = random.Random(7)
+    print(json.dumps([bench(size, rng) for size in sizes], indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# Benchmark: dataset JSON writer vs the previous json.dump(indent=4) path
+# Compares output size and write time for each format/serializer on the
+# datasets in backend/data, optionally scaled up by repeating their records.
+#
+# Usage: python backend/benchmarks/bench_json_writer.py [scale ...]   (default: 1 10)
+import os
+import sys
+import json
+import time
+import tempfile
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import json_writer
+from scraper import DATA_DIR, clean_nan_values
+
+DATASETS = ["Security.json", "ipo-main.json", "ipo-sme.json"]
+REPEATS = 3
+
+def legacy_write(path, metadata, records):
+    """The save path before json_writer: clean copy + json.dump(indent=4) onto the live file"""
+    cleaned = clean_nan_values(records)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"metadata": metadata, "data": cleaned}, f, indent=4, ensure_ascii=False)
+
+def timed(fn):
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def bench_dataset(name, scale, out_dir):
+    with open(os.path.join(DATA_DIR, name), "r", encoding="utf-8") as f:
+        source = json.load(f)
+    records = source["data"] * scale
+    metadata = dict(source["metadata"], total_records=len(records))
+    path = os.path.join(out_dir, name)
+
+    results = [{
+        "variant": "legacy json.dump indent=4",
+        "seconds": round(timed(lambda: legacy_write(path, metadata, records)), 4),
+        "bytes": os.path.getsize(path),
+    }]
+    serializers = [json_writer.get_serializer("json")]
+    fast = json_writer.get_serializer("auto")
+    if fast.name != "json":
+        serializers.append(fast)
+    for fmt in json_writer.FORMATS:
+        for serializer in serializers:
+            if fmt == "pretty" and serializer.name != "json":
+                continue  # pretty output always goes through the stdlib encoder
+            seconds = timed(lambda: json_writer.write_json_dataset(path, metadata, clean_nan_values(records), fmt, serializer))
+            results.append({
+                "variant": f"json_writer {fmt} ({serializer.name})",
+                "seconds": round(seconds, 4),
+                "bytes": os.path.getsize(path),
+            })
+    return {"dataset": name, "scale": scale, "records": len(records), "results": results}
+
+def main():
+    scales = [int(arg) for arg in sys.argv[1:]] or [1, 10]
+    report = []
+    with tempfile.TemporaryDirectory() as out_dir:
+        for scale in scales:
+            for name in DATASETS:
+                report.append(bench_dataset(name, scale, out_dir))
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# Benchmark: content-addressed processing cache
+# Converts a synthetic IPO report and Equity.csv twice in a scratch data
+# directory: the first run parses and writes (cache miss), the second gets the
+# byte-identical CSV again, as on an intraday refresh where nothing changed, and
+# only hashes it (cache hit). Also reports the cost of the streamed sha256 alone.
+#
+# Usage: python backend/benchmarks/bench_process_cache.py [scale ...]   (default: 1 10 100)
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+from contextlib import redirect_stdout
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import processing_cache
+import scraper
+import synthetic
+
+EQUITY_ROWS = 3000  # Rows per scale unit, about one BSE Equity T+1 list
+
+CASES = {
+    "process_ipo": ("IPO.csv", lambda path, scale: synthetic.generate_ipo_csv(path, synthetic.IPO_ROWS_TODAY * scale),
+                    scraper.process_existing_ipo_data),
+    "process_equity": ("Equity.csv", lambda path, scale: synthetic.generate_equity_csv(path, EQUITY_ROWS * scale),
+                       scraper.process_equity_csv_to_security_json),
+}
+
+def timed_run(fn, source, target):
+    """Copy the source CSV into place (the conversion deletes it) and time one conversion"""
+    shutil.copy(source, target)
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        outcome = fn()
+    seconds = time.perf_counter() - start
+    if not outcome["success"]:
+        raise SystemExit(f"Conversion failed: {outcome.get('error')}")
+    return round(seconds, 4)
+
+def bench_case(name, scale, work_dir):
+    csv_name, generate, fn = CASES[name]
+    source = os.path.join(work_dir, f"source-{csv_name}")
+    generate(source, scale)
+
+    scraper.PROCESS_CACHE_HITS.clear()
+    miss = timed_run(fn, source, os.path.join(work_dir, csv_name))
+    hit = timed_run(fn, source, os.path.join(work_dir, csv_name))
+    if list(scraper.PROCESS_CACHE_HITS.values()) != [True]:
+        raise SystemExit(f"{name}: expected the second run to be a cache hit, got {scraper.PROCESS_CACHE_HITS}")
+
+    start = time.perf_counter()
+    processing_cache.file_sha256(source)
+    return {
+        "mode": name,
+        "scale": scale,
+        "csv_bytes": os.path.getsize(source),
+        "miss_seconds": miss,
+        "hit_seconds": hit,
+        "sha256_seconds": round(time.perf_counter() - start, 4),
+        "speedup": round(miss / hit, 1),
+    }
+
+if __name__ == "__main__":
+    scales = [int(arg) for arg in sys.argv[1:]] or [1, 10, 100]
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        data_dir = os.path.join(work_dir, "data")
+        os.makedirs(data_dir)
+        # Point the conversions at the scratch directories
+        scraper.DOWNLOAD_DIR = work_dir
+        scraper.DATA_DIR = data_dir
+        scraper.CHANGES_DIR = os.path.join(data_dir, "changes")
+        scraper.SECURITY_INDEX_PATH = os.path.join(data_dir, "Security.idx")
+        for scale in scales:
+            for name in CASES:
+                results.append(bench_case(name, scale, work_dir))
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,62 @@
+# Benchmark: DataFrame -> JSON records conversion
+# Compares the previous chain (df.where + to_dict + recursive clean_nan_values)
+# with a per-column conversion (scraper.column_to_list, as read_csv_records does)
+# on the shipped IPO datasets and on a synthetic report 100x the size of today's,
+# reporting time and tracemalloc peak memory.
+#
+# Usage: python backend/benchmarks/bench_records.py [scale ...]   (default: 100)
+import os
+import sys
+import json
+import time
+import tempfile
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "scripts"))
+
+import pandas as pd
+from scraper import DATA_DIR, clean_nan_values, column_to_list
+from synthetic import IPO_ROWS_TODAY, generate_ipo_csv
+
+def legacy_records(df):
+    df = df.where(pd.notnull(df), None)
+    return clean_nan_values(df.to_dict(orient="records"))
+
+def dataframe_to_records(df):
+    """Records in one pass, resolving NaN/Inf to None per column"""
+    names = list(df.columns)
+    columns = [column_to_list(df[name]) for name in names]
+    return [dict(zip(names, row)) for row in zip(*columns)]
+
+def measure(fn, df):
+    tracemalloc.start()
+    start = time.perf_counter()
+    records = fn(df)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return records, {"seconds": round(seconds, 4), "peak_mib": round(peak / 2**20, 2)}
+
+def bench(label, df):
+    legacy, legacy_stats = measure(legacy_records, df)
+    fast, fast_stats = measure(dataframe_to_records, df)
+    if legacy != fast:
+        raise SystemExit(f"Output mismatch for {label}")
+    return {"dataset": label, "rows": len(df), "legacy": legacy_stats, "dataframe_to_records": fast_stats}
+
+def main():
+    scales = [int(arg) for arg in sys.argv[1:]] or [100]
+    report = []
+    for name in ["ipo-main.json", "ipo-sme.json"]:
+        with open(os.path.join(DATA_DIR, name), "r", encoding="utf-8") as f:
+            df = pd.DataFrame(json.load(f)["data"])
+        report.append(bench(name, df))
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in scales:
+            path = generate_ipo_csv(os.path.join(tmp, "IPO.csv"), rows=IPO_ROWS_TODAY * scale)
+            report.append(bench(f"synthetic IPO x{scale}", pd.read_csv(path)))
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# Benchmark: Security.idx autocomplete vs loading and sorting Security.json per request
+# The baseline mirrors getSecurityNames + a filter: json.load, de-duplicate,
+# sort, then scan for matches. The index is built once and memory-mapped.
+#
+# Usage: python backend/benchmarks/bench_security_index.py [scale ...]   (default: 1 10)
+import os
+import sys
+import json
+import time
+import tempfile
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import json_writer
+import security_index
+from scraper import DATA_DIR
+
+QUERIES = ["ta", "tata", "hdfc b", "bank", "motors", "reliance industris"]
+REPEATS = 200
+
+def per_request_scan(json_path, query):
+    with open(json_path, "r", encoding="utf-8") as f:
+        names = sorted({record["Security Name"] for record in json.load(f)["data"]})
+    key = security_index.search_key(query)
+    return [name for name in names if security_index.search_key(name).startswith(key)][:security_index.DEFAULT_LIMIT]
+
+def micros(fn, repeats=REPEATS):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return round((time.perf_counter() - start) / repeats * 1e6, 1)
+
+def bench(scale, out_dir):
+    with open(os.path.join(DATA_DIR, "Security.json"), "r", encoding="utf-8") as f:
+        source = json.load(f)
+    names = [record["Security Name"] for record in source["data"]]
+    names = [f"{name} {n}" if n else name for n in range(scale) for name in names]
+    json_path = os.path.join(out_dir, "Security.json")
+    index_path = os.path.join(out_dir, "Security.idx")
+    json_writer.write_json_dataset(json_path, source["metadata"], [{"Security Name": name} for name in names])
+
+    start = time.perf_counter()
+    security_index.build_index(names, index_path)
+    build_seconds = time.perf_counter() - start
+    index = security_index.SecurityIndex(index_path)
+
+    result = {
+        "names": len(index),
+        "index_bytes": os.path.getsize(index_path),
+        "build_seconds": round(build_seconds, 3),
+        "baseline_prefix_us": micros(lambda: per_request_scan(json_path, "tata"), 5),
+        "queries_us": {},
+    }
+    for query in QUERIES:
+        result["queries_us"][query] = {mode: micros(lambda m=mode: getattr(index, m)(query)) for mode in ("prefix", "search", "fuzzy")}
+    index.close()
+    return result
+
+def main():
+    scales = [int(arg) for arg in sys.argv[1:]] or [1, 10]
+    with tempfile.TemporaryDirectory() as out_dir:
+        report = [dict(scale=scale, **bench(scale, out_dir)) for scale in scales]
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# Benchmark: Security Name cleaning in process_equity_csv_to_security_json
+# Compares the previous per-item Python loop (str().strip() x3 + seen-set dedupe)
+# with the vectorized clean_security_names on synthetic Equity.csv files sized
+# like a merged BSE + NSE master list, including the pd.read_csv step.
+#
+# Usage: python backend/benchmarks/bench_security_names.py [rows ...]   (default: 1000000 3000000)
+import os
+import sys
+import json
+import time
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "scripts"))
+
+import pandas as pd
+from scraper import INVALID_SECURITY_NAMES, clean_security_names
+from synthetic import generate_equity_csv
+
+def legacy_security_names(series):
+    security_names = series.dropna().tolist()
+    security_names = [
+        str(name).strip()
+        for name in security_names
+        if str(name).strip() and str(name).strip() not in INVALID_SECURITY_NAMES
+    ]
+    seen = set()
+    unique_security_names = []
+    for name in security_names:
+        if name not in seen:
+            seen.add(name)
+            unique_security_names.append(name)
+    return unique_security_names
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, round(time.perf_counter() - start, 4)
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000000, 3000000]
+    report = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            path = generate_equity_csv(os.path.join(tmp, "Equity.csv"), rows)
+            df, read_seconds = timed(pd.read_csv, path, encoding="utf-8", usecols=range(9))
+            legacy, legacy_seconds = timed(legacy_security_names, df["Security Name"])
+            fast, fast_seconds = timed(clean_security_names, df["Security Name"])
+            if legacy != fast:
+                raise SystemExit(f"Output mismatch at {rows} rows")
+            report.append({
+                "rows": rows,
+                "unique_names": len(fast),
+                "read_csv_seconds": read_seconds,
+                "legacy_seconds": legacy_seconds,
+                "clean_security_names_seconds": fast_seconds,
+            })
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
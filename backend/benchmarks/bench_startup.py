@@ -0,0 +1,108 @@
+# Benchmark: start-up cost of the process_* modes
+# Profiles `python -X importtime -c "import scraper"` (what every subprocess run
+# pays before doing any work) next to the modules scraper.py no longer imports at
+# start-up, then times whole process_ipo / process_equity runs in a fresh
+# interpreter with each CSV engine and checks both engines write the same data.
+#
+# Usage: python backend/benchmarks/bench_startup.py [scale ...]   (default: 1 10)
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import synthetic
+
+ENGINES = ("stdlib", "pandas")
+# Modules scraper.py used to import at start-up (selenium.webdriver itself is a lazy package)
+DEFERRED_MODULES = ("pandas", "numpy", "selenium.webdriver.chrome.webdriver",
+                    "selenium.webdriver.support.expected_conditions", "webdriver_manager.chrome")
+EQUITY_ROWS = 3000  # Rows per scale unit, about one BSE Equity T+1 list
+REPEATS = 3
+
+# Runs one mode in a fresh interpreter with the datasets redirected to a scratch directory
+CHILD = """
+import os, sys
+import scraper
+scraper.DATA_DIR = sys.argv[2]
+scraper.CHANGES_DIR = os.path.join(sys.argv[2], "changes")
+scraper.SECURITY_INDEX_PATH = os.path.join(sys.argv[2], "Security.idx")
+sys.exit(0 if scraper.main(sys.argv[1])["success"] else 1)
+"""
+
+def import_times(statement):
+    """{module: cumulative microseconds} from `python -X importtime -c statement`"""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=SCRIPTS_DIR,
+                               capture_output=True, text=True, check=True)
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times.setdefault(name.strip(), int(cumulative))
+    return times
+
+def profile_imports():
+    scraper_times = import_times("import scraper")
+    deferred_times = import_times("import " + ", ".join(DEFERRED_MODULES))
+    return {
+        "scraper_ms": round(scraper_times["scraper"] / 1000, 1),
+        "slowest_ms": {name: round(us / 1000, 1) for name, us in
+                       sorted(scraper_times.items(), key=lambda item: -item[1])[1:8]},
+        "deferred_loaded": [name for name in DEFERRED_MODULES if name in scraper_times],
+        "deferred_ms": {name: round(deferred_times[name] / 1000, 1) for name in DEFERRED_MODULES if name in deferred_times},
+    }
+
+def run_mode(mode, engine, scale, work_dir):
+    """Best wall time of a mode in a fresh interpreter, and the data it wrote"""
+    data_dir = os.path.join(work_dir, f"data-{engine}")
+    os.makedirs(data_dir, exist_ok=True)
+    env = dict(os.environ, SCRAPER_CSV_ENGINE=engine, PYTHONPATH=SCRIPTS_DIR)
+    best = None
+    for _ in range(REPEATS):
+        # The mode consumes its CSV, so each run gets a fresh copy
+        if mode == "process_ipo":
+            synthetic.generate_ipo_csv(os.path.join(work_dir, "IPO.csv"), synthetic.IPO_ROWS_TODAY * scale)
+        else:
+            synthetic.generate_equity_csv(os.path.join(work_dir, "Equity.csv"), EQUITY_ROWS * scale)
+        # A dataset that is already up to date is not rewritten; time the full conversion
+        for name in os.listdir(data_dir):
+            if name.endswith(".json"):
+                os.remove(os.path.join(data_dir, name))
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", CHILD, mode, data_dir], cwd=work_dir, env=env,
+                       stdout=subprocess.DEVNULL, check=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    dataset = "ipo-main.json" if mode == "process_ipo" else "Security.json"
+    with open(os.path.join(data_dir, dataset), "r", encoding="utf-8") as f:
+        return round(best, 3), json.load(f)["data"]
+
+def bench_mode(mode, scale):
+    with tempfile.TemporaryDirectory() as work_dir:
+        seconds = {}
+        outputs = {}
+        for engine in ENGINES:
+            seconds[engine], outputs[engine] = run_mode(mode, engine, scale, work_dir)
+    if outputs["stdlib"] != outputs["pandas"]:
+        raise SystemExit(f"{mode} output differs between the stdlib and pandas engines at scale {scale}")
+    return {
+        "mode": mode,
+        "scale": scale,
+        "records": len(outputs["stdlib"]),
+        "seconds": seconds,
+        "speedup": round(seconds["pandas"] / seconds["stdlib"], 2),
+    }
+
+if __name__ == "__main__":
+    scales = [int(arg) for arg in sys.argv[1:]] or [1, 10]
+    report = {"imports": profile_imports(), "runs": []}
+    for scale in scales:
+        for mode in ("process_ipo", "process_equity"):
+            report["runs"].append(bench_mode(mode, scale))
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,186 @@
+# Benchmark suite: CSV -> JSON conversion pipeline through the process_* CLI modes
+# For each mode and scale, generates a synthetic input (Equity.csv is latin-1
+# with trailing commas, like the BSE export; IPO.csv follows the Chittorgarh
+# report), runs `python scraper.py <mode>` offline in a scratch directory
+# (SCRAPER_DATA_DIR) with the processing cache off, and records:
+#   wall_seconds   whole process, interpreter start included (best of --repeat)
+#   peak_rss_mb    maximum resident set size of the child (os.wait4)
+#   output_bytes   bytes written to the data directory, per file and in total
+#   spans          seconds in the traced stages (read_csv_table, clean_nan_values,
+#                  save_json_to_file, write_json, ...) from the result's timings
+# The report is JSON with the commit, so runs can be compared across commits.
+#
+# Usage: python backend/benchmarks/run_benchmarks.py [--scales 1 10 100 1000] [--modes ...]
+#            [--engine auto|pandas|stdlib] [--repeat N] [--output report.json]
+#        python backend/benchmarks/run_benchmarks.py --compare old.json new.json
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.join(os.path.dirname(BENCHMARKS_DIR), "scripts")
+SCRAPER = os.path.join(SCRIPTS_DIR, "scraper.py")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import synthetic
+
+EQUITY_ROWS = 3000  # Rows per scale unit, about one BSE Equity T+1 list
+SPAN_NAMES = ("read_csv_table", "read_csv_records", "clean_security_names", "clean_nan_values",
+              "save_json_to_file", "diff_previous", "write_json", "columnar_export")
+RESULT_MARKER = "FINAL AUTOMATION RESULT:"
+
+# mode -> (input file name, generator(path, scale))
+CASES = {
+    "process_ipo": ("IPO.csv", lambda path, scale: synthetic.generate_ipo_csv(path, synthetic.IPO_ROWS_TODAY * scale)),
+    "process_securities": ("SecurityList.csv", lambda path, scale: synthetic.generate_equity_csv(path, EQUITY_ROWS * scale)),
+    "process_equity": ("Equity.csv", lambda path, scale: synthetic.generate_equity_csv(path, EQUITY_ROWS * scale, encoding="latin-1")),
+}
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARKS_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_child(args, cwd, env, log_path):
+    """Run a child process; returns (exit code, wall seconds, peak RSS in MB or None)"""
+    with open(log_path, "wb") as log:
+        start = time.perf_counter()
+        process = subprocess.Popen(args, cwd=cwd, env=env, stdout=log, stderr=subprocess.STDOUT)
+        if hasattr(os, "wait4"):
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss is in KiB on Linux and in bytes on macOS
+            peak_rss = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+        else:
+            process.wait()
+            peak_rss = None
+        seconds = time.perf_counter() - start
+    return process.returncode, seconds, peak_rss
+
+def parse_result(log_path):
+    """The result JSON printed after RESULT_MARKER, or None"""
+    with open(log_path, "r", encoding="utf-8", errors="replace") as f:
+        output = f.read()
+    marker = output.rfind(RESULT_MARKER)
+    if marker < 0:
+        return None
+    try:
+        result, _ = json.JSONDecoder().raw_decode(output[output.index("{", marker):])
+        return result
+    except ValueError:
+        return None
+
+def output_sizes(data_dir):
+    sizes = {}
+    for root, _, files in os.walk(data_dir):
+        for name in files:
+            if not name.startswith("."):
+                path = os.path.join(root, name)
+                sizes[os.path.relpath(path, data_dir)] = os.path.getsize(path)
+    return dict(sorted(sizes.items()))
+
+def bench_case(mode, scale, engine, repeat, work_dir):
+    input_name, generate = CASES[mode]
+    source = os.path.join(work_dir, f"source-{input_name}")
+    generate(source, scale)
+    env = dict(os.environ, SCRAPER_CSV_ENGINE=engine, SCRAPER_PROCESS_CACHE="0", SCRAPER_METRICS="0",
+               SCRAPER_PROGRESS="0", SCRAPER_TRACE_FILE="")
+
+    best = None
+    for attempt in range(repeat):
+        # Every run starts from an empty data directory and a fresh copy of the input (the mode deletes it)
+        run_dir = os.path.join(work_dir, "run")
+        data_dir = os.path.join(run_dir, "data")
+        shutil.rmtree(run_dir, ignore_errors=True)
+        os.makedirs(data_dir)
+        shutil.copy(source, os.path.join(run_dir, input_name))
+        log_path = os.path.join(work_dir, f"{mode}-{scale}.log")
+
+        code, seconds, peak_rss = run_child([sys.executable, SCRAPER, mode], run_dir,
+                                            dict(env, SCRAPER_DATA_DIR=data_dir), log_path)
+        result = parse_result(log_path)
+        if code != 0 or not result or not result.get("success"):
+            raise SystemExit(f"{mode} at {scale}x failed (exit {code}), see {log_path}")
+        if best is None or seconds < best["wall_seconds"]:
+            by_span = result.get("timings", {}).get("by_span", {})
+            outputs = output_sizes(data_dir)
+            best = {
+                "wall_seconds": round(seconds, 3),
+                "peak_rss_mb": round(peak_rss, 1) if peak_rss is not None else None,
+                "output_bytes": sum(outputs.values()),
+                "outputs": outputs,
+                "spans": {name: by_span[name]["seconds"] for name in SPAN_NAMES if name in by_span},
+            }
+        print(f"INFO: {mode} {scale}x run {attempt + 1}/{repeat}: {seconds:.2f}s", file=sys.stderr)
+
+    return dict({"mode": mode, "scale": scale, "input_bytes": os.path.getsize(source)}, **best)
+
+def run_suite(scales, modes, engine, repeat):
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for scale in scales:
+            for mode in modes:
+                results.append(bench_case(mode, scale, engine, repeat, work_dir))
+    return {
+        "commit": git_commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "engine": engine,
+        "repeat": repeat,
+        "results": results,
+    }
+
+def compare(old_path, new_path):
+    """Per mode and scale: new / old ratios of wall time, peak RSS and output size"""
+    with open(old_path, "r", encoding="utf-8") as f:
+        old = {(r["mode"], r["scale"]): r for r in json.load(f)["results"]}
+    with open(new_path, "r", encoding="utf-8") as f:
+        new = json.load(f)["results"]
+
+    def ratio(a, b):
+        return round(b / a, 3) if a and b is not None else None
+
+    rows = []
+    for r in new:
+        before = old.get((r["mode"], r["scale"]))
+        if before:
+            rows.append({
+                "mode": r["mode"],
+                "scale": r["scale"],
+                "wall_ratio": ratio(before["wall_seconds"], r["wall_seconds"]),
+                "peak_rss_ratio": ratio(before["peak_rss_mb"], r["peak_rss_mb"]),
+                "output_bytes_ratio": ratio(before["output_bytes"], r["output_bytes"]),
+            })
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the process_* conversion modes")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--modes", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--engine", choices=["auto", "pandas", "stdlib"], default="auto")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--output", help="Write the report here instead of stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two reports")
+    args = parser.parse_args()
+
+    if args.compare:
+        print(json.dumps(compare(*args.compare), indent=2))
+        sys.exit(0)
+
+    report = run_suite(args.scales, args.modes, args.engine, max(1, args.repeat))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"INFO: Wrote {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
@@ -0,0 +1,108 @@
+# Synthetic input generators for the benchmarks
+# Produce CSV files shaped like the real downloads so the conversion pipeline
+# can be measured offline at any size.
+import csv
+import random
+from datetime import date, timedelta
+
+# Chittorgarh "IPO in India - Mainboard and SME" report export
+IPO_COLUMNS = [
+    "Company",
+    "Opening Date",
+    "Closing Date",
+    "Listing Date",
+    "Issue Price (Rs)",
+    "Total Issue Amount (Incl.Firm reservations) (Rs.cr.)",
+    "Listing at",
+    "Lead Manager",
+]
+IPO_ROWS_TODAY = 354  # Rows in the /82/all/ report today
+
+LISTINGS = ["BSE, NSE", "BSE SME", "NSE SME", "BSE, NSE", "BSE SME"]
+LEAD_MANAGERS = [
+    "Nuvama Wealth Management", "Galactico Corporate", "Axis Capital", "Hem Securities",
+    "Kotak Mahindra Capital", "ICICI Securities", "Beeline Capital Advisors", "Gretex Corporate Services",
+]
+NAME_PARTS = [
+    "Park", "Medi", "World", "Neptune", "Logitek", "Pajson", "Agro", "India", "Nephrocare", "Health",
+    "Services", "Shree", "Ganesh", "Infra", "Tech", "Solar", "Power", "Textiles", "Pharma", "Steel",
+]
+
+def _fmt_date(d):
+    return d.strftime("%a, %b %d, %Y")
+
+def _company(rng, i):
+    words = rng.sample(NAME_PARTS, 2)
+    return f"{' '.join(words)} {i} Ltd. IPO"
+
+def generate_ipo_csv(path, rows=IPO_ROWS_TODAY, seed=42):
+    """Write a Chittorgarh-style IPO report CSV with blanks, price ranges and comma amounts"""
+    rng = random.Random(seed)
+    start = date(2025, 12, 20)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(IPO_COLUMNS)
+        for i in range(rows):
+            opening = start - timedelta(days=i // 3)
+            upcoming = rng.random() < 0.05
+            low = rng.randint(10, 900)
+            price = "" if upcoming or rng.random() < 0.1 else (
+                f"{low:.2f} to {low + rng.randint(1, 40):.2f}" if rng.random() < 0.6 else f"{low:.2f}"
+            )
+            amount = rng.uniform(1, 5000)
+            writer.writerow([
+                _company(rng, i),
+                "" if upcoming else _fmt_date(opening),
+                "" if upcoming else _fmt_date(opening + timedelta(days=2)),
+                "" if upcoming or i < 10 else _fmt_date(opening + timedelta(days=5)),
+                price,
+                f"{amount:,.2f}",
+                rng.choice(LISTINGS),
+                rng.choice(LEAD_MANAGERS),
+            ])
+    return path
+
+# BSE "List of Scrips" Equity.csv export (note the trailing comma on every line)
+EQUITY_COLUMNS = [
+    "Security Code", "Issuer Name", "Security Id", "Security Name", "Status",
+    "Group", "Face Value", "ISIN No", "Instrument",
+]
+GROUPS = ["A", "B", "T", "X", "XT", "Z", "M", "MT"]
+# Names with characters outside ASCII; the BSE export is latin-1, so these are single non-UTF-8 bytes
+ACCENTED_PARTS = ["Société", "Nestlé", "Café", "Müller", "Señor", "Crédit"]
+
+def _security_name(i):
+    return f"{NAME_PARTS[i % 7]} {NAME_PARTS[7 + i % 13]} {i} Ltd"
+
+def generate_equity_csv(path, rows, seed=42, duplicate_ratio=0.3, encoding="utf-8", accented_ratio=0.005):
+    """Write a BSE-style Equity.csv; duplicate_ratio of the rows repeat an earlier name
+    (as when BSE and NSE master lists are merged), a few carry placeholder names and
+    accented_ratio have accented names (encoding="latin-1" writes them like the real export)"""
+    rng = random.Random(seed)
+    placeholders = ["Equity", "Preference Shares", "-", "", "NA", " ", "N/A"]
+    with open(path, "w", encoding=encoding, newline="") as f:
+        f.write(",".join(EQUITY_COLUMNS) + ",\n")
+        lines = []
+        for i in range(rows):
+            roll = rng.random()
+            if roll < 0.01:
+                name = rng.choice(placeholders)
+            elif roll < 0.01 + duplicate_ratio and i:
+                # The other exchange's copy, sometimes with stray padding
+                name = _security_name(rng.randrange(i))
+                name = f" {name} " if roll < 0.05 else name
+            elif roll > 1 - accented_ratio:
+                name = f"{ACCENTED_PARTS[i % len(ACCENTED_PARTS)]} {_security_name(i)}"
+            else:
+                name = _security_name(i)
+            issuer = name.strip() or "Unknown Issuer"
+            lines.append(
+                f"{500000 + i},{issuer},SEC{i:07d},{name},"
+                f"{'Active' if roll > 0.05 else 'Suspended'},{GROUPS[i % len(GROUPS)]},"
+                f"{rng.choice(['1.00', '2.00', '5.00', '10.00'])},INE{i:06d}01{i % 10},Equity,\n"
+            )
+            if len(lines) >= 10000:
+                f.writelines(lines)
+                lines = []
+        f.writelines(lines)
+    return path
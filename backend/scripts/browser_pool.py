@@ -0,0 +1,314 @@
+# Warm browser pool for the scraper
+# A long-lived local service that keeps pre-initialized, pre-patched headless
+# Chrome sessions ready. scraper.py checks a session out over a local socket,
+# attaches to it, and checks it back in instead of paying Chrome startup.
+#
+# Start the service:   python browser_pool.py serve
+# Point the scraper:   BROWSER_POOL_ADDRESS=127.0.0.1:7811 python scraper.py
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import shutil
+import tempfile
+import threading
+import socketserver
+
+POOL_ADDRESS = os.environ.get("BROWSER_POOL_ADDRESS", "")          # "host:port", empty disables the pool
+POOL_SIZE = int(os.environ.get("BROWSER_POOL_SIZE", "3"))           # Warm sessions kept by the service
+MAX_USES = int(os.environ.get("BROWSER_POOL_MAX_USES", "20"))       # Recycle a session after this many checkouts
+HEALTH_INTERVAL = int(os.environ.get("BROWSER_POOL_HEALTH_INTERVAL", "60"))  # Seconds between idle health checks
+LEASE_TIMEOUT = int(os.environ.get("BROWSER_POOL_LEASE_TIMEOUT", "600"))     # Reclaim sessions never checked in
+CHECKOUT_TIMEOUT = 30
+RESTART_LEASE = "restart"  # Lease held by a slot whose dead session is being relaunched
+DEFAULT_PORT = 7811
+
+# ---------------------------------------------------------------------------
+# Client side (used by scraper.py)
+# ---------------------------------------------------------------------------
+
+def _parse_address(address):
+    host, _, port = address.rpartition(":")
+    return (host or "127.0.0.1", int(port or DEFAULT_PORT))
+
+def _request(message, address=None, timeout=CHECKOUT_TIMEOUT):
+    """Send one JSON request to the pool service and return its JSON response"""
+    with socket.create_connection(_parse_address(address or POOL_ADDRESS), timeout=timeout + 5) as sock:
+        sock.sendall((json.dumps(message) + "\n").encode("utf-8"))
+        with sock.makefile("r", encoding="utf-8") as reader:
+            line = reader.readline()
+    if not line:
+        raise Exception("Browser pool closed the connection")
+    response = json.loads(line)
+    if not response.get("ok"):
+        raise Exception(response.get("error", "Browser pool request failed"))
+    return response
+
+def attach_driver(executor_url, session_id):
+    """Attach a Selenium driver to an existing Chrome session without starting a new one"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.remote_connection import ChromeRemoteConnection
+
+    class AttachedDriver(webdriver.Remote):
+        def start_session(self, capabilities, *args, **kwargs):
+            self.session_id = session_id
+            self.caps = {}
+
+        def execute_cdp_cmd(self, cmd, cmd_args):
+            return self.execute("executeCdpCommand", {"cmd": cmd, "params": cmd_args})["value"]
+
+    connection = ChromeRemoteConnection(remote_server_addr=executor_url)
+    return AttachedDriver(command_executor=connection, options=Options())
+
+def checkout(download_dir, address=None, timeout=CHECKOUT_TIMEOUT):
+    """Check a warm driver out of the pool; returns None if the pool is unavailable"""
+    address = address or POOL_ADDRESS
+    if not address:
+        return None
+    try:
+        lease = _request({"op": "checkout", "timeout": timeout}, address, timeout)
+        driver = attach_driver(lease["executor_url"], lease["session_id"])
+        driver._pool_lease = {"address": address, "slot": lease["slot"], "lease": lease["lease"]}
+        driver.execute_cdp_cmd("Browser.setDownloadBehavior", {"behavior": "allow", "downloadPath": download_dir})
+        print(f"SUCCESS: Checked out warm browser session {lease['slot']} from pool ({lease['uses']} previous uses)")
+        return driver
+    except Exception as e:
+        print(f"WARNING: Browser pool checkout failed, starting a new driver: {str(e)}")
+        return None
+
+def is_pooled(driver):
+    return getattr(driver, "_pool_lease", None) is not None
+
+def checkin(driver, healthy=True):
+    """Return a checked-out driver to the pool"""
+    lease = driver._pool_lease
+    driver._pool_lease = None
+    try:
+        _request({"op": "checkin", "slot": lease["slot"], "lease": lease["lease"], "healthy": healthy}, lease["address"])
+        print(f"INFO: Returned browser session {lease['slot']} to pool")
+    except Exception as e:
+        print(f"WARNING: Failed to return browser session to pool: {str(e)}")
+
+# ---------------------------------------------------------------------------
+# Service side
+# ---------------------------------------------------------------------------
+
+class PoolSlot:
+    def __init__(self, index, download_dir):
+        self.index = index
+        self.download_dir = download_dir
+        self.driver = None
+        self.uses = 0
+        self.lease = None
+        self.leased_at = None
+
+class BrowserPool:
+    """Keeps N warm Chrome sessions, hands them out and recycles them"""
+
+    def __init__(self, create_driver, size=POOL_SIZE, max_uses=MAX_USES):
+        self.create_driver = create_driver
+        self.max_uses = max_uses
+        self.root_dir = tempfile.mkdtemp(prefix="browser-pool-")
+        self.slots = [PoolSlot(i, os.path.join(self.root_dir, str(i))) for i in range(size)]
+        self.cond = threading.Condition()
+        self.closed = False
+
+    def start(self):
+        for slot in self.slots:
+            self._launch(slot)
+
+    def _launch(self, slot):
+        """(Re)create the Chrome session behind a slot"""
+        self._quit(slot)
+        os.makedirs(slot.download_dir, exist_ok=True)
+        try:
+            slot.driver = self.create_driver(slot.download_dir)
+            slot.uses = 0
+            print(f"SUCCESS: Browser pool session {slot.index} ready")
+        except Exception as e:
+            slot.driver = None
+            print(f"ERROR: Browser pool session {slot.index} failed to start: {str(e)}")
+
+    def _quit(self, slot):
+        if slot.driver:
+            try:
+                slot.driver.quit()
+            except Exception:
+                pass
+            slot.driver = None
+
+    def _reset(self, slot):
+        """Clear cookies, extra windows and the current page so the next user starts clean"""
+        driver = slot.driver
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.delete_all_cookies()
+        driver.get("about:blank")
+
+    def _healthy(self, slot):
+        try:
+            return slot.driver is not None and slot.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _restart_in_background(self, slot):
+        """Relaunch a dead session without holding up checkouts; the caller holds the lock"""
+        slot.lease = RESTART_LEASE
+        slot.leased_at = time.time()
+
+        def restart():
+            self._launch(slot)
+            with self.cond:
+                slot.lease = None
+                slot.leased_at = None
+                self.cond.notify_all()
+
+        threading.Thread(target=restart, daemon=True).start()
+
+    def _may_serve(self, slot):
+        # Live and idle, or leased to a client that will check it back in
+        return (slot.driver is not None and slot.lease != RESTART_LEASE) or slot.lease not in (None, RESTART_LEASE)
+
+    def checkout(self, timeout=CHECKOUT_TIMEOUT):
+        deadline = time.time() + timeout
+        with self.cond:
+            while True:
+                for slot in self.slots:
+                    if slot.lease is None and slot.driver is not None:
+                        if not self._healthy(slot):
+                            print(f"WARNING: Browser pool session {slot.index} is dead, restarting")
+                            self._restart_in_background(slot)
+                            continue
+                        slot.lease = uuid.uuid4().hex
+                        slot.leased_at = time.time()
+                        slot.uses += 1
+                        driver = slot.driver
+                        return {
+                            "slot": slot.index,
+                            "lease": slot.lease,
+                            "uses": slot.uses - 1,
+                            "executor_url": driver.command_executor._url,
+                            "session_id": driver.session_id,
+                        }
+                # With every session dead (or restarting) the caller is better off starting its own Chrome now
+                if not any(self._may_serve(slot) for slot in self.slots):
+                    raise Exception("No live browser sessions in the pool")
+                remaining = deadline - time.time()
+                if remaining <= 0 or self.closed:
+                    raise Exception("No browser session available")
+                self.cond.wait(remaining)
+
+    def checkin(self, index, lease, healthy=True):
+        slot = self.slots[index]
+        with self.cond:
+            if slot.lease != lease:
+                raise Exception(f"Stale lease for browser session {index}")
+        # Reset or recycle outside the lock; the slot stays leased meanwhile
+        if healthy and slot.uses < self.max_uses:
+            try:
+                self._reset(slot)
+            except Exception as e:
+                print(f"WARNING: Browser pool session {index} reset failed: {str(e)}")
+                healthy = False
+        if not healthy or slot.uses >= self.max_uses:
+            print(f"INFO: Recycling browser pool session {index} after {slot.uses} uses")
+            self._launch(slot)
+        with self.cond:
+            slot.lease = None
+            slot.leased_at = None
+            self.cond.notify()
+
+    def health_check(self):
+        """Restart dead idle sessions and reclaim leases that were never checked in"""
+        for slot in self.slots:
+            with self.cond:
+                expired = slot.lease is not None and time.time() - slot.leased_at > LEASE_TIMEOUT
+                if slot.lease is not None and not expired:
+                    continue
+                slot.lease = "health-check"
+            if expired or not self._healthy(slot):
+                print(f"WARNING: Browser pool session {slot.index} unhealthy or abandoned, restarting")
+                self._launch(slot)
+            with self.cond:
+                slot.lease = None
+                self.cond.notify()
+
+    def status(self):
+        with self.cond:
+            return [
+                {"slot": s.index, "alive": s.driver is not None, "leased": s.lease is not None, "uses": s.uses}
+                for s in self.slots
+            ]
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        for slot in self.slots:
+            self._quit(slot)
+        shutil.rmtree(self.root_dir, ignore_errors=True)
+
+class PoolRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        pool = self.server.pool
+        try:
+            message = json.loads(self.rfile.readline())
+            op = message.get("op")
+            if op == "checkout":
+                response = pool.checkout(min(float(message.get("timeout", CHECKOUT_TIMEOUT)), CHECKOUT_TIMEOUT))
+            elif op == "checkin":
+                pool.checkin(int(message["slot"]), message["lease"], bool(message.get("healthy", True)))
+                response = {}
+            elif op == "status":
+                response = {"slots": pool.status()}
+            else:
+                raise Exception(f"Unknown operation: {op}")
+            response["ok"] = True
+        except Exception as e:
+            response = {"ok": False, "error": str(e)}
+        self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+
+class PoolServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+def serve(address=None, size=POOL_SIZE):
+    """Run the pool service until interrupted"""
+    from scraper import setup_driver
+
+    host, port = _parse_address(address or POOL_ADDRESS or f"127.0.0.1:{DEFAULT_PORT}")
+    pool = BrowserPool(setup_driver, size=size)
+    print(f"INFO: Starting browser pool with {size} sessions (max uses: {MAX_USES})...")
+    pool.start()
+
+    def health_loop():
+        while not pool.closed:
+            time.sleep(HEALTH_INTERVAL)
+            if not pool.closed:
+                pool.health_check()
+
+    threading.Thread(target=health_loop, daemon=True).start()
+    server = PoolServer((host, port), PoolRequestHandler)
+    server.pool = pool
+    print(f"SUCCESS: Browser pool listening on {host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.close()
+        print("INFO: Browser pool stopped")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "status":
+        print(json.dumps(_request({"op": "status"}, POOL_ADDRESS or f"127.0.0.1:{DEFAULT_PORT}"), indent=2))
+    else:
+        size = int(sys.argv[2]) if len(sys.argv) > 2 else POOL_SIZE
+        serve(size=size)
@@ -0,0 +1,134 @@
+# Optional columnar copies of the JSON datasets (Arrow IPC and Parquet)
+# Written next to each data/<dataset>.json when SCRAPER_COLUMNAR_EXPORT lists
+# the formats to produce ("arrow", "parquet" or "arrow,parquet"). Requires pyarrow;
+# without it the export is skipped with a warning and the JSON files are unaffected.
+#
+#   <dataset>.arrow    Arrow IPC file, uncompressed so it can be memory-mapped
+#   <dataset>.parquet  Parquet with dictionary pages for the repetitive columns
+#
+# Low-cardinality text columns (Listing_at, Lead_Manager, ...) are dictionary-encoded.
+# The dataset metadata is kept in the schema metadata under b"metadata".
+import os
+import json
+
+import json_writer
+
+FORMATS = ("arrow", "parquet")
+EXTENSIONS = {"arrow": ".arrow", "parquet": ".parquet"}
+DICTIONARY_COLUMNS = ("Listing_at", "Lead_Manager")
+DICTIONARY_MAX_RATIO = 0.5  # Other text columns are dictionary-encoded below this unique/rows ratio
+
+def parse_formats(value):
+    """Export formats from a comma-separated setting, e.g. "arrow,parquet"; unknown names are dropped with a warning"""
+    formats = [f.strip().lower() for f in (value or "").split(",") if f.strip()]
+    unknown = [f for f in formats if f not in FORMATS]
+    if unknown:
+        print(f"WARNING: Unknown columnar export format: {', '.join(unknown)} "
+              f"(expected {', '.join(FORMATS)}), not exporting it")
+    return [f for f in dict.fromkeys(formats) if f in FORMATS]
+
+def columnar_paths(json_path, formats=FORMATS):
+    stem = os.path.splitext(json_path)[0]
+    return {fmt: stem + EXTENSIONS[fmt] for fmt in formats}
+
+def _column_array(pa, values):
+    try:
+        array = pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed types (e.g. "1,260.00" and 46.62 in one column): keep them as text
+        array = pa.array([None if v is None else str(v) for v in values], pa.string())
+    if pa.types.is_null(array.type):
+        array = array.cast(pa.string())
+    return array
+
+def records_to_table(records, metadata=None):
+    """Arrow table for a list of record dicts, dictionary-encoding repetitive text columns"""
+    import pyarrow as pa
+
+    names = []
+    for record in records:
+        for name in record:
+            if name not in names:
+                names.append(name)
+
+    arrays = []
+    for name in names:
+        array = _column_array(pa, [record.get(name) for record in records])
+        if pa.types.is_string(array.type) and len(array):
+            distinct = len(array.unique())
+            if name in DICTIONARY_COLUMNS or distinct <= len(array) * DICTIONARY_MAX_RATIO:
+                array = array.dictionary_encode()
+        arrays.append(array)
+
+    schema_metadata = {b"metadata": json.dumps(metadata or {}, ensure_ascii=False, default=str).encode("utf-8")}
+    return pa.Table.from_arrays(arrays, names=names).replace_schema_metadata(schema_metadata)
+
+def _write_atomic(path, write):
+    fd, temp_path = json_writer.create_temp_file(path)
+    os.close(fd)
+    try:
+        write(temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+def write_columnar(json_path, metadata, records, formats):
+    """Write the requested columnar copies of a dataset; returns {format: path}"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = records_to_table(records, metadata)
+    paths = columnar_paths(json_path, formats)
+    for fmt, path in paths.items():
+        if fmt == "arrow":
+            def write(temp_path):
+                with pa.OSFile(temp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+        else:
+            dictionary_columns = [field.name for field in table.schema if pa.types.is_dictionary(field.type)]
+            def write(temp_path):
+                pq.write_table(table, temp_path, use_dictionary=dictionary_columns or False, compression="zstd")
+        _write_atomic(path, write)
+    return paths
+
+def export_dataset(json_path, metadata, records, formats):
+    """write_columnar that reports instead of raising; the JSON file stays the source of truth"""
+    if not formats:
+        return {}
+    try:
+        paths = write_columnar(json_path, metadata, records, formats)
+        for fmt, path in paths.items():
+            print(f"SUCCESS: Exported {os.path.basename(json_path)} as {fmt} ({os.path.getsize(path)} bytes)")
+        return paths
+    except ImportError:
+        print("WARNING: pyarrow is not installed, skipping columnar export")
+    except Exception as e:
+        print(f"WARNING: Columnar export of {os.path.basename(json_path)} failed: {str(e)}")
+    return {}
+
+def read_columns(path, columns=None):
+    """Arrow table with only the given columns; .arrow files are memory-mapped, not read"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if path.endswith(EXTENSIONS["parquet"]):
+        return pq.read_table(path, columns=columns, memory_map=True)
+    # Zero-copy: the table's buffers point into the mapping, pages load on access
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    return table.select(columns) if columns else table
+
+def read_metadata(path):
+    """The dataset metadata stored with a columnar file"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if path.endswith(EXTENSIONS["parquet"]):
+        schema = pq.read_schema(path)
+    else:
+        with pa.memory_map(path, "r") as source:
+            schema = pa.ipc.open_file(source).schema
+    return json.loads((schema.metadata or {}).get(b"metadata", b"{}"))
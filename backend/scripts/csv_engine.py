@@ -0,0 +1,77 @@
+# Stdlib CSV reader for the conversion modes
+# Reads a CSV into column lists the way pd.read_csv would (default NA markers,
+# per-column int/float/bool inference, "Unnamed: n" headers), so the process_*
+# modes produce the same JSON without importing pandas. Missing values are None.
+import re
+import csv
+
+# pandas' default na_values (pandas._libs.parsers.STR_NA_VALUES)
+NA_VALUES = frozenset([
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+])
+TRUE_VALUES = frozenset(["True", "TRUE", "true"])
+FALSE_VALUES = frozenset(["False", "FALSE", "false"])
+INT_PATTERN = re.compile(r"\s*[+-]?\d+\s*")
+FLOAT_PATTERN = re.compile(r"\s*[+-]?(?:(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?|inf|infinity)\s*", re.IGNORECASE)
+INT64_MAX = 2 ** 63 - 1
+
+def _header(row):
+    """Column names with pandas' placeholder and de-duplication rules"""
+    names = []
+    seen = {}
+    for i, name in enumerate(row):
+        name = name if name != "" else f"Unnamed: {i}"
+        base = name
+        while name in seen:
+            seen[base] += 1
+            name = f"{base}.{seen[base]}"
+        seen.setdefault(name, 0)
+        names.append(name)
+    return names
+
+def _convert(values):
+    """Typed column from raw strings: int, float, bool or text, None for NA"""
+    present = [v for v in values if v is not None]
+    if not present:
+        return values
+    if all(INT_PATTERN.fullmatch(v) for v in present):
+        ints = [int(v) if v is not None else None for v in values]
+        if all(abs(v) <= INT64_MAX for v in ints if v is not None):
+            # pandas has no missing int: a column with gaps becomes float64
+            if len(present) == len(values):
+                return ints
+            return [float(v) if v is not None else None for v in ints]
+    if all(FLOAT_PATTERN.fullmatch(v) for v in present):
+        floats = [float(v) if v is not None else None for v in values]
+        # NaN / +-Inf have no JSON form; the DataFrame path writes them as null too
+        return [v if v is None or v - v == 0 else None for v in floats]
+    if all(v in TRUE_VALUES or v in FALSE_VALUES for v in present):
+        return [None if v is None else v in TRUE_VALUES for v in values]
+    return values
+
+def read_csv(path, encoding="utf-8", usecols=None):
+    """(column names, column value lists) for a CSV file; raises UnicodeDecodeError like pd.read_csv"""
+    with open(path, "r", encoding=encoding, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        while header is not None and not header:
+            header = next(reader, None)
+        if header is None:
+            raise ValueError("No columns to parse from file")
+        names = _header(header)
+        width = len(names)
+        columns = [[] for _ in range(width)]
+        for row in reader:
+            if not row:
+                continue  # Blank lines are skipped
+            if len(row) > width:
+                raise ValueError(f"Error tokenizing data. Expected {width} fields in line {reader.line_num}, saw {len(row)}")
+            for i in range(width):
+                value = row[i] if i < len(row) else ""
+                columns[i].append(None if value in NA_VALUES else value)
+
+    indices = list(usecols) if usecols is not None else range(width)
+    if any(i >= width for i in indices):
+        raise ValueError(f"usecols do not match columns, columns expected but not found: {[i for i in indices if i >= width]}")
+    return [names[i] for i in indices], [_convert(columns[i]) for i in indices]
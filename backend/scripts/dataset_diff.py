@@ -0,0 +1,76 @@
+# Record-level diffing for the JSON datasets in data/
+# Each record is identified by a stable key field (Company / Security Name) and
+# fingerprinted with a hash of its canonical JSON form, so a new scrape can be
+# compared with the file on disk and only the differences reported.
+import os
+import json
+import hashlib
+from datetime import datetime
+
+def record_hash(record):
+    """Stable fingerprint of a record (independent of key order)"""
+    canonical = json.dumps(record, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+def keyed_records(records, key_field):
+    """Map key -> record; repeated keys get a #n suffix so every record stays addressable"""
+    keyed = {}
+    for record in records:
+        base = str(record.get(key_field) or "").strip()
+        key = base
+        n = 1
+        while key in keyed:
+            n += 1
+            key = f"{base}#{n}"
+        keyed[key] = record
+    return keyed
+
+def diff_records(old_records, new_records, key_field):
+    """Compare two record lists; returns added records, removed keys and modified records"""
+    old = {key: record_hash(record) for key, record in keyed_records(old_records, key_field).items()}
+    new = keyed_records(new_records, key_field)
+
+    added, modified = [], []
+    for key, record in new.items():
+        old_hash = old.pop(key, None)
+        if old_hash is None:
+            added.append(record)
+        elif old_hash != record_hash(record):
+            modified.append(record)
+    return {"added": added, "removed": list(old), "modified": modified}
+
+def has_changes(changeset):
+    return bool(changeset["added"] or changeset["removed"] or changeset["modified"])
+
+def load_existing_records(file_path):
+    """Records of a previously written dataset file, or None if there is none to compare with"""
+    if not os.path.exists(file_path):
+        return None
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data.get("data") if isinstance(data, dict) else None
+    except (OSError, ValueError):
+        return None
+
+def write_changeset(changes_dir, filename, key_field, changeset):
+    """Write <dataset>.changes.json listing added, removed and modified records"""
+    os.makedirs(changes_dir, exist_ok=True)
+    stem = os.path.splitext(filename)[0]
+    changes_path = os.path.join(changes_dir, f"{stem}.changes.json")
+    payload = {
+        "metadata": {
+            "dataset": filename,
+            "key_field": key_field,
+            "generated_at": datetime.now().isoformat(),
+            "added": len(changeset["added"]),
+            "removed": len(changeset["removed"]),
+            "modified": len(changeset["modified"]),
+        },
+        "added": changeset["added"],
+        "removed": changeset["removed"],
+        "modified": changeset["modified"],
+    }
+    with open(changes_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+    return changes_path
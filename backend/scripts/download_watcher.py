@@ -0,0 +1,170 @@
+# Download completion watcher for Chrome downloads
+# Uses inotify on Linux to react the moment a .crdownload file is renamed to its
+# final name, and falls back to short-interval polling everywhere else.
+import os
+import sys
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+
+# inotify constants (see <sys/inotify.h>)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+PARTIAL_SUFFIXES = (".crdownload", ".part", ".tmp")
+POLL_INTERVAL = 0.25  # Seconds between directory scans in polling mode
+SETTLE_TIME = 0.5     # A polled file must keep the same size this long to count as complete
+
+_libc = None
+
+def _load_libc():
+    """Load libc with the inotify functions, or None when inotify is unavailable"""
+    global _libc
+    if _libc is not None:
+        return _libc or None
+    _libc = False
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        _libc = libc
+    except (OSError, AttributeError):
+        return None
+    return _libc
+
+def is_partial_download(fname):
+    """True for in-progress download files such as Chrome's .crdownload"""
+    return fname.lower().endswith(PARTIAL_SUFFIXES)
+
+class DownloadWatcher:
+    """Watch a download directory for completed files matching a predicate"""
+
+    def __init__(self, directory, use_inotify=True):
+        self.directory = directory
+        self.fd = None
+        self.sizes = {}  # fname -> (size, first time seen at that size)
+        libc = _load_libc() if use_inotify else None
+        if libc and os.path.isdir(directory):
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd >= 0:
+                mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+                if libc.inotify_add_watch(fd, os.fsencode(directory), mask) >= 0:
+                    self.fd = fd
+                else:
+                    os.close(fd)
+
+    @property
+    def mode(self):
+        return "inotify" if self.fd is not None else "polling"
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _complete(self, fname, min_size, finished=False):
+        """Return the full path if fname is a complete download of at least min_size bytes"""
+        full_path = os.path.join(self.directory, fname)
+        try:
+            size = os.path.getsize(full_path)
+            if size < min_size:
+                return None
+            if not finished:
+                # Without a close/rename event the file must have stopped growing
+                now = time.monotonic()
+                last_size, since = self.sizes.get(fname, (None, now))
+                if last_size != size:
+                    self.sizes[fname] = (size, now)
+                    if time.time() - os.path.getmtime(full_path) < SETTLE_TIME:
+                        return None
+                elif now - since < SETTLE_TIME:
+                    return None
+            # Make sure the file is not locked
+            with open(full_path, "rb") as f:
+                f.read(1)
+            return full_path
+        except (OSError, PermissionError):
+            return None
+
+    def _scan(self, matches, min_size):
+        try:
+            names = sorted(os.listdir(self.directory))
+        except OSError:
+            return None
+        for fname in names:
+            if is_partial_download(fname) or not matches(fname):
+                continue
+            full_path = self._complete(fname, min_size)
+            if full_path:
+                return full_path
+        return None
+
+    def _read_events(self, timeout):
+        """Block up to timeout seconds and return the file names touched by inotify events"""
+        readable, _, _ = select.select([self.fd], [], [], max(0, timeout))
+        if not readable:
+            return []
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(buf):
+            _, mask, _, name_len = EVENT_HEADER.unpack_from(buf, offset)
+            offset += EVENT_HEADER.size
+            name = buf[offset:offset + name_len].rstrip(b"\0")
+            offset += name_len
+            if name:
+                events.append((os.fsdecode(name), mask))
+        return events
+
+    def wait_for(self, matches, timeout, min_size=0):
+        """Wait until a completed file whose name satisfies matches(fname) appears; None on timeout"""
+        deadline = time.monotonic() + timeout
+        full_path = self._scan(matches, min_size)
+        while full_path is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            if self.fd is None:
+                time.sleep(min(POLL_INTERVAL, remaining))
+                full_path = self._scan(matches, min_size)
+                continue
+
+            # Wake up at least every SETTLE_TIME to re-check files seen mid-write
+            for fname, mask in self._read_events(min(SETTLE_TIME, remaining)):
+                if is_partial_download(fname) or not matches(fname):
+                    continue
+                finished = bool(mask & (IN_MOVED_TO | IN_CLOSE_WRITE))
+                full_path = self._complete(fname, min_size, finished=finished)
+                if full_path:
+                    break
+            else:
+                full_path = self._scan(matches, min_size)
+        return full_path
+
+def wait_for_download(directory, matches, timeout, min_size=0):
+    """Return the path of the first completed download matching the predicate, or None"""
+    deadline = time.monotonic() + timeout
+    # The directory may be created by Chrome after the click
+    while not os.path.isdir(directory):
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(POLL_INTERVAL)
+    with DownloadWatcher(directory) as watcher:
+        return watcher.wait_for(matches, deadline - time.monotonic(), min_size)
@@ -0,0 +1,27 @@
+// Stand-in for the report pages' export button: enabled once the page has
+// initialised, a click saves the report table as a CSV file in the browser.
+// How the real site produces its export is not recorded here, so this script
+// makes no export request and the replay server has no export route.
+(function () {
+    var button = document.getElementById('export_btn');
+    function quote(text) {
+        text = text.replace(/\s+/g, ' ').trim();
+        return /[",\n]/.test(text) ? '"' + text.replace(/"/g, '""') + '"' : text;
+    }
+    window.addEventListener('load', function () {
+        setTimeout(function () { button.disabled = false; }, 300);
+    });
+    button.addEventListener('click', function () {
+        var lines = [];
+        document.querySelectorAll('#report_table tr').forEach(function (row) {
+            var cells = [];
+            row.querySelectorAll('th, td').forEach(function (cell) { cells.push(quote(cell.textContent)); });
+            lines.push(cells.join(','));
+        });
+        var link = document.createElement('a');
+        link.href = URL.createObjectURL(new Blob([lines.join('\r\n') + '\r\n'], {type: 'text/csv'}));
+        link.download = 'ipo-in-india-list-main-board-sme.csv';
+        document.body.appendChild(link);
+        link.click();
+    });
+})();
@@ -0,0 +1,317 @@
+# Browserless fetch engine for the CSV exports
+# Requests the export data directly over a pooled HTTP session instead of
+# driving Chrome. Every function returns the saved CSV path, or None when the
+# direct fetch does not work so the caller can fall back to Selenium.
+import os
+import csv
+import re
+import time
+import threading
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+HTTP_TIMEOUT = 10  # Seconds per request attempt at most
+HTTP_RETRIES = 1  # Retries of a request answered with 502/503/504
+# Seconds one download (all its requests and retries) may take before the caller falls back to Chrome
+HTTP_DEADLINE = float(os.environ.get("SCRAPER_HTTP_DEADLINE", "15"))
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """Shared requests session with keep-alive connection pooling and retries"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=8,
+                max_retries=Retry(total=HTTP_RETRIES, backoff_factor=0.5, status_forcelist=[502, 503, 504]),
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({
+                "User-Agent": USER_AGENT,
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                "Accept-Language": "en-US,en;q=0.9",
+            })
+            _session = session
+        return _session
+
+def reset_session():
+    """Drop the shared session (cookies and pooled connections)"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+class Deadline:
+    """Time budget of one download shared by all of its requests"""
+
+    def __init__(self, seconds=HTTP_DEADLINE):
+        self.expires_at = time.monotonic() + seconds
+
+    def timeout(self):
+        """Per-attempt timeout of the next request, so its retries also end by the deadline"""
+        remaining = self.expires_at - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"direct fetch exceeded its {HTTP_DEADLINE:g}s deadline")
+        return min(HTTP_TIMEOUT, remaining / (HTTP_RETRIES + 1))
+
+class FormParser(HTMLParser):
+    """Collects form fields, select options and element ids from an HTML page
+
+    Like a browser, a select posts its selected option (the first option when
+    none is marked selected), so form["fields"] holds the whole form state."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.forms = []
+        self.elements = {}  # id -> attributes
+        self._select = None
+        self._select_posted = False
+        self._option = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {k: (v if v is not None else "") for k, v in attrs}
+        if "id" in attrs:
+            self.elements[attrs["id"]] = dict(attrs, tag=tag)
+        if tag == "form":
+            self.forms.append({"action": attrs.get("action", ""), "method": attrs.get("method", "get").lower(),
+                               "fields": {}, "selects": {}, "buttons": {}})
+            return
+        if not self.forms:
+            return
+        form = self.forms[-1]
+        name = attrs.get("name")
+        if tag == "input" and name:
+            input_type = attrs.get("type", "text").lower()
+            if input_type in ("submit", "button", "image"):
+                form["buttons"][name] = attrs.get("value", "")
+            elif input_type in ("checkbox", "radio"):
+                if "checked" in attrs:
+                    form["fields"][name] = attrs.get("value", "on")
+            else:
+                form["fields"][name] = attrs.get("value", "")
+        elif tag == "select" and name:
+            self._select = name
+            self._select_posted = "disabled" not in attrs
+            form["selects"][name] = []
+        elif tag == "option" and self._select:
+            self._option = {"value": attrs.get("value"), "text": "", "selected": "selected" in attrs}
+            form["selects"][self._select].append(self._option)
+
+    def handle_data(self, data):
+        if self._option is not None:
+            self._option["text"] += data
+
+    def handle_endtag(self, tag):
+        if tag == "option" and self._option is not None:
+            self._option["text"] = self._option["text"].strip()
+            if self._option["value"] is None:
+                self._option["value"] = self._option["text"]
+            self._option = None
+        elif tag == "select" and self._select:
+            form = self.forms[-1]
+            options = form["selects"][self._select]
+            selected = [o for o in options if o["selected"]]
+            if self._select_posted and options:
+                form["fields"][self._select] = (selected[-1] if selected else options[0])["value"]
+            self._select = None
+            self._option = None
+
+    def form_with(self, field_name):
+        for form in self.forms:
+            if field_name in form["fields"] or field_name in form["selects"] or field_name in form["buttons"]:
+                return form
+        return None
+
+class TableParser(HTMLParser):
+    """Collects the text of every table on a page as lists of rows"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tables = []
+        self._depth = 0
+        self._row = None
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            self._depth += 1
+            if self._depth == 1:
+                self.tables.append([])
+        elif self._depth == 1 and tag == "tr":
+            self._row = []
+        elif self._depth == 1 and tag in ("td", "th") and self._row is not None:
+            self._cell = []
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == "table":
+            self._depth -= 1
+        elif self._depth == 1 and tag in ("td", "th") and self._cell is not None:
+            self._row.append(" ".join("".join(self._cell).split()))
+            self._cell = None
+        elif self._depth == 1 and tag == "tr" and self._row is not None:
+            if self._row:
+                self.tables[-1].append(self._row)
+            self._row = None
+
+def _save_csv_bytes(content, download_dir, filename):
+    os.makedirs(download_dir, exist_ok=True)
+    path = os.path.join(download_dir, filename)
+    with open(path, "wb") as f:
+        f.write(content)
+    return path
+
+def _attachment_filename(response, default):
+    disposition = response.headers.get("Content-Disposition", "")
+    match = re.search(r'filename\*?=(?:UTF-8\'\')?"?([^";]+)"?', disposition)
+    return os.path.basename(match.group(1)) if match else default
+
+def _is_csv_response(response):
+    content_type = response.headers.get("Content-Type", "").lower()
+    disposition = response.headers.get("Content-Disposition", "").lower()
+    return "csv" in content_type or "octet-stream" in content_type or "attachment" in disposition
+
+# "Showing 1 to 40 of 40 entries", "Total 40 records": the record count a report page states
+RECORD_COUNT_PATTERN = re.compile(r"\b(?:of|total)\s+([\d,]+)\s+(?:records|entries|rows|IPOs)\b", re.IGNORECASE)
+# Pagers and lazy-loading widgets: the page holds only part of the report
+PAGINATION_PATTERN = re.compile(r"""class=["'][^"']*\b(?:pagination|dataTables_paginate|load-more)\b|rel=["']next["']""", re.IGNORECASE)
+
+def _save_report_table(html, report_url, download_dir, filename, columns, min_size):
+    """Save the report table as CSV only if it provably is the whole export; None otherwise
+
+    The table must have exactly the export's columns, every row must have one cell
+    per column, the page must not be paginated or lazy loaded, and it must state
+    a record count equal to the number of rows."""
+    parser = TableParser()
+    parser.feed(html)
+    table = next((t for t in parser.tables if len(t) > 1 and set(t[0]) == set(columns)), None)
+    if table is None:
+        print(f"WARNING: Direct fetch found no report table with the export columns at {report_url}")
+        return None
+    header, rows = table[0], table[1:]
+    mismatched = sum(1 for row in rows if len(row) != len(header))
+    if mismatched:
+        print(f"WARNING: {mismatched} report table rows do not match the header, not using the table")
+        return None
+    if PAGINATION_PATTERN.search(html):
+        print("WARNING: Report table is paginated or lazy loaded, not using the table")
+        return None
+    match = RECORD_COUNT_PATTERN.search(re.sub(r"<[^>]+>", " ", html))
+    stated = int(match.group(1).replace(",", "")) if match else None
+    if stated != len(rows):
+        print(f"WARNING: Report table has {len(rows)} rows, page states {stated} records, not using the table")
+        return None
+
+    os.makedirs(download_dir, exist_ok=True)
+    path = os.path.join(download_dir, filename)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+    if os.path.getsize(path) < min_size:
+        print(f"WARNING: Direct fetch produced a too small CSV ({os.path.getsize(path)} bytes)")
+        os.remove(path)
+        return None
+    print(f"SUCCESS: Direct fetch saved {len(rows)} rows from the report table at {report_url}")
+    return path
+
+def download_report_table(report_url, download_dir, filename, columns, min_size=500):
+    """Save a Chittorgarh report table as CSV without a browser; None when it can't be trusted
+
+    The export request itself is made by the page script and is not replayed;
+    the table is only used when it matches the export (see _save_report_table)."""
+    try:
+        deadline = Deadline()
+        response = get_session().get(report_url, timeout=deadline.timeout())
+        response.raise_for_status()
+        return _save_report_table(response.text, report_url, download_dir, filename, columns, min_size)
+    except Exception as e:
+        print(f"WARNING: Direct fetch of {report_url} failed: {str(e)}")
+        return None
+
+def _postback(session, deadline, page_url, form, fields, event_target="", event_argument=""):
+    """Submit an ASP.NET form postback carrying the current form state"""
+    data = dict(fields)
+    data["__EVENTTARGET"] = event_target
+    data["__EVENTARGUMENT"] = event_argument
+    action = urljoin(page_url, form["action"] or page_url)
+    response = session.post(action, data=data, timeout=deadline.timeout(), headers={"Referer": page_url})
+    response.raise_for_status()
+    return response
+
+def _parse_form(html, field_name):
+    parser = FormParser()
+    parser.feed(html)
+    return parser, parser.form_with(field_name)
+
+def download_bse_securities(page_url, download_dir, segment_text="Equity T+1", min_size=1000):
+    """Run the BSE List of Scrips postbacks (segment, submit, download) without a browser"""
+    try:
+        deadline = Deadline()
+        session = get_session()
+        response = session.get(page_url, timeout=deadline.timeout())
+        response.raise_for_status()
+
+        parser, form = _parse_form(response.text, "ddlsegment")
+        if form is None:
+            print("WARNING: Direct fetch found no ddlsegment form on the BSE page")
+            return None
+
+        options = form["selects"]["ddlsegment"]
+        option = next((o for o in options if o["text"] == segment_text), None)
+        if option is None:
+            print(f"WARNING: {segment_text} option not found. Available options: {', '.join(o['text'] for o in options)}")
+            return None
+
+        # Selecting the segment triggers an auto postback that refreshes the form state
+        fields = dict(form["fields"], ddlsegment=option["value"])
+        response = _postback(session, deadline, page_url, form, fields, event_target="ddlsegment")
+        parser, form = _parse_form(response.text, "ddlsegment")
+        if form is None:
+            print("WARNING: Direct fetch lost the ddlsegment form after the segment postback")
+            return None
+
+        # Submit the search
+        fields = dict(form["fields"], ddlsegment=option["value"])
+        submit_name = parser.elements.get("btnSubmit", {}).get("name", "btnSubmit")
+        fields[submit_name] = form["buttons"].get(submit_name, "Submit")
+        response = _postback(session, deadline, page_url, form, fields)
+        parser, form = _parse_form(response.text, "ddlsegment")
+        if form is None or "lnkDownload" not in parser.elements:
+            print("WARNING: Direct fetch found no download link after BSE submit")
+            return None
+
+        # The download link is a LinkButton: javascript:__doPostBack('lnkDownload','')
+        href = parser.elements["lnkDownload"].get("href", "")
+        match = re.search(r"__doPostBack\('([^']*)','([^']*)'\)", href)
+        event_target, event_argument = match.groups() if match else ("lnkDownload", "")
+        fields = dict(form["fields"], ddlsegment=option["value"])
+        response = _postback(session, deadline, page_url, form, fields, event_target, event_argument)
+
+        if not _is_csv_response(response) or len(response.content) < min_size:
+            print(f"WARNING: BSE download did not return a CSV ({response.headers.get('Content-Type')}, {len(response.content)} bytes)")
+            return None
+
+        path = _save_csv_bytes(response.content, download_dir, _attachment_filename(response, "Equity.csv"))
+        print(f"SUCCESS: Direct fetch saved BSE securities CSV to {path}")
+        return path
+    except Exception as e:
+        print(f"WARNING: Direct fetch of BSE securities failed: {str(e)}")
+        return None
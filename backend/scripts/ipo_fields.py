@@ -0,0 +1,85 @@
+# Typed companion fields for the Chittorgarh IPO records
+# The report carries dates as "Mon, Dec 15, 2025", prices as "438.00 to 460.00"
+# and amounts as "1,260.00". These are parsed once at ingest time and stored
+# next to the original strings, and the records are ordered newest first, so
+# readers of ipo-main.json / ipo-sme.json never have to parse or sort again.
+#
+# Added fields (None when the source value is missing or unparseable):
+#   Opening_Date_iso / Opening_Date_epoch   "2025-12-15" / 1765756800 (UTC midnight)
+#   Closing_Date_iso / Closing_Date_epoch
+#   Listing_Date_iso / Listing_Date_epoch
+#   price_low / price_high                   438.0 / 460.0 (equal for a fixed price)
+#   issue_amount_cr                          1260.0 (Rs. crore)
+import re
+import math
+import calendar
+
+DATE_FIELDS = ("Opening_Date", "Closing_Date", "Listing_Date")
+PRICE_FIELD = "Issue_Price_Rs"
+AMOUNT_FIELD = "Total_Issue_Amount_InclFirm_reservations_Rscr"
+SORT_FIELD = "Opening_Date_epoch"
+
+MONTHS = {name: i for i, name in enumerate(calendar.month_abbr) if name}
+NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+def parse_report_date(value):
+    """(iso, epoch) for a "Mon, Dec 15, 2025" style date, or (None, None)"""
+    if not isinstance(value, str):
+        return None, None
+    # Weekday is optional; only "Mon DD, YYYY" matters
+    parts = value.replace(",", " ").split()
+    if len(parts) == 4:
+        parts = parts[1:]
+    if len(parts) != 3:
+        return None, None
+    month = MONTHS.get(parts[0][:3].title())
+    try:
+        day, year = int(parts[1]), int(parts[2])
+    except ValueError:
+        return None, None
+    if not month or not 1 <= year <= 9999 or not 1 <= day <= calendar.monthrange(year, month)[1]:
+        return None, None
+    return f"{year:04d}-{month:02d}-{day:02d}", calendar.timegm((year, month, day, 0, 0, 0))
+
+def _number(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value) if math.isfinite(value) else None
+    return None
+
+def parse_price_range(value):
+    """(low, high) for "438.00 to 460.00" or a single price, or (None, None)"""
+    number = _number(value)
+    if number is not None:
+        return number, number
+    if not isinstance(value, str):
+        return None, None
+    prices = [float(p) for p in NUMBER.findall(value.replace(",", ""))]
+    if not prices:
+        return None, None
+    return min(prices), max(prices)
+
+def parse_amount(value):
+    """Float for "1,260.00" (or an already numeric amount), or None"""
+    number = _number(value)
+    if number is not None or not isinstance(value, str):
+        return number
+    try:
+        return float(value.replace(",", "").strip())
+    except ValueError:
+        return None
+
+def add_typed_fields(records):
+    """Add the parsed companion fields to each record in place; returns the records"""
+    for record in records:
+        for field in DATE_FIELDS:
+            record[f"{field}_iso"], record[f"{field}_epoch"] = parse_report_date(record.get(field))
+        record["price_low"], record["price_high"] = parse_price_range(record.get(PRICE_FIELD))
+        record["issue_amount_cr"] = parse_amount(record.get(AMOUNT_FIELD))
+    return records
+
+def sort_by_opening_date(records):
+    """Newest opening date first; records without one (upcoming IPOs) lead, in report order"""
+    return sorted(records, key=lambda r: -r[SORT_FIELD] if r.get(SORT_FIELD) is not None else -math.inf)
+
+def is_ipo_report(columns):
+    return all(field in columns for field in DATE_FIELDS)
@@ -0,0 +1,157 @@
+# Links IPO companies (ipo-main.json / ipo-sme.json) to names in Security.json
+# Both sides are normalized to a matching key ("Nephrocare Health Services Ltd. IPO"
+# and "Nephrocare Health Services Ltd" -> "nephrocare health services"). Equal keys
+# are joined through a dict, and only the leftovers go through fuzzy matching:
+# candidates come from a trigram index over the security keys, probed only with
+# the query's rarest trigrams (prefix filtering, which cannot miss a name above
+# the threshold), and are scored by trigram similarity.
+#
+# Usage: python ipo_matcher.py [links.json]   (default: data/ipo-security-links.json)
+import os
+import re
+import sys
+import json
+import math
+import time
+from collections import Counter, defaultdict
+from itertools import chain
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+IPO_DATASETS = ("ipo-main.json", "ipo-sme.json")
+SECURITY_DATASET = "Security.json"
+LINKS_DATASET = "ipo-security-links.json"
+
+MATCH_THRESHOLD = 0.8  # Minimum trigram similarity for a fuzzy link
+
+# Legal-form and listing words that carry no identity
+DROP_TOKENS = {"ltd", "limited", "pvt", "private", "the", "ipo", "fpo"}
+TOKEN_ALIASES = {"&": "and", "co": "company", "corp": "corporation", "intl": "international", "inds": "industries"}
+ISSUE_TYPES = {"ipo", "fpo"}
+PARENTHESES = re.compile(r"\([^)]*\)?")
+TOKEN = re.compile(r"&|[^\W_]+")
+
+def normalize_name(name):
+    """Matching key for a company or security name (casefolded, no legal form or IPO suffix)"""
+    if not isinstance(name, str):
+        return ""
+    # "Dr.Agarwal's" and "Dr. Agarwals" should agree: apostrophes join, dots split
+    tokens = TOKEN.findall(PARENTHESES.sub(" ", name.casefold().replace("'", "").replace("\u2019", "")))
+    # Chittorgarh appends a status code after the issue type ("... Ltd. IPO O", "... IPO CT")
+    for i in range(len(tokens) - 1, -1, -1):
+        if tokens[i] in ISSUE_TYPES:
+            if all(len(token) <= 2 for token in tokens[i + 1:]):
+                tokens = tokens[:i]
+            break
+    return " ".join(TOKEN_ALIASES.get(token, token) for token in tokens if token not in DROP_TOKENS)
+
+def compact_key(key):
+    """Key without spaces, so "k v toys" and "kv toys" join exactly"""
+    return key.replace(" ", "")
+
+def trigrams(key):
+    padded = f"  {compact_key(key)} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class SecurityMatcher:
+    """Exact and fuzzy lookup of normalized names against a list of security names"""
+
+    def __init__(self, security_names, threshold=MATCH_THRESHOLD):
+        self.threshold = threshold
+        self.exact = {}
+        self.compact = {}
+        self.keys = []
+        self.names = []
+        for name in security_names:
+            key = normalize_name(name)
+            if key and key not in self.exact:
+                self.exact[key] = name
+                self.compact.setdefault(compact_key(key), name)
+                self.keys.append(key)
+                self.names.append(name)
+
+        self.grams = [trigrams(key) for key in self.keys]
+        self.postings = defaultdict(list)
+        for i, grams in enumerate(self.grams):
+            for gram in grams:
+                self.postings[gram].append(i)
+
+    def candidates(self, query):
+        """Securities that can reach the threshold: prefix filtering on the rarest trigrams"""
+        # A name with similarity >= threshold shares at least ceil(threshold * |query|)
+        # trigrams with the query, so it must contain one of the |query| - that + 1 rarest
+        required = math.ceil(self.threshold * len(query) - 1e-9)
+        rarest = sorted(query, key=lambda gram: len(self.postings.get(gram, ())))[:len(query) - required + 1]
+        return set(chain.from_iterable(self.postings.get(gram, ()) for gram in rarest))
+
+    def match(self, name):
+        """(security name, method, score) for the best link, or (None, None, 0.0)"""
+        key = normalize_name(name)
+        if not key:
+            return None, None, 0.0
+        if key in self.exact:
+            return self.exact[key], "exact", 1.0
+        if compact_key(key) in self.compact:
+            return self.compact[compact_key(key)], "exact", 1.0
+
+        query = trigrams(key)
+        size = len(query)
+        best, best_score = None, 0.0
+        for i in self.candidates(query):
+            other = self.grams[i]
+            # Sizes too far apart cannot reach the threshold
+            if not self.threshold * size <= len(other) <= size / self.threshold:
+                continue
+            common = len(query & other)
+            score = common / (size + len(other) - common)
+            if score > best_score or (score == best_score and self.keys[i] < self.keys[best]):
+                best, best_score = i, score
+        if best is None or best_score < self.threshold:
+            return None, None, round(best_score, 3)
+        return self.names[best], "fuzzy", round(best_score, 3)
+
+def link_records(ipo_records, security_names, threshold=MATCH_THRESHOLD):
+    """Linkage rows for (dataset, record) pairs; every IPO gets a row, unmatched ones with nulls"""
+    matcher = SecurityMatcher(security_names, threshold)
+    links = []
+    for dataset, record in ipo_records:
+        security, method, score = matcher.match(record.get("Company"))
+        links.append({
+            "Company": record.get("Company"),
+            "dataset": dataset,
+            "Security Name": security,
+            "match": method,
+            "score": score if security else None,
+        })
+    return links
+
+def load_dataset(data_dir, filename):
+    path = os.path.join(data_dir, filename)
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("data") or []
+
+def link_datasets(data_dir=DATA_DIR, threshold=MATCH_THRESHOLD):
+    """Link every IPO record in data_dir to Security.json; returns (links, summary)"""
+    start = time.perf_counter()
+    ipo_records = [(dataset, record) for dataset in IPO_DATASETS for record in load_dataset(data_dir, dataset)]
+    security_names = [record.get("Security Name") for record in load_dataset(data_dir, SECURITY_DATASET)]
+    links = link_records(ipo_records, security_names, threshold)
+    methods = Counter(link["match"] for link in links)
+    summary = {
+        "ipo_records": len(ipo_records),
+        "security_names": len(security_names),
+        "exact": methods.get("exact", 0),
+        "fuzzy": methods.get("fuzzy", 0),
+        "unmatched": methods.get(None, 0),
+        "threshold": threshold,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    return links, summary
+
+if __name__ == "__main__":
+    output_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(DATA_DIR, LINKS_DATASET)
+    links, summary = link_datasets()
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({"metadata": summary, "data": links}, f, indent=4, ensure_ascii=False)
+    print(json.dumps(summary, indent=2))
@@ -0,0 +1,139 @@
+# Streaming, atomic writer for the {"metadata": ..., "data": [...]} dataset files
+# Records are serialized one at a time into a temp file next to the target,
+# fsynced, and renamed over the target, so readers never see a partial file.
+#
+# Formats:
+#   pretty  - byte-for-byte what json.dump(..., indent=4, ensure_ascii=False) produced before
+#   compact - no whitespace, same structure
+#   ndjson  - {"metadata": ...} on the first line, then one record per line
+# Serializer backends: "json" (stdlib) or "orjson" (used automatically when installed)
+import os
+import json
+import uuid
+from itertools import islice
+
+FORMATS = ("pretty", "compact", "ndjson")
+DATASET_FORMATS = ("pretty", "compact")  # The .json datasets must stay one JSON document for dataService.js
+BATCH_SIZE = 1000  # Records encoded per serializer call
+
+
+class StdlibSerializer:
+    name = "json"
+
+    def __init__(self):
+        self.pretty = json.JSONEncoder(indent=4, ensure_ascii=False)
+        self.compact = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+    def dumps(self, obj, indent=None):
+        return (self.pretty if indent else self.compact).encode(obj).encode("utf-8")
+
+class OrjsonSerializer:
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self.orjson = orjson
+        self.stdlib = StdlibSerializer()
+
+    def dumps(self, obj, indent=None):
+        if indent:
+            # orjson only indents by 2; keep the pretty format identical to the stdlib output
+            return self.stdlib.dumps(obj, indent)
+        return self.orjson.dumps(obj, option=self.orjson.OPT_NON_STR_KEYS)
+
+def get_serializer(name="auto"):
+    """Serializer backend by name; "auto" picks orjson when it is installed"""
+    if name in ("auto", "orjson"):
+        try:
+            return OrjsonSerializer()
+        except ImportError:
+            if name == "orjson":
+                print("WARNING: orjson is not installed, using the stdlib json serializer")
+    return StdlibSerializer()
+
+def create_temp_file(target_path):
+    """(fd, path) of a new temp file next to target_path, for writing and renaming over it
+
+    Created with mode 0666 so the kernel applies the process umask, i.e. the mode a
+    plain open() gives the target (mkstemp's 0600 would be kept by the rename)."""
+    directory = os.path.dirname(os.path.abspath(target_path))
+    temp_path = os.path.join(directory, f".{os.path.basename(target_path)}.{uuid.uuid4().hex[:12]}.tmp")
+    return os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666), temp_path
+
+def dataset_format(name):
+    """Output format for the .json datasets; anything but DATASET_FORMATS falls back to pretty"""
+    fmt = (name or "pretty").strip().lower()
+    if fmt not in DATASET_FORMATS:
+        print(f"WARNING: SCRAPER_JSON_FORMAT={name} is not supported for the .json datasets "
+              f"(expected {' or '.join(DATASET_FORMATS)}), using pretty")
+        return "pretty"
+    return fmt
+
+def _batches(records):
+    iterator = iter(records)
+    while True:
+        batch = list(islice(iterator, BATCH_SIZE))
+        if not batch:
+            return
+        yield batch
+
+def _iter_chunks(metadata, records, fmt, serializer):
+    if fmt == "ndjson":
+        yield serializer.dumps({"metadata": metadata}) + b"\n"
+        for batch in _batches(records):
+            yield b"".join(serializer.dumps(record) + b"\n" for record in batch)
+        return
+
+    # Encode records a batch at a time as a JSON array and splice the arrays together
+    if fmt == "compact":
+        yield b'{"metadata":' + serializer.dumps(metadata) + b',"data":['
+        first = True
+        for batch in _batches(records):
+            yield (b"" if first else b",") + serializer.dumps(batch)[1:-1]
+            first = False
+        yield b"]}"
+        return
+
+    # pretty: nest each indented chunk under the top-level object by shifting its lines
+    yield b'{\n    "metadata": ' + serializer.dumps(metadata, indent=4).replace(b"\n", b"\n    ") + b',\n    "data": ['
+    first = True
+    for batch in _batches(records):
+        # "[\n    {...},\n    {...}\n]" -> "\n        {...},\n        {...}"
+        body = serializer.dumps(batch, indent=4)[1:-2].replace(b"\n", b"\n    ")
+        yield body if first else b"," + body
+        first = False
+    yield b"]\n}" if first else b"\n    ]\n}"
+
+def write_json_dataset(file_path, metadata, records, fmt="pretty", serializer=None):
+    """Stream metadata and records to file_path atomically; returns the number of bytes written"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown JSON output format: {fmt} (expected one of {', '.join(FORMATS)})")
+    serializer = serializer or get_serializer()
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = create_temp_file(file_path)
+    written = 0
+    try:
+        with os.fdopen(fd, "wb", buffering=1024 * 1024) as f:
+            for chunk in _iter_chunks(metadata, records, fmt, serializer):
+                f.write(chunk)
+                written += len(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+    # Persist the rename itself (not supported on Windows)
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    except OSError:
+        pass
+    return written
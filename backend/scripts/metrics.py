@@ -0,0 +1,217 @@
+# Operational metrics for scraper runs
+# RunMetrics listens to a run's progress events and, when the run ends, adds them
+# to a small SQLite store (SCRAPER_METRICS_DB) in one transaction, so counters
+# and histograms accumulate across runs and processes. render() prints the store
+# in the Prometheus text exposition format (served by api/metrics.py).
+#
+# Every sample is a row (name, labels, value): counters and histogram
+# buckets/sums/counts are added to, gauges are overwritten.
+#
+# Show the current metrics:   python metrics.py
+import os
+import json
+import sqlite3
+import tempfile
+
+METRICS_DB_PATH = os.environ.get("SCRAPER_METRICS_DB", os.path.join(tempfile.gettempdir(), "scraper-metrics.sqlite3"))
+ENABLED = os.environ.get("SCRAPER_METRICS", "1") != "0"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DURATION_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 20, 30, 45, 60, 120, 300)
+WAIT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+FAILURE_CLASSES = ("TimeoutException", "NoSuchElementException")  # Anything else counts as "generic"
+DOWNLOAD_SPANS = {"http_fetch": "http", "wait_for_file": "browser", "wait_for_file_with_name": "browser"}
+
+# name -> (type, help, histogram buckets)
+METRICS = {
+    "scraper_run_duration_seconds": ("histogram", "Scraper run duration by mode and outcome (success, failure, reused)", DURATION_BUCKETS),
+    "scraper_source_duration_seconds": ("histogram", "Duration of each scrape task or processing stage", DURATION_BUCKETS),
+    "scraper_download_wait_seconds": ("histogram", "Time spent getting a CSV: direct HTTP fetch or waiting for a browser download", WAIT_BUCKETS),
+    "scraper_records_written_total": ("counter", "Records written to changed datasets", None),
+    "scraper_dataset_records": ("gauge", "Records in each dataset after its last save", None),
+    "scraper_failures_total": ("counter", "Failed stages by exception class found in the exception chain", None),
+    "scraper_cache_hits_total": ("counter", "Work skipped: process (unchanged CSV), result (fresh result reused), coalesced (joined a running scrape)", None),
+    "scraper_cache_misses_total": ("counter", "Processing cache lookups that had to convert the CSV", None),
+    "scraper_browser_requests_total": ("counter", "Requests of browser exports by source and outcome (loaded, blocked by the request policy)", None),
+    "scraper_browser_bytes_received_total": ("counter", "Bytes received by browser exports", None),
+    "scraper_last_success_timestamp_seconds": ("gauge", "Unix time of the last successful run of each mode", None),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    name TEXT NOT NULL,
+    labels TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (name, labels)
+)
+"""
+
+# ---------------------------------------------------------------------------
+# Store
+# ---------------------------------------------------------------------------
+
+def connect(db_path=None):
+    conn = sqlite3.connect(db_path or METRICS_DB_PATH, timeout=10)
+    conn.execute(SCHEMA)
+    return conn
+
+def _labels(labels):
+    return json.dumps(sorted((key, str(value)) for key, value in labels.items()))
+
+class Batch:
+    """Samples collected in memory and written in one transaction"""
+
+    def __init__(self):
+        self.added = {}
+        self.gauges = {}
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _labels(labels))
+        self.added[key] = self.added.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        self.gauges[(name, _labels(labels))] = value
+
+    def observe(self, name, value, **labels):
+        # Every declared bucket is written for the label set (adding 0 when the value is above it),
+        # so the exposition always has the full le series
+        for bound in METRICS[name][2]:
+            self.inc(f"{name}_bucket", 1 if value <= bound else 0, le=bound, **labels)
+        self.inc(f"{name}_bucket", le="+Inf", **labels)
+        self.inc(f"{name}_sum", value, **labels)
+        self.inc(f"{name}_count", **labels)
+
+    def save(self, db_path=None):
+        with connect(db_path) as conn:
+            conn.executemany(
+                "INSERT INTO samples (name, labels, value) VALUES (?, ?, ?) "
+                "ON CONFLICT (name, labels) DO UPDATE SET value = value + excluded.value",
+                [(name, labels, value) for (name, labels), value in self.added.items()])
+            conn.executemany(
+                "INSERT INTO samples (name, labels, value) VALUES (?, ?, ?) "
+                "ON CONFLICT (name, labels) DO UPDATE SET value = excluded.value",
+                [(name, labels, value) for (name, labels), value in self.gauges.items()])
+
+def increment(name, value=1, db_path=None, **labels):
+    """Add to one counter right away (outside a run)"""
+    batch = Batch()
+    batch.inc(name, value, **labels)
+    batch.save(db_path)
+
+# ---------------------------------------------------------------------------
+# Recording runs
+# ---------------------------------------------------------------------------
+
+def failure_class(error):
+    """FAILURE_CLASSES name of the first matching exception in the chain, else "generic"
+
+    The fetch functions re-raise Selenium errors as Exception("CRITICAL FAILURE: ..."),
+    so the original class is only found through __cause__ / __context__."""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        for cls in type(error).__mro__:
+            if cls.__name__ in FAILURE_CLASSES:
+                return cls.__name__
+        error = error.__cause__ or error.__context__
+    return "generic"
+
+def _spans(nodes):
+    for node in nodes:
+        yield node
+        yield from _spans(node.get("children", []))
+
+class RunMetrics:
+    """Progress listener that records one run's metrics when its run_end event arrives"""
+
+    def __init__(self, mode, db_path=None):
+        self.mode = mode
+        self.db_path = db_path
+        self.batch = Batch()
+        self.failed_stages = {}
+
+    def __call__(self, event):
+        kind = event["event"]
+        if kind == "stage_end":
+            self.batch.observe("scraper_source_duration_seconds", event["duration"], source=event["stage"],
+                               outcome="success" if event["success"] else "failure")
+            if not event["success"]:
+                self.failed_stages.setdefault(event["stage"], "generic")
+        elif kind == "error":
+            # Error events carry the classified chain; a run-level error has no stage
+            self.failed_stages[event.get("stage") or "run"] = event.get("failure_class", "generic")
+        elif kind == "records_written":
+            self.batch.set("scraper_dataset_records", event["records"], dataset=event["dataset"])
+            if event.get("changed"):
+                self.batch.inc("scraper_records_written_total", event["records"], dataset=event["dataset"])
+        elif kind == "cache_hit":
+            self.batch.inc("scraper_cache_hits_total", cache="process")
+        elif kind == "cache_miss":
+            self.batch.inc("scraper_cache_misses_total", cache="process")
+        elif kind == "network":
+            self.batch.inc("scraper_browser_requests_total", event["requests_loaded"], source=event["source"], outcome="loaded")
+            self.batch.inc("scraper_browser_requests_total", event["requests_blocked"], source=event["source"], outcome="blocked")
+            self.batch.inc("scraper_browser_bytes_received_total", event["bytes_received"], source=event["source"])
+        elif kind == "result_reused":
+            self.batch.inc("scraper_cache_hits_total", cache="coalesced" if event.get("coalesced") else "result")
+        elif kind == "run_end":
+            self.finish(event)
+
+    def finish(self, event):
+        result = event.get("result") or {}
+        reused = result.get("cached") or result.get("coalesced")
+        outcome = "reused" if reused else "success" if event["success"] else "failure"
+        self.batch.observe("scraper_run_duration_seconds", event["elapsed"], mode=self.mode, outcome=outcome)
+        if event["success"]:
+            self.batch.set("scraper_last_success_timestamp_seconds", event["ts"], mode=self.mode)
+        for stage, exception in self.failed_stages.items():
+            self.batch.inc("scraper_failures_total", stage=stage, exception=exception)
+        if not reused:
+            for node in _spans((result.get("timings") or {}).get("spans", [])):
+                if node["name"] in DOWNLOAD_SPANS:
+                    self.batch.observe("scraper_download_wait_seconds", node["duration"], method=DOWNLOAD_SPANS[node["name"]])
+        try:
+            self.batch.save(self.db_path)
+        except Exception as e:
+            print(f"WARNING: Failed to record run metrics: {str(e)}")
+
+# ---------------------------------------------------------------------------
+# Exposition
+# ---------------------------------------------------------------------------
+
+HISTOGRAM_SUFFIXES = ("_bucket", "_sum", "_count")
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(round(float(value), 6))
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _sample_order(row):
+    # Per label set: buckets by bound, then _sum and _count
+    name, labels, _ = row
+    pairs = json.loads(labels)
+    le = dict(pairs).get("le")
+    suffix = next((i for i, end in enumerate(HISTOGRAM_SUFFIXES) if name.endswith(end)), 0)
+    return [pair for pair in pairs if pair[0] != "le"], suffix, float(le) if le is not None else 0.0
+
+def render(db_path=None):
+    """All stored metrics in the Prometheus text format"""
+    with connect(db_path) as conn:
+        rows = conn.execute("SELECT name, labels, value FROM samples").fetchall()
+
+    lines = []
+    for family, (kind, help_text, _) in METRICS.items():
+        names = [family + suffix for suffix in HISTOGRAM_SUFFIXES] if kind == "histogram" else [family]
+        samples = sorted((row for row in rows if row[0] in names), key=_sample_order)
+        if not samples:
+            continue
+        lines.append(f"# HELP {family} {help_text}")
+        lines.append(f"# TYPE {family} {kind}")
+        for name, labels, value in samples:
+            pairs = ",".join(f'{key}="{_escape(text)}"' for key, text in json.loads(labels))
+            lines.append(f"{name}{{{pairs}}} {_format_value(value)}" if pairs else f"{name} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+if __name__ == "__main__":
+    print(render(), end="")
@@ -0,0 +1,76 @@
+# Content-addressed cache for the CSV -> JSON conversions
+# Each pipeline (e.g. "ipo-main.json", "Security.json") remembers the sha256 of
+# the CSV it last converted, the settings it ran with and the size / mtime of
+# every file it wrote. When the next download hashes the same and those files
+# are untouched, the conversion (parse, normalize, write, index) is skipped.
+#
+# The manifest is DATA_DIR/.process-cache.json:
+#   {pipeline: {"source_sha256", "settings", "files": {path: [size, mtime_ns]}, "records": {dataset: n}, "updated_at"}}
+import os
+import json
+import time
+import hashlib
+import threading
+
+MANIFEST_NAME = ".process-cache.json"
+CHUNK_SIZE = 1 << 20
+
+_lock = threading.Lock()  # Concurrent scrape tasks update the manifest from threads
+
+def file_sha256(path):
+    """sha256 hex digest of a file, read in fixed-size chunks"""
+    digest = hashlib.sha256()
+    buffer = bytearray(CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            digest.update(view[:size])
+    return digest.hexdigest()
+
+def _manifest_path(data_dir):
+    return os.path.join(data_dir, MANIFEST_NAME)
+
+def _load(data_dir):
+    try:
+        with open(_manifest_path(data_dir), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _signature(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+def lookup(data_dir, pipeline, source_sha256, settings):
+    """Manifest entry when pipeline already converted this source and its files are intact, else None"""
+    entry = _load(data_dir).get(pipeline)
+    if not entry or entry.get("source_sha256") != source_sha256 or entry.get("settings") != settings:
+        return None
+    try:
+        if any(_signature(path) != signature for path, signature in entry["files"].items()):
+            return None
+    except OSError:
+        return None
+    return entry
+
+def record(data_dir, pipeline, source_sha256, settings, files, records):
+    """Remember the files (that exist) a conversion of source_sha256 produced"""
+    entry = {
+        "source_sha256": source_sha256,
+        "settings": settings,
+        "files": {path: _signature(path) for path in files if os.path.exists(path)},
+        "records": records,
+        "updated_at": time.time(),
+    }
+    with _lock:
+        manifest = _load(data_dir)
+        manifest[pipeline] = entry
+        path = _manifest_path(data_dir)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(temp_path, path)
+    return entry
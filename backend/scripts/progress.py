@@ -0,0 +1,87 @@
+# Structured progress events for scraper runs
+# Every event is one JSON object: {"event": ..., "ts": <epoch seconds>, "elapsed":
+# <seconds since the run started>, ...}. With SCRAPER_PROGRESS=1 each event is
+# printed to stdout as a single line (NDJSON) between the usual log lines, so a
+# caller reading the pipe picks out the lines that start with {"event". In-process
+# callers (the resident worker) subscribe with add_listener instead.
+#
+# Events: run_start, run_end, stage_start, stage_end, download, records_written,
+# network, cache_hit, cache_miss, waiting, result_reused, error
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+import tracing
+
+ENABLED = os.environ.get("SCRAPER_PROGRESS", "0") == "1"
+EVENT_PREFIX = '{"event"'
+
+_lock = threading.Lock()
+_listeners = []
+_local = threading.local()
+_run_started = time.perf_counter()
+
+def add_listener(listener):
+    """Call listener(event_dict) for every event until remove_listener"""
+    with _lock:
+        _listeners.append(listener)
+
+def remove_listener(listener):
+    with _lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+def is_event_line(line):
+    return line.startswith(EVENT_PREFIX)
+
+def emit(event, **fields):
+    """Publish one event; events from inside a stage() block carry its stage name"""
+    if not ENABLED and not _listeners:
+        return
+    stage_name = getattr(_local, "stage", None)
+    if stage_name and "stage" not in fields:
+        fields["stage"] = stage_name
+    record = {"event": event, "ts": round(time.time(), 3), "elapsed": round(time.perf_counter() - _run_started, 3), **fields}
+    with _lock:
+        if ENABLED:
+            sys.stdout.write(json.dumps(record, default=str, ensure_ascii=False) + "\n")
+            sys.stdout.flush()
+        for listener in list(_listeners):
+            try:
+                listener(record)
+            except Exception:
+                # A caller that went away must not fail the run
+                _listeners.remove(listener)
+
+def start_run(mode):
+    """Reset the run clock (and the run's trace) and emit run_start"""
+    global _run_started
+    _run_started = time.perf_counter()
+    tracing.start_run()
+    emit("run_start", mode=mode, pid=os.getpid())
+
+@contextmanager
+def stage(name, **fields):
+    """Emit stage_start / stage_end around a block (traced as a span); the block may add fields (or success=False) to the yielded dict"""
+    previous = getattr(_local, "stage", None)
+    _local.stage = name
+    emit("stage_start", **fields)
+    started = time.perf_counter()
+    info = {}
+    try:
+        with tracing.span(name, **fields):
+            yield info
+    except BaseException as e:
+        emit("stage_end", success=False, duration=round(time.perf_counter() - started, 3),
+             error=str(e), error_type=type(e).__name__, **fields)
+        raise
+    else:
+        # The caller may read info["success"] after the block, so it stays in the dict
+        success = info.get("success", True)
+        details = {key: value for key, value in info.items() if value is not None and key != "success"}
+        emit("stage_end", success=success, duration=round(time.perf_counter() - started, 3), **fields, **details)
+    finally:
+        _local.stage = previous
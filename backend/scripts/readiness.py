@@ -0,0 +1,107 @@
+# Condition-based readiness waits for the Selenium flow
+# Instead of sleeping a fixed time after every navigation or click, the export
+# functions wait for what they actually need: the document to finish loading,
+# the network to go quiet, or an element to become enabled. Each wait has its
+# own deadline and runs in a "ready.<step>" tracing span, so the time it really
+# took shows up in the result's timings (and in the Chrome trace).
+#
+# wait() raises TimeoutException at the deadline; settle() is the soft variant
+# for steps the flow can continue without (it logs a warning and returns None).
+import time
+
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+
+import tracing
+
+POLL_INTERVAL = 0.1  # Seconds between condition checks
+NETWORK_QUIET = 0.5  # Seconds without new requests that count as network idle
+
+# readyState, finished resource requests and jQuery's in-flight AJAX count in one round trip
+PAGE_STATE_SCRIPT = """
+    return [document.readyState,
+            performance.getEntriesByType('resource').length,
+            (window.jQuery && window.jQuery.active) || 0,
+            location.href];
+"""
+
+def wait(driver, step, condition, timeout):
+    """Poll condition(driver) until it returns a truthy value (returned) or timeout seconds pass"""
+    from selenium.webdriver.support.wait import WebDriverWait
+
+    with tracing.span(f"ready.{step}", timeout=timeout) as record:
+        start = time.perf_counter()
+        value = WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(
+            condition, message=f"{step} not ready after {timeout}s")
+        waited = time.perf_counter() - start
+        record["args"]["waited"] = round(waited, 3)
+    print(f"INFO: Ready: {step} after {waited:.2f}s (deadline {timeout}s)")
+    return value
+
+def settle(driver, step, condition, timeout):
+    """wait() that logs and returns None at the deadline instead of raising"""
+    try:
+        return wait(driver, step, condition, timeout)
+    except TimeoutException:
+        print(f"WARNING: {step} not ready after {timeout}s, continuing")
+        return None
+
+def document_ready(driver):
+    """Condition: the current document has finished loading"""
+    return driver.execute_script("return document.readyState") == "complete"
+
+class network_idle:
+    """Condition: document loaded, no jQuery AJAX in flight and no new resource requests for quiet seconds
+
+    Resource entries only cover finished requests, so a request still in flight
+    shows up as a new entry once it finishes and restarts the quiet period."""
+
+    def __init__(self, quiet=NETWORK_QUIET):
+        self.quiet = quiet
+        self.last_state = None
+        self.quiet_since = None
+
+    def __call__(self, driver):
+        ready_state, resources, active_ajax, url = driver.execute_script(PAGE_STATE_SCRIPT)
+        now = time.monotonic()
+        state = (resources, url)
+        if ready_state != "complete" or active_ajax or state != self.last_state:
+            self.last_state = state
+            self.quiet_since = now if ready_state == "complete" and not active_ajax else None
+            return False
+        return self.quiet_since is not None and now - self.quiet_since >= self.quiet
+
+class element_enabled:
+    """Condition: the element is present, enabled (no disabled or aria-disabled) and, unless
+    displayed=False (for elements clicked through JavaScript), displayed; returns it"""
+
+    def __init__(self, locator, displayed=True):
+        self.locator = locator
+        self.displayed = displayed
+
+    def __call__(self, driver):
+        try:
+            element = driver.find_element(*self.locator)
+            if (self.displayed and not element.is_displayed()) or not element.is_enabled():
+                return False
+            if (element.get_attribute("aria-disabled") or "").lower() == "true":
+                return False
+            return element
+        except (StaleElementReferenceException, WebDriverException):
+            return False
+
+class page_replaced:
+    """Condition: element is stale (its document was navigated away from, e.g. by a postback) and
+    the new document has finished loading
+
+    The old document stays "complete" with no new requests while the postback is
+    pending, so network_idle alone can pass before the navigation."""
+
+    def __init__(self, element):
+        self.element = element
+
+    def __call__(self, driver):
+        try:
+            self.element.is_enabled()
+            return False
+        except StaleElementReferenceException:
+            return document_ready(driver)
@@ -0,0 +1,148 @@
+# Local stand-in server for BSE and Chittorgarh
+# Serves recorded responses from fixtures/ (pages, their scripts and the BSE
+# CSV download) so both the direct HTTP fetch path and the Selenium flow can run
+# offline. Routes are listed in fixtures/routes.json; a route matches on method,
+# path and (for POST postbacks) the submitted form fields.
+#
+# Injected latency and failures make slow or flaky sites reproducible. Every
+# response waits latency + uniform(0, jitter) seconds, and fails with probability
+# failure_rate: it answers failure_status, or with failure_status 0 it drops the
+# connection without a response. Set them with REPLAY_LATENCY, REPLAY_JITTER,
+# REPLAY_FAILURE_RATE, REPLAY_FAILURE_STATUS and REPLAY_SEED (random seed), or
+# per route with "latency", "jitter", "failure_rate" and "failure_status" keys in
+# routes.json.
+#
+# Usage:  python replay_server.py [port]
+#         BSE_BASE_URL=http://127.0.0.1:8900 CHITTORGARH_BASE_URL=http://127.0.0.1:8900 python scraper.py
+import os
+import sys
+import json
+import time
+import random
+import threading
+import mimetypes
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+DEFAULT_PORT = 8900
+
+# Server-wide injection defaults (seconds, probability, HTTP status)
+INJECTION = {
+    "latency": float(os.environ.get("REPLAY_LATENCY", "0")),
+    "jitter": float(os.environ.get("REPLAY_JITTER", "0")),
+    "failure_rate": float(os.environ.get("REPLAY_FAILURE_RATE", "0")),
+    "failure_status": int(os.environ.get("REPLAY_FAILURE_STATUS", "503")),
+}
+SEED = int(os.environ.get("REPLAY_SEED", "0"))
+
+def load_routes(fixtures_dir=FIXTURES_DIR):
+    with open(os.path.join(fixtures_dir, "routes.json"), "r", encoding="utf-8") as f:
+        return json.load(f)["routes"]
+
+def match_route(routes, method, path, form):
+    """First route whose method, path and form constraints all match"""
+    for route in routes:
+        if route["method"] != method or route["path"] != path:
+            continue
+        if all(form.get(key) == value for key, value in route.get("form", {}).items()):
+            return route
+    return None
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    server_version = "ReplayServer/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _form(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode("utf-8") if length else ""
+        return {key: values[-1] for key, values in parse_qs(body, keep_blank_values=True).items()}
+
+    def _serve(self, method, form):
+        path = urlparse(self.path).path
+        route = match_route(self.server.routes, method, path, form)
+        self.server.hits.append((method, path))
+        delay, failure_status = self.server.draw_injection(route)
+        if delay:
+            time.sleep(delay)
+        if failure_status is not None:
+            self.server.failures.append((method, path))
+            if failure_status == 0:
+                # Connection reset: no status line at all
+                self.close_connection = True
+                return
+            self.send_error(failure_status, "Injected failure")
+            return
+        if route is None:
+            self.send_error(404, "No recorded response")
+            return
+
+        with open(os.path.join(self.server.fixtures_dir, route["file"]), "rb") as f:
+            body = f.read()
+        content_type = mimetypes.guess_type(route["file"])[0] or "application/octet-stream"
+        if content_type.startswith("text/"):
+            content_type += "; charset=utf-8"
+
+        self.send_response(route.get("status", 200))
+        headers = {"Content-Type": content_type}
+        headers.update(route.get("headers", {}))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._serve("GET", {})
+
+    def do_POST(self):
+        self._serve("POST", self._form())
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, fixtures_dir=FIXTURES_DIR, verbose=False, seed=SEED, **injection):
+        super().__init__(address, ReplayHandler)
+        self.fixtures_dir = fixtures_dir
+        self.routes = load_routes(fixtures_dir)
+        self.verbose = verbose
+        self.injection = dict(INJECTION, **injection)
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.hits = []
+        self.failures = []
+
+    def draw_injection(self, route):
+        """(delay seconds, failure status or None) for one request; route keys override the server settings"""
+        settings = dict(self.injection, **{key: route[key] for key in INJECTION if route and key in route})
+        with self.random_lock:
+            delay = settings["latency"] + (self.random.uniform(0, settings["jitter"]) if settings["jitter"] else 0)
+            failed = settings["failure_rate"] > 0 and self.random.random() < settings["failure_rate"]
+        return delay, settings["failure_status"] if failed else None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+def start_in_background(port=0, fixtures_dir=FIXTURES_DIR, **injection):
+    """Start a replay server on a background thread and return it (server.base_url); injection overrides INJECTION"""
+    server = ReplayServer(("127.0.0.1", port), fixtures_dir, **injection)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+    server = ReplayServer(("127.0.0.1", port), verbose=True)
+    print(f"INFO: Replay server serving {len(server.routes)} recorded routes at {server.base_url}")
+    if any(server.injection[key] for key in ("latency", "jitter", "failure_rate")):
+        print(f"INFO: Injecting {json.dumps(server.injection)} (seed {SEED})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
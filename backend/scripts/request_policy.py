@@ -0,0 +1,144 @@
+# Per-source request blocking for the Selenium flow
+# Before each browser export the scraper applies the source's policy through the
+# Chrome DevTools Protocol (Network.setBlockedURLs), so ads, analytics, social
+# widgets, fonts, stylesheets and media are never requested. Only the page, its
+# own scripts and the export / postback requests go out.
+#
+# A policy has:
+#   block_types   resource types to block: image, font, stylesheet, media
+#                 (CDP can only block by URL, so each type maps to file extensions)
+#   block_urls    URL patterns to block, "*" is a wildcard (third-party hosts)
+#   allow_urls    URLs the flow needs; block patterns matching one are dropped
+# SCRAPER_REQUEST_POLICY=0 turns blocking off. SCRAPER_REQUEST_POLICY=path.json
+# replaces keys of the built-in policies: {"chittorgarh": {"block_types": [...]}}.
+#
+# The performance log of the driver (goog:loggingPrefs, set by setup_driver)
+# gives each export's network stats: requests loaded and blocked, and bytes received.
+import os
+import json
+from fnmatch import fnmatchcase
+from urllib.parse import urlparse
+
+POLICY_SETTING = os.environ.get("SCRAPER_REQUEST_POLICY", "1")
+ENABLED = POLICY_SETTING != "0"
+LOGGING_PREFS = {"performance": "ALL"}  # Capability value that makes Chrome log Network events
+
+TYPE_PATTERNS = {
+    "image": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*"],
+    "font": ["*.woff*", "*.ttf*", "*.otf*", "*.eot*"],
+    "stylesheet": ["*.css*"],
+    "media": ["*.mp4*", "*.webm*", "*.mp3*", "*.m3u8*"],
+}
+
+THIRD_PARTY_URLS = [
+    "*googletagmanager.com/*", "*google-analytics.com/*", "*googlesyndication.com/*",
+    "*googleadservices.com/*", "*doubleclick.net/*", "*adservice.google.*", "*amazon-adsystem.com/*",
+    "*adnxs.com/*", "*pubmatic.com/*", "*criteo.*", "*taboola.com/*", "*outbrain.com/*",
+    "*moatads.com/*", "*scorecardresearch.com/*", "*quantserve.com/*", "*clarity.ms/*",
+    "*hotjar.com/*", "*onesignal.com/*", "*facebook.net/*", "*facebook.com/tr*",
+    "*platform.twitter.com/*", "*youtube.com/embed/*", "*fonts.googleapis.com/*", "*fonts.gstatic.com/*",
+    "*cloudflareinsights.com/*", "*nr-data.net/*",
+]
+
+POLICIES = {
+    # The export button only needs the report page and its own scripts
+    "chittorgarh": {
+        "block_types": ["image", "font", "stylesheet", "media"],
+        "block_urls": THIRD_PARTY_URLS,
+        "allow_urls": [],
+    },
+    # ASP.NET postbacks: keep WebResource.axd / ScriptResource.axd (not matched by the patterns)
+    "bse": {
+        "block_types": ["image", "font", "stylesheet", "media"],
+        "block_urls": THIRD_PARTY_URLS,
+        "allow_urls": [],
+    },
+}
+
+def load_policies(setting=POLICY_SETTING):
+    """Built-in policies with the overrides of a SCRAPER_REQUEST_POLICY JSON file applied"""
+    policies = {source: dict(policy) for source, policy in POLICIES.items()}
+    if setting in ("0", "1", ""):
+        return policies
+    with open(setting, "r", encoding="utf-8") as f:
+        overrides = json.load(f)
+    for source, policy in overrides.items():
+        policies.setdefault(source, {"block_types": [], "block_urls": [], "allow_urls": []}).update(policy)
+    return policies
+
+def blocked_patterns(policy, keep_urls=()):
+    """Network.setBlockedURLs patterns for a policy; patterns matching an allowed or kept URL are left out"""
+    patterns = []
+    for resource_type in policy.get("block_types", []):
+        patterns.extend(TYPE_PATTERNS[resource_type])
+    patterns.extend(policy.get("block_urls", []))
+    allowed = list(policy.get("allow_urls", [])) + [url for url in keep_urls if url]
+    return [pattern for pattern in dict.fromkeys(patterns)
+            if not any(fnmatchcase(url, pattern) for url in allowed)]
+
+_policies = None
+
+def apply(driver, source, page_url):
+    """Set the source's blocked URLs on the driver (clears them when blocking is off); returns the patterns"""
+    global _policies
+    patterns = []
+    if ENABLED:
+        if _policies is None:
+            _policies = load_policies()
+        policy = _policies.get(source)
+        if policy:
+            patterns = blocked_patterns(policy, [page_url])
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    # Start this export's stats from an empty log (a pooled or shared driver has older entries)
+    read_performance_log(driver)
+    return patterns
+
+def read_performance_log(driver):
+    """Network events logged since the last read; [] when the driver has no performance log"""
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return []
+    events = []
+    for entry in entries:
+        message = json.loads(entry["message"])["message"]
+        if message.get("method", "").startswith("Network."):
+            events.append(message)
+    return events
+
+def network_stats(events):
+    """Requests loaded and blocked (by resource type and host) and bytes received, from Network events"""
+    requests = {}
+    stats = {"requests_loaded": 0, "requests_blocked": 0, "requests_failed": 0, "bytes_received": 0,
+             "blocked_by_type": {}, "blocked_hosts": {}}
+    for event in events:
+        params = event.get("params", {})
+        method = event["method"]
+        if method == "Network.requestWillBeSent":
+            requests[params["requestId"]] = params["request"]["url"]
+        elif method == "Network.loadingFinished":
+            stats["requests_loaded"] += 1
+            stats["bytes_received"] += int(params.get("encodedDataLength", 0))
+        elif method == "Network.loadingFailed":
+            # Requests stopped by Network.setBlockedURLs fail with blockedReason "inspector"
+            if params.get("blockedReason") == "inspector":
+                stats["requests_blocked"] += 1
+                resource_type = params.get("type", "Other")
+                stats["blocked_by_type"][resource_type] = stats["blocked_by_type"].get(resource_type, 0) + 1
+                host = urlparse(requests.get(params["requestId"], "")).hostname or "unknown"
+                stats["blocked_hosts"][host] = stats["blocked_hosts"].get(host, 0) + 1
+            else:
+                stats["requests_failed"] += 1
+    return stats
+
+def merge_stats(total, stats):
+    """Add one export's stats into a running total (several exports per source in one run)"""
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            counts = total.setdefault(key, {})
+            for name, count in value.items():
+                counts[name] = counts.get(name, 0) + count
+        else:
+            total[key] = total.get(key, 0) + value
+    return total
@@ -3,29 +3,83 @@ import os
 import time
 import json
 import math
-import pandas as pd
 import sys
+import shutil
+import threading
+import importlib.util
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
-# Selenium imports for precise web automation
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.wait import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+# Selenium exceptions are cheap to import; the webdriver modules (and pandas) are
+# imported on first use so the process_* modes start without them
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
+
+import browser_pool
+import columnar_export
+import csv_engine
+import dataset_diff
+import http_fetch
+import ipo_fields
+import ipo_matcher
+import json_writer
+import metrics
+import processing_cache
+import progress
+import readiness
+import request_policy
+import security_index
+import singleflight
+import tracing
+from download_watcher import wait_for_download
 
 # Configuration
 # Get the backend directory (parent of scripts)
 BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DOWNLOAD_DIR = os.path.abspath(".")
-DATA_DIR = os.path.join(BACKEND_DIR, "data")
+DATA_DIR = os.environ.get("SCRAPER_DATA_DIR") or os.path.join(BACKEND_DIR, "data")  # Where the JSON datasets are written
 TIMEOUT = 30
+READY_TIMEOUT = int(os.environ.get("SCRAPER_READY_TIMEOUT", "30"))  # Deadline of each page/element readiness wait
+NETWORK_IDLE_TIMEOUT = int(os.environ.get("SCRAPER_NETWORK_IDLE_TIMEOUT", "10"))  # Deadline of each network-idle wait (the flow continues after it)
 HEADLESS = True  # Set to True for Vercel deployment (no UI)
 DEBUG = False    # Set to False for production
+POOL_SIZE = int(os.environ.get("SCRAPER_POOL_SIZE", "3"))  # Browsers used by the concurrent mode
+TASK_DOWNLOAD_ROOT = os.path.join(DOWNLOAD_DIR, ".downloads")  # Per-task download directories
+HTTP_FETCH = os.environ.get("SCRAPER_HTTP_FETCH", "1") != "0"  # Try direct HTTP exports before Selenium
+SINGLE_IPO_FETCH = os.environ.get("SCRAPER_SINGLE_IPO_FETCH", "1") != "0"  # One IPO download split into main/SME
+INCREMENTAL_WRITES = os.environ.get("SCRAPER_INCREMENTAL_WRITES", "1") != "0"  # Diff against the previous file, emit changesets
+CHANGES_DIR = os.path.join(DATA_DIR, "changes")
+SECURITY_INDEX_PATH = os.path.join(DATA_DIR, "Security.idx")  # Autocomplete index built from Security.json
+JSON_OUTPUT_FORMAT = json_writer.dataset_format(os.environ.get("SCRAPER_JSON_FORMAT", "pretty"))  # "pretty" (indent 4) or "compact"
+JSON_SERIALIZER = json_writer.get_serializer(os.environ.get("SCRAPER_JSON_SERIALIZER", "auto"))
+# CSV reader for the conversions: "pandas", "stdlib" (csv module), or "auto" (pandas when installed)
+CSV_ENGINE = os.environ.get("SCRAPER_CSV_ENGINE", "auto").lower()
+if CSV_ENGINE == "auto":
+    CSV_ENGINE = "pandas" if importlib.util.find_spec("pandas") else "stdlib"
+COLUMNAR_FORMATS = columnar_export.parse_formats(os.environ.get("SCRAPER_COLUMNAR_EXPORT", ""))  # e.g. "arrow,parquet"
+SINGLEFLIGHT_DIR = singleflight.state_dir(DATA_DIR)  # Host-wide scrape lock and last results
+LOCAL_MODES = ("process_ipo", "process_securities", "process_equity", "link_ipo")  # Modes that only convert local files
+PROCESS_CACHE = os.environ.get("SCRAPER_PROCESS_CACHE", "1") != "0"  # Skip converting a CSV identical to the last one
+PROCESS_CACHE_VERSION = 1  # Bump when the conversion output changes, to invalidate cached conversions
+IPO_SPLIT_PIPELINE = "ipo-main.json+ipo-sme.json"  # Cache key of the combined IPO report conversion
+TRACE_FILE = os.environ.get("SCRAPER_TRACE_FILE", "")  # Write each run's spans here as a Chrome trace (JSON)
+
+# Stable record keys used to diff each dataset against the previous run
+DATASET_KEYS = {
+    "ipo-main.json": "Company",
+    "ipo-sme.json": "Company",
+    "Security.json": "Security Name",
+    ipo_matcher.LINKS_DATASET: "Company",
+}
+
+# Source sites (overridable to point the scraper at a local stand-in server)
+BSE_BASE_URL = os.environ.get("BSE_BASE_URL", "https://www.bseindia.com").rstrip("/")
+CHITTORGARH_BASE_URL = os.environ.get("CHITTORGARH_BASE_URL", "https://www.chittorgarh.com").rstrip("/")
+BSE_SECURITIES_URL = f"{BSE_BASE_URL}/corporates/List_Scrips.html"
+CHITTORGARH_REPORT_URL = f"{CHITTORGARH_BASE_URL}/report/ipo-in-india-list-main-board-sme/82/"
+CHITTORGARH_EXPORT_NAME = "ipo-in-india-list-main-board-sme.csv"
+CHITTORGARH_EXPORT_COLUMNS = ["Company", "Opening Date", "Closing Date", "Listing Date", "Issue Price (Rs)",
+                              "Total Issue Amount (Incl.Firm reservations) (Rs.cr.)", "Listing at", "Lead Manager"]
 
 def ensure_data_directory():
     """Create data directory if it doesn't exist"""
@@ -52,33 +106,101 @@ def clean_nan_values(obj):
     else:
         return obj
 
-def save_json_to_file(filename, data, data_type):
+def load_selenium():
+    """Import the Selenium webdriver modules into this module on first use"""
+    global webdriver, By, Options, Service, WebDriverWait, EC
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.support.wait import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+def column_to_list(values):
+    """JSON-ready list for a column: stdlib engine lists pass through, pandas Series get NaN/Inf as None"""
+    if isinstance(values, list):
+        return values
+    import numpy as np
+    array = values.to_numpy()
+    missing = ~np.isfinite(array) if values.dtype.kind == "f" else values.isna().to_numpy()
+    column = array.tolist()
+    if missing.any():
+        for i in np.flatnonzero(missing).tolist():
+            column[i] = None
+    return column
+
+@tracing.traced()
+def read_csv_table(csv_path, encoding="utf-8", usecols=None):
+    """Read a CSV into {column name: values} with CSV_ENGINE (pandas Series or stdlib lists)"""
+    if CSV_ENGINE == "pandas":
+        import pandas as pd
+        df = pd.read_csv(csv_path, encoding=encoding, usecols=usecols)
+        return {name: df[name] for name in df.columns}
+    names, columns = csv_engine.read_csv(csv_path, encoding, usecols)
+    return dict(zip(names, columns))
+
+def table_rows(table):
+    return len(next(iter(table.values()))) if table else 0
+
+def has_values(values):
+    if isinstance(values, list):
+        return any(v is not None for v in values)
+    return bool(values.notna().any())
+
+@tracing.traced()
+def save_json_to_file(filename, data, data_type, metadata=None, clean_nan=True):
     """Save JSON data to file in data directory"""
     try:
         # Ensure data directory exists
         if not ensure_data_directory():
             raise Exception("Failed to create data directory")
 
-        # Clean NaN values from data before saving
-        cleaned_data = clean_nan_values(data)
-
-        # Prepare data with metadata
-        json_data = {
-            "metadata": {
-                "data_type": data_type,
-                "uploaded_at": datetime.now().isoformat(),
-                "total_records": len(cleaned_data),
-                "generated_by": "ipo_scraper_final.py"
-            },
-            "data": cleaned_data
+        # Clean NaN values from data before saving (records from read_csv_records already are)
+        if clean_nan:
+            with tracing.span("clean_nan_values"):
+                cleaned_data = clean_nan_values(data)
+        else:
+            cleaned_data = data
+        file_path = os.path.join(DATA_DIR, filename)
+        tracing.annotate(dataset=filename, records=len(cleaned_data))
+
+        # Incremental mode: compare with the previous file and write a changeset of what changed.
+        # An unchanged dataset is still rewritten, so uploaded_at and the output format stay current.
+        changed = True
+        key_field = DATASET_KEYS.get(filename)
+        if INCREMENTAL_WRITES and key_field:
+            with tracing.span("diff_previous"):
+                previous = dataset_diff.load_existing_records(file_path)
+                changeset = dataset_diff.diff_records(previous, cleaned_data, key_field) if previous is not None else None
+            if previous is not None:
+                changed = dataset_diff.has_changes(changeset)
+                if changed:
+                    changes_path = dataset_diff.write_changeset(CHANGES_DIR, filename, key_field, changeset)
+                    print(f"INFO: {filename} changes - {len(changeset['added'])} added, "
+                          f"{len(changeset['removed'])} removed, {len(changeset['modified'])} modified ({changes_path})")
+                else:
+                    print(f"INFO: No changes in {filename} ({len(cleaned_data)} records), refreshing its metadata")
+            tracing.annotate(changed=changed)
+
+        # Prepare metadata
+        metadata = metadata or {
+            "data_type": data_type,
+            "uploaded_at": datetime.now().isoformat(),
+            "total_records": len(cleaned_data),
+            "generated_by": "ipo_scraper_final.py"
         }
 
-        # Save to file
-        file_path = os.path.join(DATA_DIR, filename)
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(json_data, f, indent=4, ensure_ascii=False)
-        
-        print(f"SUCCESS: Saved {len(cleaned_data)} {data_type} records to {file_path}")
+        # Stream to a temp file and atomically replace the previous file
+        with tracing.span("write_json", format=JSON_OUTPUT_FORMAT):
+            size = json_writer.write_json_dataset(file_path, metadata, cleaned_data, JSON_OUTPUT_FORMAT, JSON_SERIALIZER)
+
+        print(f"SUCCESS: Saved {len(cleaned_data)} {data_type} records to {file_path} ({size} bytes, {JSON_OUTPUT_FORMAT})")
+        progress.emit("records_written", dataset=filename, records=len(cleaned_data), bytes=size, changed=changed)
+
+        # Optional Arrow / Parquet copies for column-oriented readers
+        if COLUMNAR_FORMATS:
+            with tracing.span("columnar_export", formats=",".join(COLUMNAR_FORMATS)):
+                columnar_export.export_dataset(file_path, metadata, cleaned_data, COLUMNAR_FORMATS)
         return True
     except Exception as e:
         print(f"ERROR: Failed to save JSON file: {str(e)}")
@@ -86,6 +208,58 @@ def save_json_to_file(filename, data, data_type):
         print(f"TRACEBACK: {traceback.format_exc()}")
         return False
 
+# Pipeline -> whether this run's conversion was a processing cache hit (reported as result["cache_hit"])
+PROCESS_CACHE_HITS = {}
+
+def process_cache_settings():
+    """Settings that change the converted files; a cached conversion only counts under the same settings"""
+    return f"v{PROCESS_CACHE_VERSION}|{JSON_OUTPUT_FORMAT}|{','.join(COLUMNAR_FORMATS)}"
+
+def dataset_files(*names):
+    """Files written for the given datasets: the JSON files and their columnar copies"""
+    files = []
+    for name in names:
+        path = os.path.join(DATA_DIR, name)
+        files.append(path)
+        files.extend(columnar_export.columnar_paths(path, COLUMNAR_FORMATS).values())
+    return files
+
+def find_processed(csv_path, pipeline):
+    """(source sha256, cache entry) for a CSV; the entry is set when this exact CSV was already converted"""
+    if not PROCESS_CACHE:
+        return None, None
+    with tracing.span("sha256", file=os.path.basename(csv_path)):
+        source_sha256 = processing_cache.file_sha256(csv_path)
+    entry = processing_cache.lookup(DATA_DIR, pipeline, source_sha256, process_cache_settings())
+    PROCESS_CACHE_HITS[pipeline] = entry is not None
+    if entry:
+        print(f"INFO: {os.path.basename(csv_path)} is unchanged (sha256 {source_sha256[:12]}), {pipeline} is up to date - skipping conversion")
+        progress.emit("cache_hit", pipeline=pipeline, source_sha256=source_sha256, records=entry["records"])
+    else:
+        progress.emit("cache_miss", pipeline=pipeline, source_sha256=source_sha256)
+    return source_sha256, entry
+
+def remember_processed(pipeline, source_sha256, files, records):
+    """Record a finished conversion in the processing cache"""
+    if not source_sha256:
+        return
+    try:
+        processing_cache.record(DATA_DIR, pipeline, source_sha256, process_cache_settings(), files, records)
+    except Exception as e:
+        print(f"WARNING: Failed to update the processing cache: {str(e)}")
+
+def print_final_result(result):
+    """Attach the processing cache report, browser network stats and timings, and print the result JSON for callers parsing stdout"""
+    if PROCESS_CACHE_HITS:
+        result["cache_hit"] = all(PROCESS_CACHE_HITS.values())
+    if NETWORK_STATS:
+        result["network"] = dict(NETWORK_STATS)
+    result["timings"] = tracing.timings()
+    print("\n" + "="*60)
+    print("FINAL AUTOMATION RESULT:")
+    print("="*60)
+    print(json.dumps(result, indent=2))
+
 def clean_download_folder():
     """Clean data files and prevent duplicate downloads"""
     files_to_remove = [
@@ -102,14 +276,15 @@ def clean_download_folder():
             except Exception as e:
                 print(f"WARNING: Could not remove {fname}: {str(e)}")
 
-def clean_ipo_files():
+def clean_ipo_files(download_dir=None):
     """Clean IPO-specific files before and after processing"""
+    download_dir = download_dir or DOWNLOAD_DIR
     ipo_files = [
         "IPO.csv", "IPO-SME.csv", "ipo.json", "ipo-main.json", "ipo-sme.json",
         "ipo-in-india-list-main-board-sme.csv"
     ]
     for fname in ipo_files:
-        file_path = os.path.join(DOWNLOAD_DIR, fname)
+        file_path = os.path.join(download_dir, fname)
         if os.path.exists(file_path):
             try:
                 os.remove(file_path)
@@ -117,108 +292,93 @@ def clean_ipo_files():
             except Exception as e:
                 print(f"WARNING: Could not remove IPO file {fname}: {str(e)}")
 
-def clean_existing_downloads(file_pattern):
+def clean_existing_downloads(file_pattern, download_dir=None):
     """Clean specific file patterns to prevent duplicates"""
+    download_dir = download_dir or DOWNLOAD_DIR
     try:
-        for file in os.listdir(DOWNLOAD_DIR):
+        for file in os.listdir(download_dir):
             if file_pattern.lower() in file.lower() and file.endswith('.csv'):
-                file_path = os.path.join(DOWNLOAD_DIR, file)
+                file_path = os.path.join(download_dir, file)
                 os.remove(file_path)
                 print(f"INFO: Removed existing file: {file}")
     except Exception as e:
         print(f"WARNING: Error cleaning existing downloads: {str(e)}")
 
-def wait_for_file(ext=".csv", timeout=TIMEOUT, min_size=100):
+@tracing.traced()
+def wait_for_file(ext=".csv", timeout=TIMEOUT, min_size=100, download_dir=None):
     """Wait for file download"""
-    deadline = time.time() + timeout
-    attempts = 0
-    while time.time() < deadline:
-        attempts += 1
-        if attempts % 5 == 0:  # Print status every 10 seconds
-            remaining = int(deadline - time.time())
-            print(f"INFO: Still waiting for {ext} file... ({remaining}s remaining)")
-        
-        if not os.path.exists(DOWNLOAD_DIR):
-            print(f"ERROR: Download directory does not exist: {DOWNLOAD_DIR}")
-            time.sleep(2)
-            continue
-            
-        try:
-            files = os.listdir(DOWNLOAD_DIR)
-            for fname in files:
-                if not fname.lower().endswith(ext):
-                    continue
-                if fname.endswith(".crdownload"):
-                    if attempts % 5 == 0:
-                        print(f"INFO: Found incomplete download: {fname}")
-                    continue
-                    
-                full = os.path.join(DOWNLOAD_DIR, fname)
-                try:
-                    if os.path.exists(full):
-                        file_size = os.path.getsize(full)
-                        if file_size >= min_size:
-                            # Try to open file to ensure it's not locked
-                            with open(full, "rb") as f:
-                                f.read(1)
-                            print(f"SUCCESS: Found valid file: {fname} ({file_size} bytes)")
-                            return full
-                        else:
-                            if attempts % 5 == 0:
-                                print(f"INFO: File {fname} too small: {file_size} bytes (need {min_size})")
-                except PermissionError:
-                    if attempts % 5 == 0:
-                        print(f"INFO: File {fname} is locked, waiting...")
-                except Exception as file_err:
-                    if attempts % 5 == 0:
-                        print(f"WARNING: Error checking file {fname}: {str(file_err)}")
-        except Exception as dir_err:
-            print(f"ERROR: Error listing directory: {str(dir_err)}")
-        
-        time.sleep(2)
-    
+    download_dir = download_dir or DOWNLOAD_DIR
+    if not os.path.exists(download_dir):
+        print(f"ERROR: Download directory does not exist: {download_dir}")
+
+    ext = ext.lower()
+    full = wait_for_download(download_dir, lambda fname: fname.lower().endswith(ext), timeout, min_size)
+    if full:
+        print(f"SUCCESS: Found valid file: {os.path.basename(full)} ({os.path.getsize(full)} bytes)")
+        return full
+
     # Final check - list all files
     print(f"ERROR: Timeout waiting for {ext} file")
-    if os.path.exists(DOWNLOAD_DIR):
-        print(f"INFO: Files in download directory: {os.listdir(DOWNLOAD_DIR)}")
+    if os.path.exists(download_dir):
+        print(f"INFO: Files in download directory: {os.listdir(download_dir)}")
     raise TimeoutException(f"No valid {ext} file found in {timeout}s")
 
-def wait_for_file_with_name(filename, timeout=TIMEOUT, min_size=100):
+@tracing.traced()
+def wait_for_file_with_name(filename, timeout=TIMEOUT, min_size=100, download_dir=None):
     """Wait for specific file to be downloaded"""
-    deadline = time.time() + timeout
-    target_path = os.path.join(DOWNLOAD_DIR, filename)
-
-    while time.time() < deadline:
-        # Check for exact filename
-        if os.path.exists(target_path) and not target_path.endswith(".crdownload"):
-            try:
-                if os.path.getsize(target_path) >= min_size:
-                    with open(target_path, "rb") as f:
-                        f.read(1)
-                    print(f"SUCCESS: Found specific file {filename}")
-                    return target_path
-            except:
-                pass
+    download_dir = download_dir or DOWNLOAD_DIR
+    pattern = filename.lower()
 
-        # Check for any file containing the pattern
-        for fname in os.listdir(DOWNLOAD_DIR):
-            if filename.lower() in fname.lower() and not fname.endswith(".crdownload"):
-                full_path = os.path.join(DOWNLOAD_DIR, fname)
-                try:
-                    if os.path.exists(full_path) and os.path.getsize(full_path) >= min_size:
-                        with open(full_path, "rb") as f:
-                            f.read(1)
-                        print(f"SUCCESS: Found matching file {fname}")
-                        return full_path
-                except:
-                    pass
-        time.sleep(2)
+    # Matches the exact filename as well as Chrome's renamed copies, e.g. "name (1).csv"
+    full_path = wait_for_download(download_dir, lambda fname: pattern in fname.lower(), timeout, min_size)
+    if full_path:
+        print(f"SUCCESS: Found matching file {os.path.basename(full_path)}")
+        return full_path
 
     print(f"WARNING: Specific file {filename} not found after {timeout}s")
     return None
 
-def setup_driver():
+# Source -> browser network stats of this run's exports (reported as result["network"])
+NETWORK_STATS = {}
+NETWORK_STATS_LOCK = threading.Lock()
+
+def block_requests(driver, source, page_url):
+    """Apply the source's request policy to the driver before a browser export"""
+    try:
+        patterns = request_policy.apply(driver, source, page_url)
+        print(f"INFO: Blocking {len(patterns)} URL patterns for {source} (ads, analytics, fonts, stylesheets, media)")
+    except Exception as e:
+        print(f"WARNING: Failed to apply the {source} request policy: {str(e)}")
+
+def record_network_stats(driver, source):
+    """Add the requests and bytes of the export that just finished to NETWORK_STATS"""
+    stats = request_policy.network_stats(request_policy.read_performance_log(driver))
+    tracing.annotate(requests_loaded=stats["requests_loaded"], requests_blocked=stats["requests_blocked"],
+                     bytes_received=stats["bytes_received"])
+    with NETWORK_STATS_LOCK:
+        request_policy.merge_stats(NETWORK_STATS.setdefault(source, {}), stats)
+    print(f"INFO: {source} page loaded {stats['requests_loaded']} requests ({stats['bytes_received']} bytes), "
+          f"blocked {stats['requests_blocked']}")
+    progress.emit("network", source=source, requests_loaded=stats["requests_loaded"],
+                  requests_blocked=stats["requests_blocked"], bytes_received=stats["bytes_received"])
+
+def fetch_over_http(download, url, *args):
+    """Run an http_fetch download in a span; returns the CSV path or None (caller falls back to Chrome)"""
+    with tracing.span("http_fetch", url=url):
+        csv_file = download(url, *args)
+        tracing.annotate(downloaded=bool(csv_file))
+    return report_download(csv_file, "http")
+
+def report_download(csv_file, source):
+    """Emit a download event for a fetched CSV ("http" or "browser"); returns the path unchanged"""
+    if csv_file and os.path.exists(csv_file):
+        progress.emit("download", file=os.path.basename(csv_file), bytes=os.path.getsize(csv_file), source=source)
+    return csv_file
+
+@tracing.traced()
+def setup_driver(download_dir=None):
     """Setup Chrome driver for critical web automation - Headless for Vercel"""
+    load_selenium()
     opts = Options()
 
     # Always run headless for Vercel deployment
@@ -244,7 +404,7 @@ def setup_driver():
     opts.add_experimental_option('useAutomationExtension', False)
 
     prefs = {
-        "download.default_directory": DOWNLOAD_DIR,
+        "download.default_directory": download_dir or DOWNLOAD_DIR,
         "download.prompt_for_download": False,
         "download.directory_upgrade": True,
         "safebrowsing.enabled": True,
@@ -253,6 +413,8 @@ def setup_driver():
         "profile.managed_default_content_settings.images": 2
     }
     opts.add_experimental_option("prefs", prefs)
+    # Network events for the per-export request stats (see request_policy)
+    opts.set_capability("goog:loggingPrefs", request_policy.LOGGING_PREFS)
 
     driver = None
     errors = []
@@ -303,63 +465,124 @@ def setup_driver():
             driver.quit()
         raise Exception(f"CRITICAL FAILURE: Chrome driver setup failed - {str(e)}")
 
+def acquire_driver(download_dir=None):
+    """Check out a warm driver from the browser pool service, or start a new one"""
+    download_dir = download_dir or DOWNLOAD_DIR
+    driver = browser_pool.checkout(download_dir)
+    if driver is None:
+        driver = setup_driver(download_dir)
+    return driver
+
+def release_driver(driver):
+    """Return a pooled driver to the pool service, or quit a driver we started"""
+    if browser_pool.is_pooled(driver):
+        browser_pool.checkin(driver)
+    else:
+        driver.quit()
+
+class LazyDriver:
+    """Start (or check out) a Chrome driver only when a task falls back to the browser"""
+
+    def __init__(self, download_dir=None):
+        self.download_dir = download_dir
+        self.driver = None
+
+    def get(self):
+        if self.driver is None:
+            print("INFO: Initializing Chrome driver for headless automation...")
+            self.driver = acquire_driver(self.download_dir)
+            print("SUCCESS: Chrome driver ready for CRITICAL headless automation")
+        return self.driver
+
+    def close(self):
+        if self.driver is not None:
+            release_driver(self.driver)
+            self.driver = None
+            print("INFO: Chrome driver closed")
+
+def resolve_driver(driver):
+    """Return a live driver for either a LazyDriver or an already started driver"""
+    return driver.get() if isinstance(driver, LazyDriver) else driver
+
+@tracing.traced()
+def read_csv_records(csv_path, json_name):
+    """Read a downloaded CSV into JSON-ready records with normalized field names; None on failure"""
+    if not os.path.exists(csv_path):
+        error_msg = f"CSV file not found: {csv_path}"
+        print(f"ERROR: {error_msg}")
+        return None
+
+    print(f"INFO: Reading CSV file (size: {os.path.getsize(csv_path)} bytes)...")
+    try:
+        table = read_csv_table(csv_path, encoding='utf-8')
+    except UnicodeDecodeError:
+        print("WARNING: UTF-8 encoding failed, trying latin-1...")
+        table = read_csv_table(csv_path, encoding='latin-1')
+    except Exception as read_error:
+        print(f"ERROR: Failed to read CSV: {str(read_error)}")
+        return None
+
+    row_count = table_rows(table)
+    if row_count == 0:
+        error_msg = f"CSV file is empty: {csv_path}"
+        print(f"ERROR: {error_msg}")
+        return None
+
+    print(f"INFO: CSV loaded successfully ({CSV_ENGINE} engine) - {row_count} rows, {len(table)} columns")
+    print(f"INFO: Column names: {list(table)}")
+
+    # Normalize column names: replace spaces with underscores and handle special characters
+    names = [c.strip().replace(' ', '_').replace('-', '_').replace('(', '').replace(')', '').replace('.', '') for c in table]
+    columns = [column_to_list(values) for values in table.values()]
+    print(f"INFO: Normalized column names: {names}")
+
+    # Filter securities for active stocks only
+    if json_name in ["SecurityList.json", "securities.json"] and "Status" in names:
+        print(f"INFO: Filtering active securities (total: {row_count})...")
+        status = columns[names.index("Status")]
+        keep = [i for i, value in enumerate(status) if isinstance(value, str) and value.strip().upper() == 'ACTIVE']
+        columns = [[column[i] for i in keep] for column in columns]
+        print(f"INFO: Filtered to {len(keep)} active stocks from {row_count} total")
+    elif json_name in ["SecurityList.json", "securities.json"]:
+        print(f"WARNING: 'Status' column not found, skipping filter")
+
+    json_data = [dict(zip(names, row)) for row in zip(*columns)]
+
+    # IPO reports: parse dates, prices and amounts once and store newest first
+    if ipo_fields.is_ipo_report(names):
+        json_data = ipo_fields.sort_by_opening_date(ipo_fields.add_typed_fields(json_data))
+        print("INFO: Added typed date, price and amount fields, sorted by opening date")
+
+    print(f"INFO: Converted to JSON - {len(json_data)} records")
+    return json_data
+
+@tracing.traced()
 def process_csv_to_json(csv_path, json_name, data_type):
-    """Convert CSV to JSON with normalized field names and save to data folder"""
+    """Convert CSV to JSON with normalized field names and save to data folder; returns (success, record count)"""
     try:
         print(f"INFO: Processing CSV file: {csv_path}")
         print(f"INFO: Target JSON file: {json_name}")
         print(f"INFO: Data type: {data_type}")
-        
-        if not os.path.exists(csv_path):
-            error_msg = f"CSV file not found: {csv_path}"
-            print(f"ERROR: {error_msg}")
-            return False, None
 
-        print(f"INFO: Reading CSV file (size: {os.path.getsize(csv_path)} bytes)...")
-        try:
-            df = pd.read_csv(csv_path, encoding='utf-8')
-        except UnicodeDecodeError:
-            print("WARNING: UTF-8 encoding failed, trying latin-1...")
-            df = pd.read_csv(csv_path, encoding='latin-1')
-        except Exception as read_error:
-            print(f"ERROR: Failed to read CSV: {str(read_error)}")
-            return False, None
-        
-        if df.empty:
-            error_msg = f"CSV file is empty: {csv_path}"
-            print(f"ERROR: {error_msg}")
+        source_sha256, cached = find_processed(csv_path, json_name)
+        if cached:
+            return True, cached["records"][json_name]
+
+        json_data = read_csv_records(csv_path, json_name)
+        if json_data is None:
             return False, None
 
-        print(f"INFO: CSV loaded successfully - {len(df)} rows, {len(df.columns)} columns")
-        print(f"INFO: Column names: {list(df.columns)}")
-
-        # Normalize column names: replace spaces with underscores and handle special characters
-        df.columns = [c.strip().replace(' ', '_').replace('-', '_').replace('(', '').replace(')', '').replace('.', '') for c in df.columns]
-        df = df.where(pd.notnull(df), None)
-        print(f"INFO: Normalized column names: {list(df.columns)}")
-
-        # Filter securities for active stocks only
-        if json_name in ["SecurityList.json", "securities.json"] and "Status" in df.columns:
-            original_count = len(df)
-            print(f"INFO: Filtering active securities (total: {original_count})...")
-            df = df[df['Status'].str.strip().str.upper() == 'ACTIVE']
-            print(f"INFO: Filtered to {len(df)} active stocks from {original_count} total")
-        elif json_name in ["SecurityList.json", "securities.json"]:
-            print(f"WARNING: 'Status' column not found, skipping filter")
-
-        json_data = df.to_dict(orient="records")
-        print(f"INFO: Converted to JSON - {len(json_data)} records")
-        
         # Save to data folder
         print(f"INFO: Saving to data folder...")
-        success = save_json_to_file(json_name, json_data, data_type)
+        success = save_json_to_file(json_name, json_data, data_type, clean_nan=False)
         if not success:
             error_msg = "Failed to save JSON file"
             print(f"ERROR: {error_msg}")
             return False, None
         
-        print(f"SUCCESS: Created {json_name} with {len(df)} records in data folder")
-        return True, json_data
+        remember_processed(json_name, source_sha256, dataset_files(json_name), {json_name: len(json_data)})
+        print(f"SUCCESS: Created {json_name} with {len(json_data)} records in data folder")
+        return True, len(json_data)
     except Exception as e:
         error_msg = f"CSV processing failed: {str(e)}"
         print(f"ERROR: {error_msg}")
@@ -367,6 +590,24 @@ def process_csv_to_json(csv_path, json_name, data_type):
         print(f"TRACEBACK: {traceback.format_exc()}")
         return False, None
 
+def split_ipo_records(records):
+    """Partition the combined Chittorgarh report into (mainboard, SME) records by Listing_at"""
+    mainboard, sme = [], []
+    seen = set()
+    for record in records:
+        # The same IPO can appear more than once in the combined report
+        key = (record.get("Company") or "").strip()
+        if key:
+            if key in seen:
+                continue
+            seen.add(key)
+        if "SME" in str(record.get("Listing_at") or "").upper():
+            sme.append(record)
+        else:
+            mainboard.append(record)
+    return mainboard, sme
+
+@tracing.traced()
 def process_existing_ipo_data():
     """Process existing IPO.csv file and save to data folder"""
     print("INFO: Starting existing IPO data processing...")
@@ -380,12 +621,12 @@ def process_existing_ipo_data():
         print(f"INFO: Processing existing IPO data from {ipo_csv_path}...")
 
         # Process CSV to JSON and save to data folder as ipo-main.json
-        success, json_data = process_csv_to_json(ipo_csv_path, "ipo-main.json", "IPO_Mainboard_Data")
-        if not success or not json_data:
+        success, record_count = process_csv_to_json(ipo_csv_path, "ipo-main.json", "IPO_Mainboard_Data")
+        if not success or not record_count:
             raise Exception("Failed to process IPO CSV to JSON")
 
         print(f"SUCCESS: IPO data processed and saved successfully!")
-        print(f"Records processed: {len(json_data)}")
+        print(f"Records processed: {record_count}")
         print(f"File saved: data/ipo-main.json")
 
         # Clean up CSV files after successful processing
@@ -395,7 +636,7 @@ def process_existing_ipo_data():
 
         return {
             "success": True,
-            "records_processed": len(json_data),
+            "records_processed": record_count,
             "files_created": ["data/ipo-main.json"],
             "file_saved": True
         }
@@ -413,6 +654,7 @@ def process_existing_ipo_data():
             "file_saved": False
         }
 
+@tracing.traced()
 def process_existing_securities_data():
     """Process existing SecurityList.csv file and save to data folder"""
     print("INFO: Starting existing Securities data processing...")
@@ -426,12 +668,12 @@ def process_existing_securities_data():
         print(f"INFO: Processing existing Securities data from {securities_csv_path}...")
 
         # Process CSV to JSON and save to data folder
-        success, json_data = process_csv_to_json(securities_csv_path, "securities.json", "BSE_Security")
-        if not success or not json_data:
+        success, record_count = process_csv_to_json(securities_csv_path, "securities.json", "BSE_Security")
+        if not success or not record_count:
             raise Exception("Failed to process Securities CSV to JSON")
 
         print(f"SUCCESS: Securities data processed and saved successfully!")
-        print(f"Records processed: {len(json_data)}")
+        print(f"Records processed: {record_count}")
         print(f"File saved: data/securities.json")
 
         # Clean up CSV files after successful processing
@@ -443,7 +685,7 @@ def process_existing_securities_data():
 
         return {
             "success": True,
-            "records_processed": len(json_data),
+            "records_processed": record_count,
             "files_created": ["data/securities.json"],
             "file_saved": True
         }
@@ -461,6 +703,33 @@ def process_existing_securities_data():
             "file_saved": False
         }
 
+# Placeholder entries in the Security Name column (like "Equity", "Preference Shares", "-", empty strings, etc.)
+INVALID_SECURITY_NAMES = ["Equity", "Preference Shares", "-", "", "NA", "N/A", "null", "None"]
+
+@tracing.traced()
+def clean_security_names(names):
+    """Stripped, valid, de-duplicated security names from a Series or list, in first-seen order"""
+    if isinstance(names, list):
+        stripped = (str(name).strip() for name in names if name is not None)
+        return list(dict.fromkeys(name for name in stripped if name not in INVALID_SECURITY_NAMES))
+    names = names.dropna().astype(str).str.strip()
+    names = names[~names.isin(INVALID_SECURITY_NAMES)]
+    return names.drop_duplicates().tolist()
+
+def delete_equity_csv(original_equity_path):
+    """Delete Equity.csv file after successful conversion"""
+    print(f"INFO: Deleting Equity.csv file after successful conversion...")
+    try:
+        if original_equity_path and os.path.exists(original_equity_path):
+            os.remove(original_equity_path)
+            print(f"SUCCESS: Deleted Equity.csv from: {original_equity_path}")
+        else:
+            print(f"WARNING: Equity.csv not found for deletion at: {original_equity_path} (may have been already deleted)")
+    except Exception as delete_error:
+        print(f"WARNING: Failed to delete Equity.csv: {str(delete_error)}")
+        # Don't fail the whole operation if deletion fails
+
+@tracing.traced()
 def process_equity_csv_to_security_json():
     """Convert Equity.csv to Security.json with only Security Name column"""
     print("INFO: Starting Equity.csv to Security.json conversion...")
@@ -483,75 +752,70 @@ def process_equity_csv_to_security_json():
                 raise Exception("Equity.csv file not found in download directory or parent directory")
         
         print(f"INFO: Found Equity.csv at: {equity_csv_path}")
+
+        source_sha256, cached = find_processed(equity_csv_path, "Security.json")
+        if cached:
+            delete_equity_csv(original_equity_path)
+            return {
+                "success": True,
+                "records_processed": cached["records"]["Security.json"],
+                "file_path": os.path.join(DATA_DIR, "Security.json"),
+                "file_saved": True,
+                "equity_csv_deleted": True
+            }
+
         print(f"INFO: Reading CSV file...")
         
         # Read CSV file - only read the columns we need to avoid issues with trailing commas
         try:
             # Read only the first 9 columns to avoid empty columns from trailing commas
-            df = pd.read_csv(equity_csv_path, encoding='utf-8', usecols=range(9))
+            table = read_csv_table(equity_csv_path, encoding='utf-8', usecols=range(9))
         except UnicodeDecodeError:
             print("WARNING: UTF-8 encoding failed, trying latin-1...")
-            df = pd.read_csv(equity_csv_path, encoding='latin-1', usecols=range(9))
+            table = read_csv_table(equity_csv_path, encoding='latin-1', usecols=range(9))
         except Exception as read_error:
             # Fallback: read all columns and clean up
             try:
-                df = pd.read_csv(equity_csv_path, encoding='utf-8')
+                table = read_csv_table(equity_csv_path, encoding='utf-8')
             except UnicodeDecodeError:
-                df = pd.read_csv(equity_csv_path, encoding='latin-1')
+                table = read_csv_table(equity_csv_path, encoding='latin-1')
             # Remove empty columns (columns with all NaN values)
-            df = df.dropna(axis=1, how='all')
+            table = {name: values for name, values in table.items() if has_values(values)}
         
-        if df.empty:
+        if table_rows(table) == 0:
             raise Exception("Equity.csv file is empty")
         
-        print(f"INFO: CSV loaded successfully - {len(df)} rows, {len(df.columns)} columns")
-        print(f"INFO: Available columns: {list(df.columns)}")
+        columns = list(table)
+        print(f"INFO: CSV loaded successfully ({CSV_ENGINE} engine) - {table_rows(table)} rows, {len(columns)} columns")
+        print(f"INFO: Available columns: {columns}")
         print(f"INFO: First few rows of 'Security Name' column:")
-        if "Security Name" in df.columns:
-            print(df["Security Name"].head(10).tolist())
+        if "Security Name" in table:
+            print(column_to_list(table["Security Name"][:10]))
         
         # Check if "Security Name" column exists (with space)
-        if "Security Name" not in df.columns:
+        if "Security Name" not in table:
             # Try variations
-            if "Security_Name" in df.columns:
-                df.rename(columns={"Security_Name": "Security Name"}, inplace=True)
+            if "Security_Name" in table:
+                table["Security Name"] = table.pop("Security_Name")
                 print("INFO: Renamed 'Security_Name' to 'Security Name'")
-            elif "SecurityName" in df.columns:
-                df.rename(columns={"SecurityName": "Security Name"}, inplace=True)
+            elif "SecurityName" in table:
+                table["Security Name"] = table.pop("SecurityName")
                 print("INFO: Renamed 'SecurityName' to 'Security Name'")
             else:
                 # Try to find column by index (4th column, index 3)
-                if len(df.columns) >= 4:
-                    col_name = df.columns[3]
+                if len(columns) >= 4:
+                    col_name = columns[3]
                     print(f"WARNING: 'Security Name' column not found by name, trying 4th column (index 3): '{col_name}'")
-                    df.rename(columns={col_name: "Security Name"}, inplace=True)
+                    table["Security Name"] = table.pop(col_name)
                     print(f"INFO: Renamed column '{col_name}' to 'Security Name'")
                 else:
-                    raise Exception(f"'Security Name' column not found. Available columns: {list(df.columns)}")
+                    raise Exception(f"'Security Name' column not found. Available columns: {columns}")
         
         # Extract only "Security Name" column
         print("INFO: Extracting 'Security Name' column...")
         
-        # Get all security names, filter out invalid values
-        security_names = df["Security Name"].dropna().tolist()
-        
-        # Remove invalid entries (like "Equity", "Preference Shares", "-", empty strings, etc.)
-        invalid_values = ["Equity", "Preference Shares", "-", "", "NA", "N/A", "null", "None"]
-        security_names = [
-            str(name).strip() 
-            for name in security_names 
-            if str(name).strip() and str(name).strip() not in invalid_values
-        ]
-        
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_security_names = []
-        for name in security_names:
-            if name not in seen:
-                seen.add(name)
-                unique_security_names.append(name)
-        
-        security_names = unique_security_names
+        # Get all security names, filter out invalid values and duplicates
+        security_names = clean_security_names(table["Security Name"])
         
         print(f"INFO: Found {len(security_names)} unique security names")
         print(f"INFO: Sample security names (first 10): {security_names[:10]}")
@@ -573,34 +837,29 @@ def process_equity_csv_to_security_json():
             ]
         }
         
-        # Ensure data directory exists
-        if not ensure_data_directory():
-            raise Exception("Failed to create data directory")
-        
         # Save to data folder as Security.json
         json_file_path = os.path.join(DATA_DIR, "Security.json")
         print(f"INFO: Saving to {json_file_path}...")
-        
-        with open(json_file_path, "w", encoding="utf-8") as f:
-            json.dump(json_data, f, indent=4, ensure_ascii=False)
-        
+
+        if not save_json_to_file("Security.json", json_data["data"], "BSE_Security_Names", metadata=json_data["metadata"], clean_nan=False):
+            raise Exception("Failed to save Security.json")
+
         print(f"SUCCESS: Security.json created successfully!")
         print(f"SUCCESS: File saved at: {json_file_path}")
         print(f"SUCCESS: Total security names: {len(security_names)}")
         print(f"SUCCESS: File size: {os.path.getsize(json_file_path)} bytes")
-        
-        # Delete Equity.csv file after successful conversion
-        print(f"INFO: Deleting Equity.csv file after successful conversion...")
+
+        # Precompute the prefix / trigram search index used for autocomplete
         try:
-            if original_equity_path and os.path.exists(original_equity_path):
-                os.remove(original_equity_path)
-                print(f"SUCCESS: Deleted Equity.csv from: {original_equity_path}")
-            else:
-                print(f"WARNING: Equity.csv not found for deletion at: {original_equity_path} (may have been already deleted)")
-        except Exception as delete_error:
-            print(f"WARNING: Failed to delete Equity.csv: {str(delete_error)}")
-            # Don't fail the whole operation if deletion fails
+            indexed = security_index.build_index(security_names, SECURITY_INDEX_PATH)
+            print(f"SUCCESS: Built security search index with {indexed} names ({os.path.getsize(SECURITY_INDEX_PATH)} bytes)")
+        except Exception as index_error:
+            print(f"WARNING: Failed to build security search index: {str(index_error)}")
         
+        remember_processed("Security.json", source_sha256, dataset_files("Security.json") + [SECURITY_INDEX_PATH],
+                           {"Security.json": len(security_names)})
+
+        delete_equity_csv(original_equity_path)
         return {
             "success": True,
             "records_processed": len(security_names),
@@ -621,113 +880,133 @@ def process_equity_csv_to_security_json():
             "file_saved": False
         }
 
-def fetch_bse_securities(driver):
+@tracing.traced()
+def export_bse_csv_with_browser(driver, download_dir):
+    """Select Equity T+1 on the BSE List of Scrips page and download the CSV with Chrome"""
+    load_selenium()
+    block_requests(driver, "bse", BSE_SECURITIES_URL)
+    print("INFO: Navigating to BSE securities page...")
+    with tracing.span("driver.get", url=BSE_SECURITIES_URL):
+        driver.get(BSE_SECURITIES_URL)
+    print(f"INFO: Page title: {driver.title}")
+
+    print("INFO: Waiting for page to load...")
+    readiness.wait(driver, "bse_page_load", readiness.document_ready, READY_TIMEOUT)
+    segment_dropdown = readiness.wait(driver, "bse_segment_dropdown", readiness.element_enabled((By.ID, "ddlsegment")), READY_TIMEOUT)
+
+    print("INFO: Selecting Equity T+1 segment...")
+    # Select Equity T+1 segment
+    segment_script = """
+        var segment = document.getElementById('ddlsegment');
+        if (!segment) throw new Error('Segment dropdown not found');
+
+        var found = false;
+        var options = [];
+        for(var i = 0; i < segment.options.length; i++) {
+            options.push(segment.options[i].text);
+            if(segment.options[i].text === 'Equity T+1') {
+                segment.selectedIndex = i;
+                segment.dispatchEvent(new Event('change'));
+                found = true;
+                break;
+            }
+        }
+        if (!found) {
+            throw new Error('Equity T+1 option not found. Available options: ' + options.join(', '));
+        }
+        return 'SUCCESS: Equity T+1 selected';
+    """
+
+    try:
+        result = driver.execute_script(segment_script)
+        print(f"INFO: {result}")
+    except Exception as script_error:
+        print(f"ERROR: JavaScript execution failed: {str(script_error)}")
+        raise Exception(f"Failed to select Equity T+1 segment: {str(script_error)}")
+
+    # The segment change posts the page back: until the old dropdown goes stale, btnSubmit is the old page's button
+    readiness.wait(driver, "bse_segment_postback", readiness.page_replaced(segment_dropdown), READY_TIMEOUT)
+    readiness.settle(driver, "bse_segment_page_idle", readiness.network_idle(), NETWORK_IDLE_TIMEOUT)
+
+    print("INFO: Looking for submit button (ID: btnSubmit)...")
+    try:
+        btn_submit = readiness.wait(driver, "bse_submit_button", readiness.element_enabled((By.ID, "btnSubmit")), READY_TIMEOUT)
+        print("INFO: Submit button found, clicking...")
+        driver.execute_script("arguments[0].click();", btn_submit)
+        print("SUCCESS: Submit button clicked")
+    except TimeoutException:
+        print("ERROR: Submit button not found or not clickable")
+        # Try to find alternative selectors
+        try:
+            btn_submit = driver.find_element(By.CSS_SELECTOR, "input[type='submit'], button[type='submit']")
+            driver.execute_script("arguments[0].click();", btn_submit)
+            print("SUCCESS: Found submit button via alternative selector")
+        except:
+            raise Exception("Submit button not found with any selector")
+    except Exception as btn_error:
+        raise Exception(f"Failed to click submit button: {str(btn_error)}")
+
+    readiness.settle(driver, "bse_results_postback", readiness.network_idle(), NETWORK_IDLE_TIMEOUT)
+
+    print("INFO: Waiting for results and download link (ID: lnkDownload)...")
+    try:
+        download_link = readiness.wait(driver, "bse_download_link", readiness.element_enabled((By.ID, "lnkDownload")), READY_TIMEOUT)
+        print("SUCCESS: Download link found")
+    except TimeoutException:
+        print("ERROR: Download link not found. Checking page source...")
+        page_source_snippet = driver.page_source[:500]
+        print(f"INFO: Page source snippet: {page_source_snippet}")
+        raise Exception("Download link (lnkDownload) not found - page may not have loaded correctly")
+
+    print("INFO: Initiating Securities download...")
+    try:
+        driver.execute_script("arguments[0].click();", download_link)
+        print("SUCCESS: Securities download initiated")
+    except Exception as click_error:
+        raise Exception(f"Failed to click download link: {str(click_error)}")
+
+    # Wait for CSV file download with detailed logging
+    print("INFO: Waiting for CSV file download (timeout: 60s, min size: 1000 bytes)...")
+    print(f"INFO: Checking download directory: {download_dir}")
+    print(f"INFO: Files in directory before wait: {os.listdir(download_dir) if os.path.exists(download_dir) else 'Directory not found'}")
+
+    try:
+        csv_file = wait_for_file(".csv", timeout=60, min_size=1000, download_dir=download_dir)
+        print(f"SUCCESS: CSV file found: {csv_file}")
+    except TimeoutException as timeout_err:
+        print(f"ERROR: Timeout waiting for CSV file")
+        print(f"INFO: Files in directory after timeout: {os.listdir(download_dir) if os.path.exists(download_dir) else 'Directory not found'}")
+        raise Exception(f"CSV file download timeout - {str(timeout_err)}")
+    except Exception as file_err:
+        print(f"ERROR: Error waiting for file: {str(file_err)}")
+        raise Exception(f"Failed to wait for CSV file: {str(file_err)}")
+    record_network_stats(driver, "bse")
+    return csv_file
+
+@tracing.traced()
+def fetch_bse_securities(driver, download_dir=None):
     """Critical automation: Fetch Security List from BSE website"""
+    download_dir = download_dir or DOWNLOAD_DIR
     print("INFO: Starting BSE Securities automation...")
-    print(f"INFO: Download directory: {DOWNLOAD_DIR}")
+    print(f"INFO: Download directory: {download_dir}")
     print(f"INFO: Data directory: {DATA_DIR}")
 
     try:
         # Clean any existing securities downloads first
         print("INFO: Cleaning existing download files...")
-        clean_existing_downloads("scrip")
-        clean_existing_downloads("security")
-        clean_existing_downloads("list")
+        clean_existing_downloads("scrip", download_dir)
+        clean_existing_downloads("security", download_dir)
+        clean_existing_downloads("list", download_dir)
         print("INFO: Cleanup completed")
 
-        print("INFO: Navigating to BSE securities page...")
-        driver.get("https://www.bseindia.com/corporates/List_Scrips.html")
-        wait = WebDriverWait(driver, TIMEOUT)
-        print(f"INFO: Page title: {driver.title}")
-
-        print("INFO: Waiting for page to load...")
-        time.sleep(5)
-
-        print("INFO: Selecting Equity T+1 segment...")
-        # Select Equity T+1 segment
-        segment_script = """
-            var segment = document.getElementById('ddlsegment');
-            if (!segment) throw new Error('Segment dropdown not found');
-
-            var found = false;
-            var options = [];
-            for(var i = 0; i < segment.options.length; i++) {
-                options.push(segment.options[i].text);
-                if(segment.options[i].text === 'Equity T+1') {
-                    segment.selectedIndex = i;
-                    segment.dispatchEvent(new Event('change'));
-                    found = true;
-                    break;
-                }
-            }
-            if (!found) {
-                throw new Error('Equity T+1 option not found. Available options: ' + options.join(', '));
-            }
-            return 'SUCCESS: Equity T+1 selected';
-        """
-
-        try:
-            result = driver.execute_script(segment_script)
-            print(f"INFO: {result}")
-        except Exception as script_error:
-            print(f"ERROR: JavaScript execution failed: {str(script_error)}")
-            raise Exception(f"Failed to select Equity T+1 segment: {str(script_error)}")
-        
-        time.sleep(3)
-
-        print("INFO: Looking for submit button (ID: btnSubmit)...")
-        try:
-            btn_submit = wait.until(EC.element_to_be_clickable((By.ID, "btnSubmit")))
-            print("INFO: Submit button found, clicking...")
-            driver.execute_script("arguments[0].click();", btn_submit)
-            print("SUCCESS: Submit button clicked")
-        except TimeoutException:
-            print("ERROR: Submit button not found or not clickable")
-            # Try to find alternative selectors
-            try:
-                btn_submit = driver.find_element(By.CSS_SELECTOR, "input[type='submit'], button[type='submit']")
-                driver.execute_script("arguments[0].click();", btn_submit)
-                print("SUCCESS: Found submit button via alternative selector")
-            except:
-                raise Exception("Submit button not found with any selector")
-        except Exception as btn_error:
-            raise Exception(f"Failed to click submit button: {str(btn_error)}")
-        
-        time.sleep(5)
+        csv_file = None
+        if HTTP_FETCH:
+            print("INFO: Trying direct HTTP download of the securities list...")
+            csv_file = fetch_over_http(http_fetch.download_bse_securities, BSE_SECURITIES_URL, download_dir)
+        if not csv_file:
+            print("INFO: Falling back to browser automation for BSE securities...")
+            csv_file = report_download(export_bse_csv_with_browser(resolve_driver(driver), download_dir), "browser")
 
-        print("INFO: Waiting for results and download link (ID: lnkDownload)...")
-        try:
-            download_link = wait.until(EC.element_to_be_clickable((By.ID, "lnkDownload")))
-            print("SUCCESS: Download link found")
-        except TimeoutException:
-            print("ERROR: Download link not found. Checking page source...")
-            page_source_snippet = driver.page_source[:500]
-            print(f"INFO: Page source snippet: {page_source_snippet}")
-            raise Exception("Download link (lnkDownload) not found - page may not have loaded correctly")
-        
-        print("INFO: Initiating Securities download...")
-        try:
-            driver.execute_script("arguments[0].click();", download_link)
-            print("SUCCESS: Securities download initiated")
-        except Exception as click_error:
-            raise Exception(f"Failed to click download link: {str(click_error)}")
-
-        # Wait for CSV file download with detailed logging
-        print("INFO: Waiting for CSV file download (timeout: 60s, min size: 1000 bytes)...")
-        print(f"INFO: Checking download directory: {DOWNLOAD_DIR}")
-        print(f"INFO: Files in directory before wait: {os.listdir(DOWNLOAD_DIR) if os.path.exists(DOWNLOAD_DIR) else 'Directory not found'}")
-        
-        try:
-            csv_file = wait_for_file(".csv", timeout=60, min_size=1000)
-            print(f"SUCCESS: CSV file found: {csv_file}")
-        except TimeoutException as timeout_err:
-            print(f"ERROR: Timeout waiting for CSV file")
-            print(f"INFO: Files in directory after timeout: {os.listdir(DOWNLOAD_DIR) if os.path.exists(DOWNLOAD_DIR) else 'Directory not found'}")
-            raise Exception(f"CSV file download timeout - {str(timeout_err)}")
-        except Exception as file_err:
-            print(f"ERROR: Error waiting for file: {str(file_err)}")
-            raise Exception(f"Failed to wait for CSV file: {str(file_err)}")
-        
         # Keep the original filename - don't rename
         downloaded_file_path = csv_file
         downloaded_filename = os.path.basename(downloaded_file_path)
@@ -773,71 +1052,86 @@ def create_sample_securities():
     """This function is removed - no dummy data allowed"""
     raise Exception("CRITICAL FAILURE: No sample data allowed in production system")
 
-def fetch_ipo_data(driver):
+@tracing.traced()
+def export_chittorgarh_csv_with_browser(driver, report_url, download_dir, label):
+    """Click the export button on a Chittorgarh report page and download the CSV with Chrome"""
+    load_selenium()
+    block_requests(driver, "chittorgarh", report_url)
+    print(f"INFO: Navigating to Chittorgarh {label} page...")
+    with tracing.span("driver.get", url=report_url):
+        driver.get(report_url)
+
+    print("INFO: Waiting for page to fully load...")
+    readiness.wait(driver, "chittorgarh_page_load", readiness.document_ready, READY_TIMEOUT)
+    readiness.settle(driver, "chittorgarh_network_idle", readiness.network_idle(), NETWORK_IDLE_TIMEOUT)
+
+    print("INFO: Removing any overlay elements...")
+    # Remove overlays that might block interaction
+    overlay_script = """
+        // Remove common overlays and popups
+        var overlays = document.querySelectorAll('.modal, .popup, .overlay, .advertisement, .ad-banner, .consent-banner, .cookie-banner, .gdpr-banner');
+        overlays.forEach(function(el) {
+            if (el) el.remove();
+        });
+
+        // Remove fixed position elements that might block clicks
+        var fixedElements = document.querySelectorAll('[style*="position: fixed"], [style*="position:fixed"]');
+        fixedElements.forEach(function(el) {
+            if (el.style.zIndex > 1000) el.remove();
+        });
+
+        return 'Overlays and blocking elements removed';
+    """
+    result = driver.execute_script(overlay_script)
+    print(result)
+
+    print("INFO: Waiting for export button to be enabled...")
+    # The page script enables the button once the report has loaded
+    export_btn = readiness.settle(driver, "chittorgarh_export_button", readiness.element_enabled((By.ID, "export_btn"), displayed=False), READY_TIMEOUT)
+    if export_btn is None:
+        print("WARNING: Export button is not enabled, clicking it anyway...")
+        export_btn = driver.find_element(By.ID, "export_btn")
+
+    # Scroll to the button to ensure it's visible
+    driver.execute_script("arguments[0].scrollIntoView(true);", export_btn)
+
+    print(f"INFO: Clicking {label} export button using JavaScript...")
+    # Use JavaScript click to avoid any overlay issues
+    driver.execute_script("arguments[0].click();", export_btn)
+    print(f"SUCCESS: {label} Export button clicked")
+
+    print("INFO: Waiting for CSV file download...")
+    # Wait for the specific CSV file to be downloaded
+    csv_file = wait_for_file_with_name(CHITTORGARH_EXPORT_NAME, timeout=60, min_size=500, download_dir=download_dir)
+
+    if not csv_file:
+        # Fallback: look for any CSV file that was just downloaded
+        print("INFO: Specific file not found, looking for any recent CSV...")
+        csv_file = wait_for_file(".csv", timeout=30, min_size=500, download_dir=download_dir)
+    record_network_stats(driver, "chittorgarh")
+    return csv_file
+
+@tracing.traced()
+def fetch_ipo_data(driver, download_dir=None):
     """Critical automation: Fetch Mainboard IPO data from Chittorgarh website"""
+    download_dir = download_dir or DOWNLOAD_DIR
     print("INFO: Starting Mainboard IPO data automation...")
 
     try:
         # Clean any existing IPO downloads first
-        clean_ipo_files()
-
-        print("INFO: Navigating to Chittorgarh Mainboard IPO page...")
-        driver.get("https://www.chittorgarh.com/report/ipo-in-india-list-main-board-sme/82/all/")
-        wait = WebDriverWait(driver, TIMEOUT)
-
-        print("INFO: Waiting for page to fully load...")
-        time.sleep(5)
-
-        print("INFO: Removing any overlay elements...")
-        # Remove overlays that might block interaction
-        overlay_script = """
-            // Remove common overlays and popups
-            var overlays = document.querySelectorAll('.modal, .popup, .overlay, .advertisement, .ad-banner, .consent-banner, .cookie-banner, .gdpr-banner');
-            overlays.forEach(function(el) {
-                if (el) el.remove();
-            });
-
-            // Remove fixed position elements that might block clicks
-            var fixedElements = document.querySelectorAll('[style*="position: fixed"], [style*="position:fixed"]');
-            fixedElements.forEach(function(el) {
-                if (el.style.zIndex > 1000) el.remove();
-            });
-
-            return 'Overlays and blocking elements removed';
-        """
-        result = driver.execute_script(overlay_script)
-        print(result)
-
-        print("INFO: Waiting for export button to be available...")
-        # Wait for the export button to be present and clickable
-        export_btn = wait.until(EC.presence_of_element_located((By.ID, "export_btn")))
-
-        # Scroll to the button to ensure it's visible
-        driver.execute_script("arguments[0].scrollIntoView(true);", export_btn)
-        time.sleep(2)
-
-        print("INFO: Checking if export button is enabled...")
-        if not export_btn.is_enabled():
-            print("WARNING: Export button is not enabled, trying to enable it...")
-            # Sometimes the button needs the page to be fully loaded
-            time.sleep(3)
-            export_btn = driver.find_element(By.ID, "export_btn")
-
-        print("INFO: Clicking export button using JavaScript...")
-        # Use JavaScript click to avoid any overlay issues
-        driver.execute_script("arguments[0].click();", export_btn)
-        print("SUCCESS: Mainboard IPO Export button clicked")
-
-        print("INFO: Waiting for CSV file download...")
-        # Wait for the specific CSV file to be downloaded
-        csv_file = wait_for_file_with_name("ipo-in-india-list-main-board-sme.csv", timeout=60, min_size=500)
-
+        clean_ipo_files(download_dir)
+
+        report_url = f"{CHITTORGARH_REPORT_URL}all/"
+        csv_file = None
+        if HTTP_FETCH:
+            print("INFO: Trying direct HTTP download of the Mainboard IPO report...")
+            csv_file = fetch_over_http(http_fetch.download_report_table, report_url, download_dir, CHITTORGARH_EXPORT_NAME,
+                                       CHITTORGARH_EXPORT_COLUMNS)
         if not csv_file:
-            # Fallback: look for any CSV file that was just downloaded
-            print("INFO: Specific file not found, looking for any recent CSV...")
-            csv_file = wait_for_file(".csv", timeout=30, min_size=500)
+            print("INFO: Falling back to browser automation for Mainboard IPO data...")
+            csv_file = report_download(export_chittorgarh_csv_with_browser(resolve_driver(driver), report_url, download_dir, "Mainboard IPO"), "browser")
 
-        target_path = os.path.join(DOWNLOAD_DIR, "IPO.csv")
+        target_path = os.path.join(download_dir, "IPO.csv")
 
         # Move downloaded file to target location
         if csv_file != target_path:
@@ -845,11 +1139,11 @@ def fetch_ipo_data(driver):
         print(f"SUCCESS: Mainboard IPO CSV downloaded and moved to {target_path}")
 
         # Process CSV to JSON and save to data folder as ipo-main.json
-        success, json_data = process_csv_to_json(target_path, "ipo-main.json", "IPO_Mainboard_Data")
-        if not success or not json_data:
+        success, record_count = process_csv_to_json(target_path, "ipo-main.json", "IPO_Mainboard_Data")
+        if not success or not record_count:
             raise Exception("Failed to process Mainboard IPO CSV to JSON")
 
-        print(f"SUCCESS: Processed {len(json_data)} Mainboard IPO records from Chittorgarh")
+        print(f"SUCCESS: Processed {record_count} Mainboard IPO records from Chittorgarh")
         
         # Delete the CSV file after successful processing
         print("INFO: Deleting Mainboard IPO CSV file after successful processing...")
@@ -860,7 +1154,7 @@ def fetch_ipo_data(driver):
         except Exception as delete_error:
             print(f"WARNING: Failed to delete Mainboard IPO CSV file: {str(delete_error)}")
         
-        return json_data
+        return record_count
 
     except TimeoutException as e:
         raise Exception(f"CRITICAL FAILURE: Mainboard IPO automation timeout - {str(e)}")
@@ -869,15 +1163,17 @@ def fetch_ipo_data(driver):
     except Exception as e:
         raise Exception(f"CRITICAL FAILURE: Mainboard IPO automation failed - {str(e)}")
 
-def fetch_sme_ipo_data(driver):
+@tracing.traced()
+def fetch_sme_ipo_data(driver, download_dir=None):
     """Critical automation: Fetch SME IPO data from Chittorgarh website"""
+    download_dir = download_dir or DOWNLOAD_DIR
     print("INFO: Starting SME IPO data automation...")
 
     try:
         # Clean any existing SME IPO downloads first
         sme_ipo_files = ["IPO-SME.csv", "ipo-sme.csv", "sme-ipo.csv"]
         for fname in sme_ipo_files:
-            file_path = os.path.join(DOWNLOAD_DIR, fname)
+            file_path = os.path.join(download_dir, fname)
             if os.path.exists(file_path):
                 try:
                     os.remove(file_path)
@@ -885,63 +1181,17 @@ def fetch_sme_ipo_data(driver):
                 except Exception as e:
                     print(f"WARNING: Could not remove SME IPO file {fname}: {str(e)}")
 
-        print("INFO: Navigating to Chittorgarh SME IPO page...")
-        driver.get("https://www.chittorgarh.com/report/ipo-in-india-list-main-board-sme/82/sme/")
-        wait = WebDriverWait(driver, TIMEOUT)
-
-        print("INFO: Waiting for page to fully load...")
-        time.sleep(5)
-
-        print("INFO: Removing any overlay elements...")
-        # Remove overlays that might block interaction
-        overlay_script = """
-            // Remove common overlays and popups
-            var overlays = document.querySelectorAll('.modal, .popup, .overlay, .advertisement, .ad-banner, .consent-banner, .cookie-banner, .gdpr-banner');
-            overlays.forEach(function(el) {
-                if (el) el.remove();
-            });
-
-            // Remove fixed position elements that might block clicks
-            var fixedElements = document.querySelectorAll('[style*="position: fixed"], [style*="position:fixed"]');
-            fixedElements.forEach(function(el) {
-                if (el.style.zIndex > 1000) el.remove();
-            });
-
-            return 'Overlays and blocking elements removed';
-        """
-        result = driver.execute_script(overlay_script)
-        print(result)
-
-        print("INFO: Waiting for export button to be available...")
-        # Wait for the export button to be present and clickable
-        export_btn = wait.until(EC.presence_of_element_located((By.ID, "export_btn")))
-
-        # Scroll to the button to ensure it's visible
-        driver.execute_script("arguments[0].scrollIntoView(true);", export_btn)
-        time.sleep(2)
-
-        print("INFO: Checking if export button is enabled...")
-        if not export_btn.is_enabled():
-            print("WARNING: Export button is not enabled, trying to enable it...")
-            # Sometimes the button needs the page to be fully loaded
-            time.sleep(3)
-            export_btn = driver.find_element(By.ID, "export_btn")
-
-        print("INFO: Clicking SME IPO export button using JavaScript...")
-        # Use JavaScript click to avoid any overlay issues
-        driver.execute_script("arguments[0].click();", export_btn)
-        print("SUCCESS: SME IPO Export button clicked")
-
-        print("INFO: Waiting for CSV file download...")
-        # Wait for the CSV file to be downloaded
-        csv_file = wait_for_file_with_name("ipo-in-india-list-main-board-sme.csv", timeout=60, min_size=500)
-
+        report_url = f"{CHITTORGARH_REPORT_URL}sme/"
+        csv_file = None
+        if HTTP_FETCH:
+            print("INFO: Trying direct HTTP download of the SME IPO report...")
+            csv_file = fetch_over_http(http_fetch.download_report_table, report_url, download_dir, CHITTORGARH_EXPORT_NAME,
+                                       CHITTORGARH_EXPORT_COLUMNS)
         if not csv_file:
-            # Fallback: look for any CSV file that was just downloaded
-            print("INFO: Specific file not found, looking for any recent CSV...")
-            csv_file = wait_for_file(".csv", timeout=30, min_size=500)
+            print("INFO: Falling back to browser automation for SME IPO data...")
+            csv_file = report_download(export_chittorgarh_csv_with_browser(resolve_driver(driver), report_url, download_dir, "SME IPO"), "browser")
 
-        target_path = os.path.join(DOWNLOAD_DIR, "IPO-SME.csv")
+        target_path = os.path.join(download_dir, "IPO-SME.csv")
 
         # Move downloaded file to target location
         if csv_file != target_path:
@@ -949,11 +1199,11 @@ def fetch_sme_ipo_data(driver):
         print(f"SUCCESS: SME IPO CSV downloaded and moved to {target_path}")
 
         # Process CSV to JSON and save to data folder as ipo-sme.json
-        success, json_data = process_csv_to_json(target_path, "ipo-sme.json", "IPO_SME_Data")
-        if not success or not json_data:
+        success, record_count = process_csv_to_json(target_path, "ipo-sme.json", "IPO_SME_Data")
+        if not success or not record_count:
             raise Exception("Failed to process SME IPO CSV to JSON")
 
-        print(f"SUCCESS: Processed {len(json_data)} SME IPO records from Chittorgarh")
+        print(f"SUCCESS: Processed {record_count} SME IPO records from Chittorgarh")
         
         # Delete the CSV file after successful processing
         print("INFO: Deleting SME IPO CSV file after successful processing...")
@@ -964,7 +1214,7 @@ def fetch_sme_ipo_data(driver):
         except Exception as delete_error:
             print(f"WARNING: Failed to delete SME IPO CSV file: {str(delete_error)}")
         
-        return json_data
+        return record_count
 
     except TimeoutException as e:
         raise Exception(f"CRITICAL FAILURE: SME IPO automation timeout - {str(e)}")
@@ -973,12 +1223,286 @@ def fetch_sme_ipo_data(driver):
     except Exception as e:
         raise Exception(f"CRITICAL FAILURE: SME IPO automation failed - {str(e)}")
 
+@tracing.traced()
+def fetch_all_ipo_data(driver, download_dir=None):
+    """Critical automation: Fetch the combined IPO report once and split it into Mainboard and SME data"""
+    download_dir = download_dir or DOWNLOAD_DIR
+    print("INFO: Starting combined Mainboard + SME IPO data automation...")
+
+    try:
+        # Clean any existing IPO downloads first
+        clean_ipo_files(download_dir)
+
+        report_url = f"{CHITTORGARH_REPORT_URL}all/"
+        csv_file = None
+        if HTTP_FETCH:
+            print("INFO: Trying direct HTTP download of the combined IPO report...")
+            csv_file = fetch_over_http(http_fetch.download_report_table, report_url, download_dir, CHITTORGARH_EXPORT_NAME,
+                                       CHITTORGARH_EXPORT_COLUMNS)
+        if not csv_file:
+            print("INFO: Falling back to browser automation for IPO data...")
+            csv_file = report_download(export_chittorgarh_csv_with_browser(resolve_driver(driver), report_url, download_dir, "Mainboard + SME IPO"), "browser")
+
+        target_path = os.path.join(download_dir, "IPO.csv")
+
+        # Move downloaded file to target location
+        if csv_file != target_path:
+            os.rename(csv_file, target_path)
+        print(f"SUCCESS: Combined IPO CSV downloaded and moved to {target_path}")
+
+        source_sha256, cached = find_processed(target_path, IPO_SPLIT_PIPELINE)
+        if cached:
+            record_counts = cached["records"]
+        else:
+            json_data = read_csv_records(target_path, "ipo.json")
+            if not json_data:
+                raise Exception("Failed to process combined IPO CSV to JSON")
+
+            mainboard, sme = split_ipo_records(json_data)
+            print(f"INFO: Split {len(json_data)} IPO records into {len(mainboard)} Mainboard and {len(sme)} SME records")
+
+            if not save_json_to_file("ipo-main.json", mainboard, "IPO_Mainboard_Data", clean_nan=False):
+                raise Exception("Failed to save Mainboard IPO JSON")
+            if not save_json_to_file("ipo-sme.json", sme, "IPO_SME_Data", clean_nan=False):
+                raise Exception("Failed to save SME IPO JSON")
+            record_counts = {"ipo-main.json": len(mainboard), "ipo-sme.json": len(sme)}
+            remember_processed(IPO_SPLIT_PIPELINE, source_sha256, dataset_files("ipo-main.json", "ipo-sme.json"), record_counts)
+
+        # Delete the CSV file after successful processing
+        print("INFO: Deleting combined IPO CSV file after successful processing...")
+        try:
+            if os.path.exists(target_path):
+                os.remove(target_path)
+                print(f"SUCCESS: Deleted combined IPO CSV file: {target_path}")
+        except Exception as delete_error:
+            print(f"WARNING: Failed to delete combined IPO CSV file: {str(delete_error)}")
+
+        return record_counts
+
+    except TimeoutException as e:
+        raise Exception(f"CRITICAL FAILURE: IPO automation timeout - {str(e)}")
+    except NoSuchElementException as e:
+        raise Exception(f"CRITICAL FAILURE: IPO element not found - {str(e)}")
+    except Exception as e:
+        raise Exception(f"CRITICAL FAILURE: IPO automation failed - {str(e)}")
+
 def create_sample_ipos():
     """This function is removed - no dummy data allowed"""
     raise Exception("CRITICAL FAILURE: No sample data allowed in production system")
 
-def main():
+def complete_securities_task(result, securities_csv_path):
+    """Record a downloaded BSE securities CSV and convert Equity.csv if present"""
+    # Verify CSV file was downloaded (keep original filename)
+    if not os.path.exists(securities_csv_path):
+        raise Exception(f"CSV file was not downloaded at {securities_csv_path}")
+
+    # Get the filename for reporting
+    securities_filename = os.path.basename(securities_csv_path)
+    file_size = os.path.getsize(securities_csv_path)
+
+    # Task completed - CSV file downloaded and kept with original name
+    result["tasks_completed"] += 1
+    result["securities_updated"] = True
+    result["files_created"].append(securities_filename)
+    result["files_saved"] = True
+    print(f"SUCCESS: BSE Securities CSV downloaded and saved as: {securities_filename}")
+    print(f"SUCCESS: File location: {securities_csv_path}")
+    print(f"SUCCESS: File size: {file_size} bytes")
+
+    # Check if Equity.csv exists and process it to Security.json
+    equity_csv_path = os.path.join(DOWNLOAD_DIR, "Equity.csv")
+    parent_equity_path = os.path.join(os.path.dirname(DOWNLOAD_DIR), "Equity.csv")
+
+    if os.path.exists(equity_csv_path) or os.path.exists(parent_equity_path):
+        print("\n" + "="*60)
+        print("BONUS TASK: Processing Equity.csv to Security.json")
+        print("="*60)
+        try:
+            equity_result = process_equity_csv_to_security_json()
+            if equity_result["success"]:
+                result["files_created"].append("data/Security.json")
+                print("SUCCESS: Equity.csv converted to Security.json")
+            else:
+                print(f"WARNING: Equity.csv processing failed: {equity_result.get('error', 'Unknown error')}")
+        except Exception as equity_error:
+            print(f"WARNING: Equity.csv processing error: {str(equity_error)}")
+
+def complete_ipo_task(result, task, ipo_data):
+    """Record processed IPO datasets (already saved by process_csv_to_json)"""
+    for flag, output in zip(task["flags"], task["outputs"]):
+        result["tasks_completed"] += 1
+        result[flag] = True
+        result["files_created"].append(output)
+        result["files_saved"] = True
+        print(f"SUCCESS: {task['label']} saved to {output}")
+
+def complete_task(result, task, task_output):
+    """Merge the output of a finished scrape task into the result dict"""
+    if task["name"] == "securities":
+        complete_securities_task(result, task_output)
+    else:
+        complete_ipo_task(result, task, task_output)
+
+# Scrape tasks in the order they are reported in the result
+SCRAPE_TASKS = [
+    {
+        "name": "securities",
+        "title": "BSE Securities Automation",
+        "label": "BSE Securities",
+        "fetch": fetch_bse_securities,
+    },
+    {
+        "name": "ipo_main",
+        "title": "Mainboard IPO Data Automation",
+        "label": "Mainboard IPO Data",
+        "fetch": fetch_ipo_data,
+        "flags": ["ipo_main_updated"],
+        "outputs": ["data/ipo-main.json"],
+    },
+    {
+        "name": "ipo_sme",
+        "title": "SME IPO Data Automation",
+        "label": "SME IPO Data",
+        "fetch": fetch_sme_ipo_data,
+        "flags": ["ipo_sme_updated"],
+        "outputs": ["data/ipo-sme.json"],
+    },
+]
+
+# Single-fetch replacement for the two IPO tasks: one download split by Listing_at
+COMBINED_IPO_TASK = {
+    "name": "ipo",
+    "title": "Mainboard + SME IPO Data Automation (single fetch)",
+    "label": "IPO Data",
+    "fetch": fetch_all_ipo_data,
+    "flags": ["ipo_main_updated", "ipo_sme_updated"],
+    "outputs": ["data/ipo-main.json", "data/ipo-sme.json"],
+}
+
+def get_scrape_tasks():
+    """Scrape tasks for this run, with the IPO reports fetched once when SINGLE_IPO_FETCH is on"""
+    if SINGLE_IPO_FETCH:
+        return [SCRAPE_TASKS[0], COMBINED_IPO_TASK]
+    return SCRAPE_TASKS
+
+def run_scrape_task(task):
+    """Run one scrape task on its own Chrome driver and isolated download directory"""
+    download_dir = os.path.join(TASK_DOWNLOAD_ROOT, task["name"])
+    shutil.rmtree(download_dir, ignore_errors=True)
+    os.makedirs(download_dir)
+
+    # The browser is only started if the direct HTTP fetch fails
+    driver = LazyDriver(download_dir)
+    try:
+        print(f"INFO: [{task['name']}] Starting task (downloads: {download_dir})...")
+        with progress.stage(task["name"], title=task["title"]):
+            task_output = task["fetch"](driver, download_dir)
+
+        if task["name"] == "securities":
+            # Keep the BSE CSV where the sequential mode leaves it
+            target_path = os.path.join(DOWNLOAD_DIR, os.path.basename(task_output))
+            shutil.move(task_output, target_path)
+            task_output = target_path
+
+        print(f"SUCCESS: [{task['name']}] Task finished")
+        return task_output
+    finally:
+        try:
+            driver.close()
+        except:
+            pass
+        shutil.rmtree(download_dir, ignore_errors=True)
+
+def run_tasks_concurrently(tasks, pool_size=POOL_SIZE):
+    """Run scrape tasks on a pool of browsers; returns task name -> output or exception"""
+    outcomes = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(pool_size, len(tasks)))) as executor:
+        futures = {task["name"]: executor.submit(run_scrape_task, task) for task in tasks}
+        for name, future in futures.items():
+            try:
+                outcomes[name] = future.result()
+            except Exception as e:
+                outcomes[name] = e
+
+    try:
+        os.rmdir(TASK_DOWNLOAD_ROOT)
+    except OSError:
+        pass
+    return outcomes
+
+@tracing.traced()
+def link_ipo_securities():
+    """Batch stage: link IPO companies to Security.json names and save the linkage table"""
+    print("INFO: Linking IPO companies to security names...")
+    try:
+        links, summary = ipo_matcher.link_datasets(DATA_DIR)
+        if not links:
+            print("WARNING: No IPO records to link, skipping linkage table")
+            return False
+        metadata = dict(summary, data_type="IPO_Security_Links", created_at=datetime.now().isoformat(),
+                        total_records=len(links), generated_by="ipo_scraper_final.py")
+        if not save_json_to_file(ipo_matcher.LINKS_DATASET, links, "IPO_Security_Links", metadata=metadata, clean_nan=False):
+            raise Exception(f"Failed to save {ipo_matcher.LINKS_DATASET}")
+        print(f"SUCCESS: Linked {summary['exact'] + summary['fuzzy']}/{summary['ipo_records']} IPO records "
+              f"({summary['exact']} exact, {summary['fuzzy']} fuzzy) in {summary['seconds']}s")
+        return True
+    except Exception as e:
+        print(f"WARNING: IPO to security linking failed: {str(e)}")
+        return False
+
+def main(mode=None):
     """Main function - Critical automation system for Vercel deployment"""
+    # Check command line arguments for different modes (the resident worker passes the mode in)
+    if mode is None:
+        mode = sys.argv[1].lower() if len(sys.argv) > 1 else "full"  # Default mode
+
+    # Durations, failures, record counts and cache hits of this run go to the metrics store at run_end
+    run_metrics = metrics.RunMetrics(mode) if metrics.ENABLED else None
+    if run_metrics:
+        progress.add_listener(run_metrics)
+    try:
+        progress.start_run(mode)
+        PROCESS_CACHE_HITS.clear()
+        NETWORK_STATS.clear()
+        if mode in LOCAL_MODES:
+            result = run_mode(mode)
+        else:
+            # One scrape per host: concurrent triggers attach to the running scrape, recent ones reuse its result
+            try:
+                result = singleflight.run(SINGLEFLIGHT_DIR, mode, lambda: run_mode(mode), on_wait=wait_for_running_scrape)
+            except TimeoutError as e:
+                error_msg = f"CRITICAL FAILURE: {str(e)}"
+                print(f"ERROR: {error_msg}")
+                progress.emit("error", message=error_msg, error_type=type(e).__name__, failure_class=metrics.failure_class(e))
+                result = {"success": False, "errors": [error_msg]}
+                print_final_result(result)
+            if result.get("cached") or result.get("coalesced"):
+                source = f"a {mode} run finished {result['cache_age']}s ago" if result.get("cached") else "the scrape that was running"
+                print(f"INFO: Returning the result of {source}")
+                progress.emit("result_reused", cached=bool(result.get("cached")), coalesced=bool(result.get("coalesced")))
+                print_final_result(result)
+        progress.emit("run_end", mode=mode, success=result["success"], result=result)
+    finally:
+        if run_metrics:
+            progress.remove_listener(run_metrics)
+    if TRACE_FILE:
+        export_trace(mode)
+    return result
+
+def export_trace(mode):
+    """Write this run's spans to TRACE_FILE as Chrome trace events"""
+    try:
+        tracing.export_chrome_trace(TRACE_FILE, {"mode": mode})
+        print(f"INFO: Wrote Chrome trace to {TRACE_FILE}")
+    except Exception as e:
+        print(f"WARNING: Failed to write trace file: {str(e)}")
+
+def wait_for_running_scrape():
+    print("INFO: Another scrape is running on this host, waiting for it to finish...")
+    progress.emit("waiting", reason="scrape in progress")
+
+def run_mode(mode):
+    """Run one scraper mode and return the result dict"""
     result = {
         "success": False,
         "tasks_completed": 0,
@@ -991,11 +1515,6 @@ def main():
         "ipo_sme_updated": False
     }
 
-    # Check command line arguments for different modes
-    mode = "full"  # Default mode
-    if len(sys.argv) > 1:
-        mode = sys.argv[1].lower()
-
     driver = None
 
     try:
@@ -1013,7 +1532,9 @@ def main():
             print("MODE: PROCESS EXISTING IPO DATA")
             print("="*60)
 
-            ipo_result = process_existing_ipo_data()
+            with progress.stage(mode) as stage_info:
+                ipo_result = process_existing_ipo_data()
+                stage_info.update(success=ipo_result["success"], error=ipo_result.get("error"))
             if ipo_result["success"]:
                 result["success"] = True
                 result["tasks_completed"] = 1
@@ -1027,10 +1548,7 @@ def main():
                 print(f"ERROR: {ipo_result['error']}")
 
             # Output result and return early
-            print("\n" + "="*60)
-            print("FINAL AUTOMATION RESULT:")
-            print("="*60)
-            print(json.dumps(result, indent=2))
+            print_final_result(result)
             return result
         
         elif mode == "process_securities":
@@ -1039,7 +1557,9 @@ def main():
             print("MODE: PROCESS EXISTING SECURITIES DATA")
             print("="*60)
 
-            securities_result = process_existing_securities_data()
+            with progress.stage(mode) as stage_info:
+                securities_result = process_existing_securities_data()
+                stage_info.update(success=securities_result["success"], error=securities_result.get("error"))
             if securities_result["success"]:
                 result["success"] = True
                 result["tasks_completed"] = 1
@@ -1053,10 +1573,7 @@ def main():
                 print(f"ERROR: {securities_result['error']}")
 
             # Output result and return early
-            print("\n" + "="*60)
-            print("FINAL AUTOMATION RESULT:")
-            print("="*60)
-            print(json.dumps(result, indent=2))
+            print_final_result(result)
             return result
         
         elif mode == "process_equity":
@@ -1065,7 +1582,9 @@ def main():
             print("MODE: PROCESS EQUITY.CSV TO SECURITY.JSON")
             print("="*60)
 
-            equity_result = process_equity_csv_to_security_json()
+            with progress.stage(mode) as stage_info:
+                equity_result = process_equity_csv_to_security_json()
+                stage_info.update(success=equity_result["success"], error=equity_result.get("error"))
             if equity_result["success"]:
                 result["success"] = True
                 result["tasks_completed"] = 1
@@ -1079,114 +1598,72 @@ def main():
                 print(f"ERROR: {equity_result['error']}")
 
             # Output result and return early
+            print_final_result(result)
+            return result
+
+        elif mode == "link_ipo":
+            # Mode: Rebuild the IPO -> security linkage table from the saved datasets
             print("\n" + "="*60)
-            print("FINAL AUTOMATION RESULT:")
+            print("MODE: LINK IPO COMPANIES TO SECURITIES")
             print("="*60)
-            print(json.dumps(result, indent=2))
+
+            result["total_tasks"] = 1
+            with progress.stage(mode) as stage_info:
+                stage_info["success"] = link_ipo_securities()
+            if stage_info["success"]:
+                result["success"] = True
+                result["tasks_completed"] = 1
+                result["ipo_links_updated"] = True
+                result["files_saved"] = True
+                result["files_created"] = [f"data/{ipo_matcher.LINKS_DATASET}"]
+            else:
+                result["errors"].append("IPO to security linking failed")
+
+            # Output result and return early
+            print_final_result(result)
             return result
 
         # Full automation mode (default)
         # Clean download folder
         clean_download_folder()
 
-        # Initialize Chrome driver - CRITICAL (Headless for Vercel)
-        print("INFO: Initializing Chrome driver for headless automation...")
-        driver = setup_driver()
-        print("SUCCESS: Chrome driver ready for CRITICAL headless automation")
-
-        # TASK 1: BSE Securities Automation
-        print("\n" + "="*60)
-        print("CRITICAL TASK 1: BSE Securities Automation")
-        print("="*60)
-
-        try:
-            securities_csv_path = fetch_bse_securities(driver)
-
-            # Verify CSV file was downloaded (keep original filename)
-            if not os.path.exists(securities_csv_path):
-                raise Exception(f"CSV file was not downloaded at {securities_csv_path}")
-
-            # Get the filename for reporting
-            securities_filename = os.path.basename(securities_csv_path)
-            file_size = os.path.getsize(securities_csv_path)
-
-            # Task completed - CSV file downloaded and kept with original name
-            result["tasks_completed"] += 1
-            result["securities_updated"] = True
-            result["files_created"].append(securities_filename)
-            result["files_saved"] = True
-            print(f"SUCCESS: BSE Securities CSV downloaded and saved as: {securities_filename}")
-            print(f"SUCCESS: File location: {securities_csv_path}")
-            print(f"SUCCESS: File size: {file_size} bytes")
-            
-            # Check if Equity.csv exists and process it to Security.json
-            equity_csv_path = os.path.join(DOWNLOAD_DIR, "Equity.csv")
-            parent_equity_path = os.path.join(os.path.dirname(DOWNLOAD_DIR), "Equity.csv")
-            
-            if os.path.exists(equity_csv_path) or os.path.exists(parent_equity_path):
-                print("\n" + "="*60)
-                print("BONUS TASK: Processing Equity.csv to Security.json")
-                print("="*60)
-                try:
-                    equity_result = process_equity_csv_to_security_json()
-                    if equity_result["success"]:
-                        result["files_created"].append("data/Security.json")
-                        print("SUCCESS: Equity.csv converted to Security.json")
-                    else:
-                        print(f"WARNING: Equity.csv processing failed: {equity_result.get('error', 'Unknown error')}")
-                except Exception as equity_error:
-                    print(f"WARNING: Equity.csv processing error: {str(equity_error)}")
-
-        except Exception as e:
-            error_msg = f"BSE Securities automation failed: {str(e)}"
-            result["errors"].append(error_msg)
-            print(f"ERROR: {error_msg}")
-            import traceback
-            print(f"TRACEBACK: {traceback.format_exc()}")
-
-        # TASK 2: Mainboard IPO Data Automation
-        print("\n" + "="*60)
-        print("CRITICAL TASK 2: Mainboard IPO Data Automation")
-        print("="*60)
-
-        try:
-            ipo_data = fetch_ipo_data(driver)
-
-            # Data is already saved in process_csv_to_json function
-            result["tasks_completed"] += 1
-            result["ipo_main_updated"] = True
-            result["files_created"].append("data/ipo-main.json")
-            result["files_saved"] = True
-            print("SUCCESS: Mainboard IPO Data saved to data/ipo-main.json")
-
-        except Exception as e:
-            error_msg = f"Mainboard IPO Data automation failed: {str(e)}"
-            result["errors"].append(error_msg)
-            print(f"ERROR: {error_msg}")
-            import traceback
-            print(f"TRACEBACK: {traceback.format_exc()}")
+        tasks = get_scrape_tasks()
+        outcomes = None
+        if mode == "concurrent":
+            # Each task runs on its own Chrome driver and download directory
+            print(f"INFO: Running {len(tasks)} tasks concurrently (pool size: {POOL_SIZE})...")
+            outcomes = run_tasks_concurrently(tasks, POOL_SIZE)
+        else:
+            # Chrome driver is initialized on first use - direct HTTP fetches don't need it
+            driver = LazyDriver()
 
-        # TASK 3: SME IPO Data Automation
-        print("\n" + "="*60)
-        print("CRITICAL TASK 3: SME IPO Data Automation")
-        print("="*60)
+        for task_number, task in enumerate(tasks, start=1):
+            print("\n" + "="*60)
+            print(f"CRITICAL TASK {task_number}: {task['title']}")
+            print("="*60)
 
-        try:
-            sme_ipo_data = fetch_sme_ipo_data(driver)
-
-            # Data is already saved in process_csv_to_json function
-            result["tasks_completed"] += 1
-            result["ipo_sme_updated"] = True
-            result["files_created"].append("data/ipo-sme.json")
-            result["files_saved"] = True
-            print("SUCCESS: SME IPO Data saved to data/ipo-sme.json")
-
-        except Exception as e:
-            error_msg = f"SME IPO Data automation failed: {str(e)}"
-            result["errors"].append(error_msg)
-            print(f"ERROR: {error_msg}")
-            import traceback
-            print(f"TRACEBACK: {traceback.format_exc()}")
+            try:
+                if outcomes is None:
+                    with progress.stage(task["name"], title=task["title"]):
+                        task_output = task["fetch"](driver)
+                else:
+                    task_output = outcomes[task["name"]]
+                    if isinstance(task_output, Exception):
+                        raise task_output
+                complete_task(result, task, task_output)
+            except Exception as e:
+                error_msg = f"{task['label']} automation failed: {str(e)}"
+                result["errors"].append(error_msg)
+                progress.emit("error", stage=task["name"], message=error_msg, error_type=type(e).__name__,
+                              failure_class=metrics.failure_class(e))
+                print(f"ERROR: {error_msg}")
+                import traceback
+                print(f"TRACEBACK: {traceback.format_exc()}")
+
+        # Batch stage: refresh the IPO -> security linkage table from the saved datasets
+        if result["tasks_completed"]:
+            with progress.stage("link_ipo") as stage_info:
+                result["ipo_links_updated"] = stage_info["success"] = link_ipo_securities()
 
         # Final validation
         if result["tasks_completed"] == result["total_tasks"]:
@@ -1225,13 +1702,13 @@ def main():
     except Exception as e:
         error_msg = f"CRITICAL SYSTEM FAILURE: {str(e)}"
         result["errors"].append(error_msg)
+        progress.emit("error", message=error_msg, error_type=type(e).__name__, failure_class=metrics.failure_class(e))
         print(f"FATAL ERROR: {error_msg}")
     finally:
         # Clean up driver
         if driver:
             try:
-                driver.quit()
-                print("INFO: Chrome driver closed")
+                driver.close()
             except:
                 pass
 
@@ -1242,10 +1719,7 @@ def main():
             pass
 
     # Output result as JSON for Node.js to parse
-    print("\n" + "="*60)
-    print("FINAL AUTOMATION RESULT:")
-    print("="*60)
-    print(json.dumps(result, indent=2))
+    print_final_result(result)
 
     return result
 
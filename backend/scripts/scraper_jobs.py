@@ -0,0 +1,191 @@
+# Background scraper jobs
+# submit() records a job in a small SQLite store and starts a detached runner
+# process for it, so the caller gets a job id immediately and the scrape is not
+# tied to an HTTP timeout. The runner executes scraper.main(mode) from the backend
+# directory, keeps the job's latest progress event up to date and stores the
+# final result. Status and result reads only touch the store.
+#
+# Every unfinished job has a lease (lease_expires_at): a queued job must be picked
+# up by its runner within QUEUE_LEASE seconds, and a running job must report
+# progress at least every RUN_LEASE seconds. A job past its lease (runner never
+# started, died, or its instance was recycled) reads as failed.
+#
+# Jobs need a host whose temp directory and processes outlive the request and
+# are shared by later requests. Vercel functions have neither (each instance has
+# its own /tmp and is frozen after the response), so SUPPORTED is False there
+# and the API answers job requests with 501.
+#
+# Submit a job:   python scraper_jobs.py submit concurrent
+# Job status:     python scraper_jobs.py status <job id>
+# Recent jobs:    python scraper_jobs.py list
+import os
+import sys
+import json
+import time
+import uuid
+import sqlite3
+import tempfile
+import traceback
+import subprocess
+
+JOB_DB_PATH = os.environ.get("SCRAPER_JOB_DB", os.path.join(tempfile.gettempdir(), "scraper-jobs.sqlite3"))
+JOB_RETENTION = 7 * 24 * 3600  # Seconds finished jobs are kept
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(SCRIPTS_DIR)
+QUEUE_LEASE = float(os.environ.get("SCRAPER_JOB_QUEUE_LEASE", "60"))  # Seconds a queued job may wait for its runner
+RUN_LEASE = float(os.environ.get("SCRAPER_JOB_RUN_LEASE", "600"))  # Seconds a running job may go without a progress event
+FINISHED = ("succeeded", "failed")
+SUPPORTED = not os.environ.get("VERCEL")  # Vercel sets VERCEL=1 in its functions
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    mode TEXT NOT NULL,
+    status TEXT NOT NULL,
+    submitted_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    pid INTEGER,
+    log_path TEXT,
+    progress TEXT,
+    result TEXT,
+    error TEXT,
+    lease_expires_at REAL
+)
+"""
+JSON_COLUMNS = ("progress", "result")
+
+# ---------------------------------------------------------------------------
+# Job store
+# ---------------------------------------------------------------------------
+
+def connect(db_path=None):
+    conn = sqlite3.connect(db_path or JOB_DB_PATH, timeout=10)
+    conn.row_factory = sqlite3.Row
+    conn.execute(SCHEMA)
+    # Stores created before leases existed
+    if "lease_expires_at" not in {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}:
+        conn.execute("ALTER TABLE jobs ADD COLUMN lease_expires_at REAL")
+    return conn
+
+def _row_to_job(row):
+    job = dict(row)
+    for column in JSON_COLUMNS:
+        if job[column] is not None:
+            job[column] = json.loads(job[column])
+    return job
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def update_job(job_id, db_path=None, **fields):
+    for column in JSON_COLUMNS:
+        if column in fields and fields[column] is not None:
+            fields[column] = json.dumps(fields[column], default=str)
+    assignments = ", ".join(f"{column} = ?" for column in fields)
+    with connect(db_path) as conn:
+        conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+def create_job(mode, db_path=None):
+    now = time.time()
+    job_id = uuid.uuid4().hex
+    with connect(db_path) as conn:
+        conn.execute("DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (now - JOB_RETENTION,))
+        conn.execute("INSERT INTO jobs (id, mode, status, submitted_at, lease_expires_at) VALUES (?, ?, 'queued', ?, ?)",
+                     (job_id, mode, now, now + QUEUE_LEASE))
+    return get_job(job_id, db_path)
+
+def get_job(job_id, db_path=None):
+    """Job dict, or None for an unknown id; a job whose runner died or whose lease expired is marked failed"""
+    with connect(db_path) as conn:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return None
+    job = _row_to_job(row)
+    if job["status"] not in FINISHED and job["lease_expires_at"] and time.time() > job["lease_expires_at"]:
+        error = "Job runner never started" if job["status"] == "queued" else "Job runner stopped reporting progress"
+        update_job(job_id, db_path, status="failed", finished_at=time.time(), error=f"{error} (lease expired)")
+        return get_job(job_id, db_path)
+    if job["status"] == "running" and job["pid"] and not _pid_alive(job["pid"]):
+        update_job(job_id, db_path, status="failed", finished_at=time.time(), error="Job runner exited before finishing")
+        return get_job(job_id, db_path)
+    return job
+
+def list_jobs(limit=20, db_path=None):
+    with connect(db_path) as conn:
+        rows = conn.execute("SELECT * FROM jobs ORDER BY submitted_at DESC LIMIT ?", (limit,)).fetchall()
+    return [_row_to_job(row) for row in rows]
+
+def job_status(job):
+    """Job without its result, for status polling"""
+    return {key: value for key, value in job.items() if key != "result"}
+
+# ---------------------------------------------------------------------------
+# Submitting and running jobs
+# ---------------------------------------------------------------------------
+
+def submit(mode, db_path=None):
+    """Record a job and start its runner in a detached process; returns the job"""
+    db_path = db_path or JOB_DB_PATH
+    job = create_job(mode, db_path)
+    log_path = os.path.join(os.path.dirname(db_path), f"scraper-job-{job['id']}.log")
+    with open(log_path, "w") as log:
+        process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "run", job["id"]],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            cwd=BACKEND_DIR,
+            env=dict(os.environ, SCRAPER_JOB_DB=db_path),
+            start_new_session=True,  # Survives the request that submitted it
+        )
+    update_job(job["id"], db_path, pid=process.pid, log_path=log_path)
+    return get_job(job["id"], db_path)
+
+def run(job_id, db_path=None):
+    """Runner body: execute the job's mode and store its progress and result"""
+    job = get_job(job_id, db_path)
+    if job is None or job["status"] != "queued":
+        raise Exception(f"Job {job_id} is not queued")
+    update_job(job_id, db_path, status="running", started_at=time.time(), pid=os.getpid(), lease_expires_at=time.time() + RUN_LEASE)
+
+    def record_progress(event):
+        # Each progress event renews the lease
+        update_job(job_id, db_path, progress={key: value for key, value in event.items() if key != "result"},
+                   lease_expires_at=time.time() + RUN_LEASE)
+
+    try:
+        os.chdir(BACKEND_DIR)
+        sys.path.insert(0, SCRIPTS_DIR)
+        import scraper
+        scraper.progress.add_listener(record_progress)
+        result = scraper.main(job["mode"])
+        status = "succeeded" if result.get("success") else "failed"
+        error = None if result.get("success") else "; ".join(result.get("errors") or []) or None
+        update_job(job_id, db_path, status=status, finished_at=time.time(), result=result, error=error)
+    except BaseException as e:
+        update_job(job_id, db_path, status="failed", finished_at=time.time(),
+                   error=f"{type(e).__name__}: {e}\n{traceback.format_exc()[-1000:]}")
+        raise
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "submit" and len(sys.argv) > 2:
+        print(json.dumps(submit(sys.argv[2].lower()), indent=2))
+    elif command == "status" and len(sys.argv) > 2:
+        job = get_job(sys.argv[2])
+        print(json.dumps(job, indent=2) if job else f"ERROR: Unknown job {sys.argv[2]}")
+        sys.exit(0 if job else 1)
+    elif command == "list":
+        print(json.dumps([job_status(job) for job in list_jobs()], indent=2))
+    elif command == "run" and len(sys.argv) > 2:
+        run(sys.argv[2])
+    else:
+        print("Usage: python scraper_jobs.py submit <mode> | status <job id> | list")
+        sys.exit(1)
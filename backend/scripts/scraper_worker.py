@@ -0,0 +1,174 @@
+# Resident scraper worker
+# A long-lived process that imports scraper.py (pandas, selenium, ...) once and
+# runs scrape/process jobs sent over a local socket, so a request no longer pays
+# for a fresh interpreter and its imports. Jobs run one at a time, in the backend
+# directory, exactly like `python scripts/scraper.py <mode>` would.
+#
+# Start the worker:   python scraper_worker.py serve
+# Run a job:          python scraper_worker.py run process_ipo [--stream]
+# api/scraper.py dispatches to the worker at SCRAPER_WORKER_ADDRESS and falls
+# back to a subprocess when no worker is listening.
+import io
+import os
+import sys
+import json
+import time
+import socket
+import threading
+import traceback
+import socketserver
+from contextlib import redirect_stdout
+
+WORKER_ADDRESS = os.environ.get("SCRAPER_WORKER_ADDRESS", "127.0.0.1:7812")  # "host:port", empty disables the worker
+JOB_TIMEOUT = 50       # Seconds a client waits for a job (Vercel Pro limit is 60)
+OUTPUT_TAIL = 4000     # Characters of captured job output returned with the result
+DEFAULT_PORT = 7812
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ---------------------------------------------------------------------------
+# Client side (used by api/scraper.py)
+# ---------------------------------------------------------------------------
+
+def _parse_address(address):
+    host, _, port = address.rpartition(":")
+    return (host or "127.0.0.1", int(port or DEFAULT_PORT))
+
+def _request(message, address=None, timeout=JOB_TIMEOUT, on_event=None):
+    """Send one JSON request to the worker; None when no worker is listening.
+    Progress event lines that precede the response are passed to on_event."""
+    address = WORKER_ADDRESS if address is None else address
+    if not address:
+        return None
+    try:
+        sock = socket.create_connection(_parse_address(address), timeout=2)
+    except OSError:
+        return None
+    # Past this point the job may be running: timeouts are raised, never retried elsewhere
+    with sock:
+        sock.settimeout(timeout)
+        sock.sendall((json.dumps(message) + "\n").encode("utf-8"))
+        with sock.makefile("r", encoding="utf-8") as reader:
+            for line in reader:
+                response = json.loads(line)
+                if "event" not in response:
+                    return response
+                if on_event:
+                    on_event(response)
+    raise Exception("Scraper worker closed the connection")
+
+def run_job(mode, address=None, timeout=JOB_TIMEOUT, on_event=None):
+    """Run a scraper mode on the resident worker; returns its response or None without a worker.
+    With on_event, the worker streams the job's progress events to it while the job runs."""
+    message = {"op": "run", "mode": mode, "timeout": timeout, "stream": on_event is not None}
+    return _request(message, address, timeout, on_event)
+
+def worker_status(address=None):
+    return _request({"op": "status"}, address, timeout=5)
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+class ScraperWorker:
+    """Runs scraper.main(mode) jobs one at a time inside this process"""
+
+    def __init__(self):
+        started = time.perf_counter()
+        import scraper
+        self.scraper = scraper
+        self.import_seconds = round(time.perf_counter() - started, 3)
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.jobs = 0
+        self.current = None
+
+    def run(self, mode, timeout=JOB_TIMEOUT, listener=None):
+        if not self.lock.acquire(timeout=timeout):
+            raise Exception(f"Scraper worker is busy with {self.current}")
+        progress = self.scraper.progress
+        try:
+            self.current = mode
+            if listener:
+                progress.add_listener(listener)
+            output = io.StringIO()
+            started = time.perf_counter()
+            # Jobs are serialized, so capturing the process-wide stdout also captures task threads
+            with redirect_stdout(output):
+                result = self.scraper.main(mode)
+            seconds = round(time.perf_counter() - started, 3)
+            self.jobs += 1
+            print(f"INFO: Job {self.jobs} ({mode}) finished in {seconds}s - success: {result.get('success')}")
+            return {"result": result, "seconds": seconds, "output": output.getvalue()[-OUTPUT_TAIL:]}
+        finally:
+            if listener:
+                progress.remove_listener(listener)
+            self.current = None
+            self.lock.release()
+
+    def status(self):
+        return {
+            "pid": os.getpid(),
+            "uptime": round(time.time() - self.started_at, 1),
+            "import_seconds": self.import_seconds,
+            "jobs": self.jobs,
+            "busy": self.current,
+        }
+
+class WorkerRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        worker = self.server.worker
+        try:
+            message = json.loads(self.rfile.readline())
+            op = message.get("op")
+            if op == "run":
+                listener = self.write_message if message.get("stream") else None
+                response = worker.run(str(message["mode"]).lower(), min(float(message.get("timeout", JOB_TIMEOUT)), JOB_TIMEOUT), listener)
+            elif op == "status":
+                response = worker.status()
+            else:
+                raise Exception(f"Unknown operation: {op}")
+            response["ok"] = True
+        except Exception as e:
+            response = {"ok": False, "error": str(e), "traceback": traceback.format_exc()[-500:]}
+        self.write_message(response)
+
+    def write_message(self, message):
+        self.wfile.write((json.dumps(message, default=str) + "\n").encode("utf-8"))
+
+class WorkerServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+def serve(address=None):
+    """Import the scraper once and serve jobs until interrupted"""
+    host, port = _parse_address(address or WORKER_ADDRESS or f"127.0.0.1:{DEFAULT_PORT}")
+    # Same working directory the subprocess path uses (download files land here)
+    os.chdir(BACKEND_DIR)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    worker = ScraperWorker()
+    print(f"INFO: Scraper imported in {worker.import_seconds}s")
+
+    server = WorkerServer((host, port), WorkerRequestHandler)
+    server.worker = worker
+    print(f"SUCCESS: Scraper worker listening on {host}:{port} (cwd: {BACKEND_DIR})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("INFO: Scraper worker stopped")
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "serve"
+    if command == "status":
+        print(json.dumps(worker_status(), indent=2))
+    elif command == "run" and len(sys.argv) > 2:
+        on_event = (lambda event: print(json.dumps(event, default=str), flush=True)) if "--stream" in sys.argv else None
+        response = run_job(sys.argv[2], on_event=on_event)
+        if response is None:
+            print(f"ERROR: No scraper worker listening on {WORKER_ADDRESS}")
+            sys.exit(1)
+        print(json.dumps({key: value for key, value in response.items() if key != "output"}, indent=2))
+    else:
+        serve()
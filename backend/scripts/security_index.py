@@ -0,0 +1,270 @@
+# Precomputed search index for the security names in Security.json
+# Built by the scraper at ingest time and memory-mapped by readers, so
+# autocomplete needs no per-request loading, de-duplication or sorting.
+#
+# File layout (little-endian, every section 8-byte aligned):
+#   header    magic, version, name count, trigram count, section offsets
+#   names     UTF-8 blob of the unique names + uint32 offsets[n+1], sorted by search key
+#   keys      casefolded names (the search keys) in the same order + uint32 offsets[n+1]
+#   jump      uint32[257]: first key byte -> first name index, narrows the prefix search
+#   grams     uint16[n] trigram count per name, for the fuzzy similarity score
+#   trigrams  sorted uint64 trigram ids + uint32 postings offsets[t+1] + uint32 postings
+#
+# Usage: python security_index.py build [Security.json] [Security.idx]
+#        python security_index.py prefix|search|fuzzy <text> [limit]
+import os
+import sys
+import json
+import mmap
+import time
+import heapq
+import struct
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from itertools import chain
+
+import json_writer
+
+MAGIC = b"SECIDX\x00\x01"
+VERSION = 1
+HEADER = struct.Struct("<8sIII" + "Q" * 11)
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+DEFAULT_JSON = os.path.join(DATA_DIR, "Security.json")
+DEFAULT_INDEX = os.path.join(DATA_DIR, "Security.idx")
+DEFAULT_LIMIT = 10
+FUZZY_THRESHOLD = 0.3  # Minimum trigram similarity for fuzzy matches
+
+def search_key(name):
+    return " ".join(name.casefold().split())
+
+def trigram_ids(text, padded=False):
+    """Distinct trigram ids (three code points packed into 63 bits) of a search key"""
+    if padded:
+        text = f"  {text} "
+    return {(ord(text[i]) << 42) | (ord(text[i + 1]) << 21) | ord(text[i + 2]) for i in range(len(text) - 2)}
+
+def _pad(blob):
+    return blob + b"\x00" * (-len(blob) % 8)
+
+def _string_table(strings):
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = [0]
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    return b"".join(encoded), struct.pack(f"<{len(offsets)}I", *offsets)
+
+def build_index(names, index_path=DEFAULT_INDEX):
+    """Write the index for an iterable of names; returns the number of indexed names"""
+    unique = {}
+    for name in names:
+        name = str(name).strip()
+        if name:
+            unique.setdefault(name, search_key(name))
+    entries = sorted(unique.items(), key=lambda item: (item[1], item[0]))
+    display = [name for name, _ in entries]
+    keys = [key for _, key in entries]
+
+    # First-byte jump table: jump[b] is the first name whose key starts with a byte >= b
+    jump = [0] * 257
+    first_bytes = [key.encode("utf-8")[:1] for key in keys]
+    index = 0
+    for b in range(256):
+        while index < len(keys) and first_bytes[index] and first_bytes[index][0] < b:
+            index += 1
+        jump[b] = index
+    jump[256] = len(keys)
+
+    postings = defaultdict(list)
+    gram_counts = []
+    for i, key in enumerate(keys):
+        grams = trigram_ids(key, padded=True)
+        gram_counts.append(min(len(grams), 0xFFFF))
+        for gram in grams:
+            postings[gram].append(i)
+    gram_ids = sorted(postings)
+    posting_offsets = [0]
+    posting_list = []
+    for gram in gram_ids:
+        posting_list.extend(postings[gram])
+        posting_offsets.append(len(posting_list))
+
+    name_blob, name_offsets = _string_table(display)
+    key_blob, key_offsets = _string_table(keys)
+    sections = [
+        name_blob, name_offsets, key_blob, key_offsets,
+        struct.pack("<257I", *jump),
+        struct.pack(f"<{len(gram_counts)}H", *gram_counts),
+        struct.pack(f"<{len(gram_ids)}Q", *gram_ids),
+        struct.pack(f"<{len(posting_offsets)}I", *posting_offsets),
+        struct.pack(f"<{len(posting_list)}I", *posting_list),
+    ]
+    offsets = []
+    position = HEADER.size + (-HEADER.size % 8)
+    for section in sections:
+        offsets.append(position)
+        position += len(_pad(section))
+    header = HEADER.pack(MAGIC, VERSION, len(display), len(gram_ids), *offsets, position, 0)
+
+    fd, temp_path = json_writer.create_temp_file(index_path)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_pad(header))
+            for section in sections:
+                f.write(_pad(section))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, index_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    return len(display)
+
+def build_index_from_json(json_path=DEFAULT_JSON, index_path=DEFAULT_INDEX):
+    with open(json_path, "r", encoding="utf-8") as f:
+        records = json.load(f)["data"]
+    return build_index((record.get("Security Name") for record in records), index_path)
+
+class _Strings:
+    """Sequence view over a string table section (decodes on access, for bisect)"""
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+class SecurityIndex:
+    """Read-only, memory-mapped view of a Security.idx file"""
+
+    def __init__(self, index_path=DEFAULT_INDEX):
+        with open(index_path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._views = [memoryview(self._mmap)]
+        magic, version, count, gram_count, *offsets = HEADER.unpack_from(self._views[0])
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Not a security index (version {VERSION}): {index_path}")
+        (name_blob, name_offsets, key_blob, key_offsets, jump, grams,
+         gram_ids, posting_offsets, postings, end, _) = offsets
+
+        def section(start, stop, fmt="B", length=None):
+            # Every derived view is kept so close() can release them before unmapping
+            views = [self._views[0][start:stop]]
+            if fmt != "B":
+                views.append(views[-1].cast(fmt))
+            if length is not None:
+                views.append(views[-1][:length])
+            self._views.extend(views)
+            return views[-1]
+
+        self.count = count
+        self.names = _Strings(section(name_blob, name_offsets), section(name_offsets, key_blob, "I", count + 1))
+        self.keys = _Strings(section(key_blob, key_offsets), section(key_offsets, jump, "I", count + 1))
+        self._jump = section(jump, grams, "I", 257)
+        self._grams = section(grams, gram_ids, "H", count)
+        self._gram_ids = section(gram_ids, posting_offsets, "Q", gram_count)
+        self._posting_offsets = section(posting_offsets, postings, "I", gram_count + 1)
+        self._postings = section(postings, end, "I")
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+    def prefix(self, text, limit=DEFAULT_LIMIT):
+        """Names whose search key starts with text, in sorted order"""
+        key = search_key(text)
+        if not key:
+            return [self.names[i] for i in range(min(limit, self.count))]
+        first = key.encode("utf-8")[0]
+        lo = bisect_left(self.keys, key, self._jump[first], self._jump[first + 1])
+        results = []
+        for i in range(lo, self._jump[first + 1]):
+            if len(results) >= limit or not self.keys[i].startswith(key):
+                break
+            results.append(self.names[i])
+        return results
+
+    def _postings_for(self, gram):
+        i = bisect_left(self._gram_ids, gram)
+        if i == len(self._gram_ids) or self._gram_ids[i] != gram:
+            return ()
+        return self._postings[self._posting_offsets[i]:self._posting_offsets[i + 1]]
+
+    def search(self, text, limit=DEFAULT_LIMIT):
+        """Names containing text anywhere (case-insensitive), in sorted order"""
+        key = search_key(text)
+        if len(key) < 3:
+            # Too short for a trigram lookup; prefix matches are the useful answer
+            return self.prefix(text, limit)
+        candidates = None
+        for posting in sorted((self._postings_for(g) for g in trigram_ids(key)), key=len):
+            candidates = set(posting) if candidates is None else candidates.intersection(posting)
+            if not candidates:
+                return []
+        results = []
+        for i in sorted(candidates):
+            if key in self.keys[i]:
+                results.append(self.names[i])
+                if len(results) >= limit:
+                    break
+        return results
+
+    def fuzzy(self, text, limit=DEFAULT_LIMIT, threshold=FUZZY_THRESHOLD):
+        """Names ranked by trigram similarity to text (tolerates typos and word order)"""
+        query = trigram_ids(search_key(text), padded=True)
+        if not query:
+            return []
+        # Shared trigram count per name (Counter counts an iterable in C)
+        shared = Counter(chain.from_iterable(self._postings_for(gram) for gram in query))
+        # similarity >= threshold needs at least this many shared trigrams
+        min_common = threshold * len(query) / (1 + threshold)
+        grams = self._grams
+        scored = []
+        for i, common in shared.items():
+            if common >= min_common:
+                score = common / (len(query) + grams[i] - common)
+                if score >= threshold:
+                    scored.append((score, i))
+        return [(self.names[i], round(score, 3)) for score, i in heapq.nlargest(limit, scored, key=lambda s: (s[0], -s[1]))]
+
+_index = None
+
+def get_index(index_path=DEFAULT_INDEX):
+    """Process-wide index, opened on first use"""
+    global _index
+    if _index is None:
+        _index = SecurityIndex(index_path)
+    return _index
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "build":
+        json_path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_JSON
+        index_path = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_INDEX
+        start = time.perf_counter()
+        count = build_index_from_json(json_path, index_path)
+        print(f"SUCCESS: Indexed {count} security names into {index_path} "
+              f"({os.path.getsize(index_path)} bytes, {time.perf_counter() - start:.3f}s)")
+    elif command in ("prefix", "search", "fuzzy") and len(sys.argv) > 2:
+        limit = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_LIMIT
+        index = get_index()
+        start = time.perf_counter()
+        results = getattr(index, command)(sys.argv[2], limit)
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        print(json.dumps({"query": sys.argv[2], "mode": command, "results": results, "micros": round(elapsed_us, 1)}, indent=2, ensure_ascii=False))
+    else:
+        print("Usage: python security_index.py build [Security.json] [Security.idx]")
+        print("       python security_index.py prefix|search|fuzzy <text> [limit]")
+        sys.exit(1)
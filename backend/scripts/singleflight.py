@@ -0,0 +1,110 @@
+# Single-flight coalescing and a freshness cache for scraper runs
+# Scrape modes share the download and data directories, so only one may run at a
+# time on a host. run() takes an exclusive flock on a lock file (works across
+# processes: API subprocesses, the resident worker, job runners, the Node route):
+#   - a caller that gets the lock runs the scrape and records its result;
+#   - a caller that finds the lock held waits for it, and if a run of the same
+#     mode finished meanwhile it returns that run's result instead of starting
+#     another one (coalescing);
+#   - a caller within `ttl` seconds of the last successful run of its mode gets
+#     that result without running anything.
+# A caller waits at most `lock_timeout` seconds for a running scrape, then raises
+# TimeoutError, so a hung run cannot stall every other caller.
+# Without fcntl (Windows) runs are not coalesced.
+import os
+import re
+import json
+import time
+import hashlib
+import tempfile
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+RESULT_TTL = float(os.environ.get("SCRAPER_RESULT_TTL", "60"))  # Seconds a successful scrape result is reused (0 disables)
+LOCK_TIMEOUT = float(os.environ.get("SCRAPER_LOCK_TIMEOUT", "45"))  # Seconds to wait for a running scrape before giving up
+LOCK_POLL_INTERVAL = 0.2
+# Same resolution as scraper.DATA_DIR, so the API reads the state the scraper writes
+DATA_DIR = os.environ.get("SCRAPER_DATA_DIR") or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+def state_dir(data_dir=DATA_DIR):
+    """Lock and result directory for one data directory"""
+    digest = hashlib.sha1(os.path.abspath(data_dir).encode("utf-8")).hexdigest()[:12]
+    return os.environ.get("SCRAPER_SINGLEFLIGHT_DIR") or os.path.join(tempfile.gettempdir(), f"scraper-singleflight-{digest}")
+
+def _result_path(directory, key):
+    # Keys come from request parameters: keep them to one plain file name
+    return os.path.join(directory, re.sub(r"[^A-Za-z0-9_-]", "_", key) + ".result.json")
+
+def last_run(directory, key):
+    """{"finished_at", "pid", "result"} of the last run of key, or None"""
+    try:
+        with open(_result_path(directory, key), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def cached_result(directory, key, ttl=RESULT_TTL):
+    """Result of the last successful run of key if it finished less than ttl seconds ago"""
+    if ttl <= 0:
+        return None
+    run = last_run(directory, key)
+    if not run or not run["result"].get("success"):
+        return None
+    age = time.time() - run["finished_at"]
+    if age >= ttl:
+        return None
+    return dict(run["result"], cached=True, cache_age=round(age, 1))
+
+def _record(directory, key, result):
+    run = {"finished_at": time.time(), "pid": os.getpid(), "result": result}
+    path = _result_path(directory, key)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(run, f, default=str)
+    os.replace(temp_path, path)
+
+def _wait_for_lock(lock_file, timeout):
+    """Take the exclusive lock, polling until timeout seconds have passed (then TimeoutError)"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return
+        except BlockingIOError:
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Another scrape held the lock for more than {timeout:g}s")
+            time.sleep(LOCK_POLL_INTERVAL)
+
+def run(directory, key, fn, ttl=RESULT_TTL, on_wait=None, lock_timeout=LOCK_TIMEOUT):
+    """fn() under the host-wide lock, coalesced with a concurrent or fresh run of the same key"""
+    cached = cached_result(directory, key, ttl)
+    if cached is not None or fcntl is None:
+        return cached if cached is not None else fn()
+
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "scrape.lock"), "a") as lock_file:
+        waited_since = None
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            waited_since = time.time()
+            if on_wait:
+                on_wait()
+            _wait_for_lock(lock_file, lock_timeout)
+        try:
+            if waited_since is not None:
+                # The run we waited for is the one to report, whether or not it succeeded
+                previous = last_run(directory, key)
+                if previous and previous["finished_at"] >= waited_since:
+                    return dict(previous["result"], coalesced=True)
+            cached = cached_result(directory, key, ttl)
+            if cached is not None:
+                return cached
+            result = fn()
+            _record(directory, key, result)
+            return result
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
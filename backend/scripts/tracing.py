@@ -0,0 +1,154 @@
+# Lightweight tracing spans for scraper runs
+# span() times a block and nests it under the span that is open on the same
+# thread, so a run records a tree like
+#   ipo > fetch_all_ipo_data > export_chittorgarh_csv_with_browser > driver.get
+# Spans are kept in memory for the current run only (start_run resets them).
+# timings() summarizes them for the result JSON; export_chrome_trace() writes
+# them as Chrome trace events, to open in chrome://tracing, Perfetto or
+# speedscope as a flamegraph (one lane per thread).
+import os
+import json
+import time
+import threading
+import functools
+from contextlib import contextmanager
+
+_lock = threading.Lock()
+_local = threading.local()
+_spans = []
+_run_started = time.perf_counter()
+_run_started_at = time.time()
+
+def start_run():
+    """Drop the spans of the previous run and restart the run clock"""
+    global _run_started, _run_started_at
+    with _lock:
+        _spans.clear()
+        _run_started = time.perf_counter()
+        _run_started_at = time.time()
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+@contextmanager
+def span(name, **args):
+    """Time a block as a span named name; args (and annotate() calls inside it) are kept with it"""
+    thread = threading.current_thread()
+    stack = _stack()
+    record = {
+        "name": name,
+        "start": time.perf_counter(),
+        "duration": None,
+        "thread": thread.name,
+        "tid": thread.ident,
+        "parent": stack[-1] if stack else None,
+        "args": {key: value for key, value in args.items() if value is not None},
+    }
+    with _lock:
+        _spans.append(record)
+    stack.append(record)
+    try:
+        yield record
+    except BaseException as e:
+        record["args"]["error"] = type(e).__name__
+        raise
+    finally:
+        record["duration"] = time.perf_counter() - record["start"]
+        stack.pop()
+
+def traced(name=None):
+    """Decorator: run every call of the function in a span (named after the function by default)"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name or fn.__name__):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def annotate(**args):
+    """Attach details (record counts, file names, ...) to the innermost open span of this thread"""
+    stack = _stack()
+    if stack:
+        stack[-1]["args"].update((key, value) for key, value in args.items() if value is not None)
+
+def _duration(record, now):
+    # Spans still open (e.g. the stage that prints the result) count up to now
+    return record["duration"] if record["duration"] is not None else now - record["start"]
+
+def timings():
+    """Result JSON section: run total, per-span-name totals and the span tree (seconds since run start)"""
+    now = time.perf_counter()
+    with _lock:
+        spans = list(_spans)
+
+    by_name = {}
+    nodes = {}
+    roots = []
+    for record in spans:
+        duration = _duration(record, now)
+        totals = by_name.setdefault(record["name"], {"count": 0, "seconds": 0.0, "max": 0.0})
+        totals["count"] += 1
+        totals["seconds"] += duration
+        totals["max"] = max(totals["max"], duration)
+
+        node = {"name": record["name"], "start": round(record["start"] - _run_started, 4), "duration": round(duration, 4)}
+        if record["args"]:
+            node["args"] = dict(record["args"])
+        if record["duration"] is None:
+            node["open"] = True
+        parent = nodes.get(id(record["parent"])) if record["parent"] is not None else None
+        if parent is None and record["thread"] != "MainThread":
+            node["thread"] = record["thread"]
+        nodes[id(record)] = node
+        if parent is None:
+            roots.append(node)
+        else:
+            parent.setdefault("children", []).append(node)
+
+    for totals in by_name.values():
+        totals["seconds"] = round(totals["seconds"], 4)
+        totals["max"] = round(totals["max"], 4)
+    return {"total": round(now - _run_started, 4), "by_span": by_name, "spans": roots}
+
+def chrome_trace_events():
+    """The run's spans as Chrome trace-event "complete" events plus thread name metadata"""
+    now = time.perf_counter()
+    pid = os.getpid()
+    with _lock:
+        spans = list(_spans)
+
+    events = []
+    threads = {}
+    for record in spans:
+        threads[record["tid"]] = record["thread"]
+        events.append({
+            "name": record["name"],
+            "cat": "scraper",
+            "ph": "X",
+            "ts": round((record["start"] - _run_started) * 1e6, 1),
+            "dur": round(_duration(record, now) * 1e6, 1),
+            "pid": pid,
+            "tid": record["tid"],
+            "args": record["args"],
+        })
+    for tid, thread_name in threads.items():
+        events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}})
+    return events
+
+def export_chrome_trace(path, metadata=None):
+    """Write the run's spans to path in the Chrome trace-event JSON format"""
+    trace = {
+        "traceEvents": chrome_trace_events(),
+        "displayTimeUnit": "ms",
+        "otherData": dict(metadata or {}, started_at=_run_started_at),
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(trace, f, default=str)
+    os.replace(temp_path, path)
+    return path
@@ -47,12 +47,8 @@ const getIpoData = () => {
     return [];
   }
   
-  // Return IPO data sorted by date (newest first)
-  return data.data.sort((a, b) => {
-    const dateA = new Date(a.uploaded_at || a.date || 0);
-    const dateB = new Date(b.uploaded_at || b.date || 0);
-    return dateB - dateA;
-  });
+  // Records are stored newest first (by Opening_Date_epoch) by the scraper
+  return data.data;
 };
 
 /**
@@ -64,12 +60,8 @@ const getSmeIpoData = () => {
     return [];
   }
   
-  // Return SME IPO data sorted by date (newest first)
-  return data.data.sort((a, b) => {
-    const dateA = new Date(a.uploaded_at || a.date || 0);
-    const dateB = new Date(b.uploaded_at || b.date || 0);
-    return dateB - dateA;
-  });
+  // Records are stored newest first (by Opening_Date_epoch) by the scraper
+  return data.data;
 };
 
 module.exports = {